@@ -1,18 +1,38 @@
+import asyncio
+import contextvars
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar
+
 from minitap.mobile_use.agents.executor.utils import (
     is_last_tool_message_take_screenshot,
 )
 from minitap.mobile_use.context import MobileUseContext
 from minitap.mobile_use.controllers.mobile_command_controller import get_screen_data
-from minitap.mobile_use.controllers.platform_specific_commands_controller import (
-    get_device_date,
-    get_focused_app_info,
-)
 from minitap.mobile_use.graph.state import State
+from minitap.mobile_use.services.device_info import device_info_service
+from minitap.mobile_use.services.focused_app import focused_app_trackers
 from minitap.mobile_use.utils.decorators import wrap_with_callbacks
 from minitap.mobile_use.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+T = TypeVar("T")
+
+# The screen data is required to continue, other sources are best effort
+SCREEN_DATA_TIMEOUT_SECONDS = 30.0
+FOCUSED_APP_TIMEOUT_SECONDS = 5.0
+DEVICE_DATE_TIMEOUT_SECONDS = 5.0
+# Threads running the sources of every task. A timed out source can't be interrupted: its
+# thread keeps running until the blocking call returns, so the threads are bounded, and
+# further sources queue (within their own timeout) while stuck calls hold them.
+CONTEXT_SOURCE_MAX_THREADS = 8
+
+_source_executor = ThreadPoolExecutor(
+    max_workers=CONTEXT_SOURCE_MAX_THREADS, thread_name_prefix="context-source"
+)
+
 
 class ContextorNode:
     def __init__(self, ctx: MobileUseContext):
@@ -23,10 +43,30 @@ class ContextorNode:
         on_success=lambda _: logger.success("Contextor Agent"),
         on_failure=lambda _: logger.error("Contextor Agent"),
     )
-    def __call__(self, state: State):
-        device_data = get_screen_data(self.ctx.screen_api_client)
-        focused_app_info = get_focused_app_info(self.ctx)
-        device_date = get_device_date(self.ctx)
+    async def __call__(self, state: State):
+        # Each source is a blocking HTTP or ADB round trip: they are gathered concurrently,
+        # so that the step latency is bounded by the slowest one
+        device_data, device_date = await asyncio.gather(
+            self._gather_source(
+                name="screen_data",
+                fn=lambda: get_screen_data(self.ctx.screen_api_client),
+                timeout=SCREEN_DATA_TIMEOUT_SECONDS,
+                required=True,
+            ),
+            self._gather_source(
+                name="device_date",
+                fn=lambda: device_info_service.get_device_date(self.ctx),
+                timeout=DEVICE_DATE_TIMEOUT_SECONDS,
+            ),
+        )
+        if device_data is None:
+            raise RuntimeError("The screen data source returned no data")
+        # Derived from the hierarchy, only falls back to an ADB round trip when it is ambiguous
+        focused_app = await self._gather_source(
+            name="focused_app",
+            fn=lambda: focused_app_trackers.get(self.ctx).update(device_data.elements),
+            timeout=FOCUSED_APP_TIMEOUT_SECONDS,
+        )
 
         should_add_screenshot_context = is_last_tool_message_take_screenshot(
             list(state.executor_messages)
@@ -39,8 +79,41 @@ class ContextorNode:
                     device_data.base64 if should_add_screenshot_context else None
                 ),
                 "latest_ui_hierarchy": device_data.elements,
-                "focused_app_info": focused_app_info,
+                "focused_app_info": str(focused_app) if focused_app else None,
                 "screen_size": (device_data.width, device_data.height),
                 "device_date": device_date,
             },
         )
+
+    async def _gather_source(
+        self, name: str, fn: Callable[[], T], timeout: float, required: bool = False
+    ) -> T | None:
+        """
+        Runs the blocking `fn` in a worker thread and records its latency in the task metrics.
+        A source failing or timing out raises if `required`, and yields None otherwise.
+        On timeout, the worker thread is left to finish the call (see `_source_executor`).
+        """
+        metrics = self.ctx.metrics.get_context_source(name)
+        start = time.perf_counter()
+        try:
+            context = contextvars.copy_context()
+            future = asyncio.get_running_loop().run_in_executor(_source_executor, context.run, fn)
+            return await asyncio.wait_for(future, timeout=timeout)
+        except TimeoutError:
+            metrics.timeouts += 1
+            if required:
+                raise TimeoutError(f"Context source {name} timed out after {timeout}s") from None
+            logger.warning(f"Context source {name} timed out after {timeout}s, skipping it")
+            return None
+        except Exception as e:
+            metrics.errors += 1
+            if required:
+                raise
+            logger.warning(f"Context source {name} failed, skipping it: {e}")
+            return None
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.calls += 1
+            metrics.seconds += elapsed
+            metrics.max_seconds = max(metrics.max_seconds, elapsed)
+            logger.debug(f"Context source {name} took {elapsed:.3f}s")
@@ -0,0 +1,97 @@
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from minitap.mobile_use.agents.contextor import contextor
+from minitap.mobile_use.agents.contextor.contextor import ContextorNode
+from minitap.mobile_use.context import TaskMetrics
+
+
+def _state() -> Mock:
+    state = Mock()
+    state.executor_messages = []
+    state.sanitize_update = lambda ctx, update: update
+    return state
+
+
+def _slow(value, seconds: float = 0.2):
+    def fn(*_):
+        time.sleep(seconds)
+        return value
+
+    return fn
+
+
+def _trackers(update) -> Mock:
+    return Mock(get=lambda ctx: Mock(update=update))
+
+
+@pytest.mark.asyncio
+async def test_contextor_gathers_sources_concurrently(monkeypatch):
+    screen_data = Mock(base64="img", elements=[{"text": "ok"}], width=1080, height=1920)
+    monkeypatch.setattr(contextor, "get_screen_data", _slow(screen_data))
+    monkeypatch.setattr(contextor, "focused_app_trackers", _trackers(_slow("com.app/.Main", 0)))
+    monkeypatch.setattr(
+        contextor,
+        "device_info_service",
+        Mock(get_device_date=_slow("Mon Oct 19 10:00:00 UTC 2026")),
+    )
+    ctx = Mock(metrics=TaskMetrics())
+
+    start = time.perf_counter()
+    update = await ContextorNode(ctx)(_state())
+
+    assert time.perf_counter() - start < 0.5
+    assert update["latest_ui_hierarchy"] == [{"text": "ok"}]
+    assert update["focused_app_info"] == "com.app/.Main"
+    assert update["device_date"] == "Mon Oct 19 10:00:00 UTC 2026"
+    assert update["screen_size"] == (1080, 1920)
+    assert {name: source.calls for name, source in ctx.metrics.context_sources.items()} == {
+        "screen_data": 1,
+        "focused_app": 1,
+        "device_date": 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_contextor_skips_optional_sources_failing_or_timing_out(monkeypatch):
+    def fail(_):
+        raise ConnectionError("device offline")
+
+    screen_data = Mock(base64="img", elements=[], width=1080, height=1920)
+    monkeypatch.setattr(contextor, "get_screen_data", _slow(screen_data, 0))
+    monkeypatch.setattr(contextor, "focused_app_trackers", _trackers(fail))
+    monkeypatch.setattr(contextor, "device_info_service", Mock(get_device_date=_slow("date", 0.5)))
+    monkeypatch.setattr(contextor, "DEVICE_DATE_TIMEOUT_SECONDS", 0.05)
+    ctx = Mock(metrics=TaskMetrics())
+
+    update = await ContextorNode(ctx)(_state())
+
+    assert update["focused_app_info"] is None
+    assert update["device_date"] is None
+    assert ctx.metrics.context_sources["focused_app"].errors == 1
+    assert ctx.metrics.context_sources["device_date"].timeouts == 1
+
+
+@pytest.mark.asyncio
+async def test_contextor_raises_when_screen_data_fails(monkeypatch):
+    def fail(_):
+        raise ConnectionError("screen api down")
+
+    monkeypatch.setattr(contextor, "get_screen_data", fail)
+    monkeypatch.setattr(contextor, "focused_app_trackers", _trackers(_slow(None, 0)))
+    monkeypatch.setattr(contextor, "device_info_service", Mock(get_device_date=_slow("date", 0)))
+
+    with pytest.raises(ConnectionError):
+        await ContextorNode(Mock(metrics=TaskMetrics()))(_state())
+
+
+@pytest.mark.asyncio
+async def test_contextor_raises_when_screen_data_is_missing(monkeypatch):
+    monkeypatch.setattr(contextor, "get_screen_data", _slow(None, 0))
+    monkeypatch.setattr(contextor, "focused_app_trackers", _trackers(_slow(None, 0)))
+    monkeypatch.setattr(contextor, "device_info_service", Mock(get_device_date=_slow("date", 0)))
+
+    with pytest.raises(RuntimeError):
+        await ContextorNode(Mock(metrics=TaskMetrics()))(_state())
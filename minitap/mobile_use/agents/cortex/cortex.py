@@ -1,8 +1,6 @@
-import asyncio
 import json
-from pathlib import Path
+import uuid
 
-from jinja2 import Template
 from langchain_core.messages import (
     AIMessage,
     HumanMessage,
@@ -10,21 +8,33 @@ from langchain_core.messages import (
     SystemMessage,
     ToolMessage,
 )
+from langchain_core.messages.tool import ToolCall
 from langgraph.graph.message import REMOVE_ALL_MESSAGES
+from pydantic import ValidationError
 
-from minitap.mobile_use.agents.cortex.types import CortexOutput
+from minitap.mobile_use.agents.cortex.types import CortexOutput, CortexToolCall
 from minitap.mobile_use.agents.planner.utils import get_current_subgoal
 from minitap.mobile_use.constants import EXECUTOR_MESSAGES_KEY
 from minitap.mobile_use.context import MobileUseContext
 from minitap.mobile_use.graph.state import State
 from minitap.mobile_use.services.llm import (
+    get_hedging_policy,
     get_llm_with_structured_output,
+    invoke_llm,
+    with_cache_breakpoints,
     with_fallback,
+    with_retry,
+)
+from minitap.mobile_use.tools.index import (
+    EXECUTOR_WRAPPERS_TOOLS,
+    format_tools_list,
+    format_tools_signatures,
+    get_tools_from_wrappers,
 )
-from minitap.mobile_use.tools.index import EXECUTOR_WRAPPERS_TOOLS, format_tools_list
 from minitap.mobile_use.utils.conversations import get_screenshot_message_for_llm
 from minitap.mobile_use.utils.decorators import wrap_with_callbacks
 from minitap.mobile_use.utils.logger import get_logger
+from minitap.mobile_use.utils.prompts import prompt_registry
 
 logger = get_logger(__name__)
 
@@ -41,34 +51,47 @@ class CortexNode:
     async def __call__(self, state: State):
         executor_feedback = get_executor_agent_feedback(state)
 
-        system_message = Template(
-            Path(__file__).parent.joinpath("cortex.md").read_text(encoding="utf-8")
-        ).render(
-            platform=self.ctx.device.mobile_platform.value,
-            initial_goal=state.initial_goal,
-            subgoal_plan=state.subgoal_plan,
-            current_subgoal=get_current_subgoal(state.subgoal_plan),
-            executor_feedback=executor_feedback,
-            executor_tools_list=format_tools_list(ctx=self.ctx, wrappers=EXECUTOR_WRAPPERS_TOOLS),
-        )
+        # Messages are ordered from the most stable to the most volatile content, so that
+        # the prompt prefix stays the same across steps and hits the provider prompt cache:
+        # instructions, device info and goal, then the (append-only) agent thoughts,
+        # then the current plan, feedback and screen.
         messages = [
-            SystemMessage(content=system_message),
-            HumanMessage(
-                content=(
-                    "Here are my device info:\n"
-                    + self.ctx.device.to_str()
-                    + f"Device date: {state.device_date}\n"
-                    if state.device_date
-                    else (
-                        "" + f"Focused app info: {state.focused_app_info}\n"
-                        if state.focused_app_info
-                        else ""
-                    )
+            SystemMessage(
+                content=prompt_registry.render_with_static(
+                    "cortex/cortex.md",
+                    static={
+                        "platform": self.ctx.device.mobile_platform.value,
+                        "executor_tools_list": format_tools_list(
+                            ctx=self.ctx, wrappers=EXECUTOR_WRAPPERS_TOOLS
+                        ),
+                        "executor_tools_signatures": format_tools_signatures(
+                            ctx=self.ctx, wrappers=EXECUTOR_WRAPPERS_TOOLS
+                        ),
+                    },
                 )
             ),
+            HumanMessage(
+                content="Here are my device info:\n"
+                + self.ctx.device.to_str()
+                + f"\n**Initial Goal:**\n{state.initial_goal}"
+            ),
         ]
         for thought in state.agents_thoughts:
             messages.append(AIMessage(content=thought))
+        cache_breakpoints = sorted({1, len(messages) - 1})
+
+        messages.append(
+            HumanMessage(
+                content=prompt_registry.render(
+                    "cortex/human.md",
+                    subgoal_plan=state.subgoal_plan,
+                    current_subgoal=get_current_subgoal(state.subgoal_plan),
+                    executor_feedback=executor_feedback,
+                    device_date=state.device_date,
+                    focused_app_info=state.focused_app_info,
+                )
+            )
+        )
 
         if state.latest_screenshot_base64:
             messages.append(get_screenshot_message_for_llm(state.latest_screenshot_base64))
@@ -89,33 +112,31 @@ class CortexNode:
             use_fallback=True,
             temperature=1,
         )
+        llm_cfg = self.ctx.llm_config.cortex
+        hedging = get_hedging_policy(ctx=self.ctx, name="cortex")
 
-        # Retry logic with fallback for LLM errors
-        max_retries = 3
-        retry_delay = 2
-        last_error = None
-
-        for attempt in range(max_retries):
-            try:
-                response: CortexOutput = await with_fallback(
-                    main_call=lambda: llm.ainvoke(messages),
-                    fallback_call=lambda: llm_fallback.ainvoke(messages),
-                )  # type: ignore
-                break
-            except Exception as e:
-                last_error = e
-                error_msg = str(e)
-                logger.warning(
-                    f"Cortex LLM call failed (attempt {attempt + 1}/{max_retries}): {error_msg}"
-                )
-
-                if attempt < max_retries - 1:
-                    wait_time = retry_delay * (2**attempt)
-                    logger.info(f"Retrying in {wait_time} seconds...")
-                    await asyncio.sleep(wait_time)
-                else:
-                    logger.error(f"Cortex failed after {max_retries} attempts")
-                    raise last_error from None
+        response: CortexOutput = await with_retry(
+            ctx=self.ctx,
+            name="cortex",
+            call=lambda: with_fallback(
+                main_call=lambda: invoke_llm(
+                    ctx=self.ctx,
+                    name="cortex",
+                    llm=llm,
+                    messages=with_cache_breakpoints(llm_cfg, messages, cache_breakpoints),
+                    schema=CortexOutput,
+                ),
+                fallback_call=lambda: invoke_llm(
+                    ctx=self.ctx,
+                    name="cortex",
+                    llm=llm_fallback,
+                    messages=with_cache_breakpoints(llm_cfg.fallback, messages, cache_breakpoints),
+                    use_fallback=True,
+                    schema=CortexOutput,
+                ),
+                hedging=hedging,
+            ),
+        )  # type: ignore
 
         is_subgoal_completed = (
             response.complete_subgoals_by_ids is not None
@@ -125,6 +146,17 @@ class CortexNode:
         if not is_subgoal_completed:
             response.complete_subgoals_by_ids = []
 
+        # Executor messages are reset, then hold the cortex tool calls when they can be run
+        # directly, skipping the executor (see `post_cortex_gate`)
+        executor_messages: list = [RemoveMessage(id=REMOVE_ALL_MESSAGES)]
+        if not is_subgoal_completed and response.tool_calls:
+            tool_calls = get_direct_tool_calls(
+                ctx=self.ctx, tool_calls=response.tool_calls, agent_thought=response.agent_thought
+            )
+            if tool_calls is not None:
+                logger.info(f"Dispatching {len(tool_calls)} tool call(s) without the executor")
+                executor_messages.append(AIMessage(content="", tool_calls=tool_calls))
+
         return state.sanitize_update(
             ctx=self.ctx,
             update={
@@ -136,13 +168,43 @@ class CortexNode:
                 "focused_app_info": None,
                 "device_date": None,
                 # Executor related fields
-                EXECUTOR_MESSAGES_KEY: [RemoveMessage(id=REMOVE_ALL_MESSAGES)],
+                EXECUTOR_MESSAGES_KEY: executor_messages,
                 "cortex_last_thought": response.agent_thought,
             },
             agent="cortex",
         )
 
 
+def get_direct_tool_calls(
+    ctx: MobileUseContext, tool_calls: list[CortexToolCall], agent_thought: str
+) -> list[ToolCall] | None:
+    """
+    Validates the cortex tool calls against the executor tools.
+    Returns None if any of them is invalid: the decisions then go through the executor.
+    """
+    tools = {tool.name: tool for tool in get_tools_from_wrappers(ctx, EXECUTOR_WRAPPERS_TOOLS)}
+    validated: list[ToolCall] = []
+    for call in tool_calls:
+        tool = tools.get(call.name)
+        if tool is None:
+            logger.warning(f"Unknown tool `{call.name}` in the cortex tool calls")
+            return None
+        try:
+            args = json.loads(call.arguments) if call.arguments.strip() else {}
+            if not isinstance(args, dict):
+                raise ValueError("the arguments must be a JSON object")
+            if "agent_thought" in tool.tool_call_schema.model_fields:
+                args.setdefault("agent_thought", agent_thought)
+            tool.tool_call_schema.model_validate(args)
+        except (ValueError, ValidationError) as e:
+            logger.warning(f"Invalid arguments for `{call.name}` in the cortex tool calls: {e}")
+            return None
+        validated.append(
+            ToolCall(name=call.name, args=args, id=f"call_{uuid.uuid4().hex}", type="tool_call")
+        )
+    return validated
+
+
 def get_executor_agent_feedback(state: State) -> str:
     if state.structured_decisions is None:
         return "None."
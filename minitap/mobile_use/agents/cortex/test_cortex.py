@@ -0,0 +1,40 @@
+import json
+
+from minitap.mobile_use.agents.cortex.cortex import get_direct_tool_calls
+from minitap.mobile_use.agents.cortex.types import CortexToolCall
+
+
+def _call(name: str, **arguments) -> CortexToolCall:
+    return CortexToolCall(name=name, arguments=json.dumps(arguments))
+
+
+def test_valid_tool_calls_are_dispatched_with_the_agent_thought(make_mock_context):
+    tool_calls = get_direct_tool_calls(
+        ctx=make_mock_context(),
+        tool_calls=[
+            _call("open_link", url="https://example.com"),
+            _call("wait_for_element", target={"text": "Example Domain"}, timeout_seconds=5),
+        ],
+        agent_thought="Opening the example page.",
+    )
+
+    assert tool_calls is not None
+    assert [call["name"] for call in tool_calls] == ["open_link", "wait_for_element"]
+    assert tool_calls[0]["args"] == {
+        "url": "https://example.com",
+        "agent_thought": "Opening the example page.",
+    }
+    assert len({call["id"] for call in tool_calls}) == 2
+
+
+def test_any_invalid_tool_call_falls_back_to_the_executor(make_mock_context):
+    valid = _call("open_link", url="https://example.com")
+    for invalid in (
+        _call("fly_away"),
+        _call("open_link"),
+        CortexToolCall(name="open_link", arguments="not json"),
+        CortexToolCall(name="open_link", arguments="[]"),
+    ):
+        assert (
+            get_direct_tool_calls(make_mock_context(), [valid, invalid], agent_thought="") is None
+        )
@@ -1,9 +1,22 @@
 from pydantic import BaseModel, Field
 
 
+class CortexToolCall(BaseModel):
+    name: str = Field(..., description="Name of an executor tool")
+    arguments: str = Field(
+        ..., description="The tool arguments. A stringified JSON object matching its schema"
+    )
+
+
 class CortexOutput(BaseModel):
     decisions: str = Field(..., description="The decisions to be made. A stringified JSON object")
     agent_thought: str = Field(..., description="The agent's thought")
     complete_subgoals_by_ids: list[str] | None = Field(
         [], description="List of subgoal IDs to complete"
     )
+    tool_calls: list[CortexToolCall] | None = Field(
+        None,
+        description=(
+            "Optional: the decisions as executor tool calls, run in order without the executor"
+        ),
+    )
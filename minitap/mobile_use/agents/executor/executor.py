@@ -1,20 +1,17 @@
-from pathlib import Path
-
-from jinja2 import Template
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_google_vertexai.chat_models import ChatVertexAI
 
 from minitap.mobile_use.constants import EXECUTOR_MESSAGES_KEY
 from minitap.mobile_use.context import MobileUseContext
 from minitap.mobile_use.graph.state import State
-from minitap.mobile_use.services.llm import get_llm
+from minitap.mobile_use.services.llm import get_llm_with_tools, invoke_llm
 from minitap.mobile_use.tools.index import (
     EXECUTOR_WRAPPERS_TOOLS,
+    get_tool_schemas,
     get_tools_from_wrappers,
 )
 from minitap.mobile_use.utils.decorators import wrap_with_callbacks
 from minitap.mobile_use.utils.logger import get_logger
+from minitap.mobile_use.utils.prompts import prompt_registry
 
 logger = get_logger(__name__)
 
@@ -42,9 +39,10 @@ class ExecutorNode:
                 agent="executor",
             )
 
-        system_message = Template(
-            Path(__file__).parent.joinpath("executor.md").read_text(encoding="utf-8")
-        ).render(platform=self.ctx.device.mobile_platform.value)
+        system_message = prompt_registry.render_with_static(
+            "executor/executor.md",
+            static={"platform": self.ctx.device.mobile_platform.value},
+        )
         cortex_last_thought = (
             state.cortex_last_thought if state.cortex_last_thought else state.agents_thoughts[-1]
         )
@@ -55,17 +53,11 @@ class ExecutorNode:
             *state.executor_messages,
         ]
 
-        llm = get_llm(ctx=self.ctx, name="executor")
-        llm_bind_tools_kwargs: dict = {
-            "tools": get_tools_from_wrappers(self.ctx, EXECUTOR_WRAPPERS_TOOLS),
-        }
-
-        # ChatGoogleGenerativeAI does not support the "parallel_tool_calls" keyword
-        if not isinstance(llm, ChatGoogleGenerativeAI | ChatVertexAI):
-            llm_bind_tools_kwargs["parallel_tool_calls"] = True
-
-        llm = llm.bind_tools(**llm_bind_tools_kwargs)
-        response = await llm.ainvoke(messages)
+        tools = get_tools_from_wrappers(self.ctx, EXECUTOR_WRAPPERS_TOOLS)
+        llm = get_llm_with_tools(
+            ctx=self.ctx, name="executor", tools=tools, tool_schemas=get_tool_schemas(tools)
+        )
+        response = await invoke_llm(ctx=self.ctx, name="executor", llm=llm, messages=messages)
 
         return state.sanitize_update(
             ctx=self.ctx,
@@ -0,0 +1,98 @@
+import asyncio
+from unittest.mock import patch
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import tool
+from langgraph.types import Command
+
+from minitap.mobile_use.agents.executor.tool_node import ExecutorToolNode
+from minitap.mobile_use.tools.mobile.wait_for_element import frame_barrier
+
+
+@tool
+def tap(agent_thought: str) -> str:
+    """Taps."""
+    return "tapped"
+
+
+@tool
+def wait_for_element(agent_thought: str) -> str:
+    """Waits for an element."""
+    return f"element on screen, after frame {frame_barrier.get()}"
+
+
+@tool
+def input_text(agent_thought: str) -> str:
+    """Types."""
+    return "typed"
+
+
+def _run_script(failing_tool: str | None) -> tuple[list[ToolMessage], list[tuple]]:
+    node = ExecutorToolNode(tools=[tap, wait_for_element, input_text])
+    names = ["tap", "wait_for_element", "input_text"]
+    message = AIMessage(
+        content="",
+        tool_calls=[
+            {"name": name, "args": {"agent_thought": ""}, "id": f"call_{i}"}
+            for i, name in enumerate(names)
+        ],
+    )
+    runs = []
+
+    async def run_call(is_async, call, input_type, config):
+        runs.append((call["name"], frame_barrier.get()))
+        failed = call["name"] == failing_tool
+        output = ToolMessage(
+            name=call["name"],
+            tool_call_id=call["id"],
+            content="failed" if failed else "ok",
+            status="error" if failed else "success",
+        )
+        return output, failed
+
+    with (
+        patch.object(node, "_run_call", side_effect=run_call),
+        patch.object(node, "_get_frame_version", side_effect=[7, 8]),
+    ):
+        result = asyncio.run(node.ainvoke({"messages": [message]}))
+    # Aborted calls are Commands, in which case the outputs aren't merged in a single update
+    updates = result if isinstance(result, list) else [result]
+    messages = [
+        message
+        for update in updates
+        for message in (update.update if isinstance(update, Command) else update)["messages"]
+    ]
+    return messages, runs
+
+
+def test_actions_of_a_guarded_script_set_the_frame_barrier():
+    messages, runs = _run_script(failing_tool=None)
+
+    # The barrier is read once each action has returned
+    assert runs == [("tap", None), ("wait_for_element", 7), ("input_text", 7)]
+    assert [message.status for message in messages] == ["success"] * 3
+    assert frame_barrier.get() is None
+
+
+def test_failed_guard_aborts_the_rest_of_the_script():
+    messages, runs = _run_script(failing_tool="wait_for_element")
+
+    assert [name for name, _ in runs] == ["tap", "wait_for_element"]
+    assert messages[-1].status == "error"
+    assert "guard `wait_for_element` of step 2 failed" in messages[-1].content
+
+
+def test_guards_run_by_the_tool_node_see_the_frame_barrier():
+    node = ExecutorToolNode(tools=[tap, wait_for_element])
+    message = AIMessage(
+        content="",
+        tool_calls=[
+            {"name": "tap", "args": {"agent_thought": ""}, "id": "call_0"},
+            {"name": "wait_for_element", "args": {"agent_thought": ""}, "id": "call_1"},
+        ],
+    )
+
+    with patch.object(node, "_get_frame_version", return_value=7):
+        result = asyncio.run(node.ainvoke({"messages": [message]}))
+
+    assert result["messages"][-1].content == "element on screen, after frame 7"
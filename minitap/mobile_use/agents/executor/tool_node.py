@@ -8,11 +8,22 @@ from langgraph.store.base import BaseStore
 from langgraph.types import Command
 from pydantic import BaseModel
 
+from minitap.mobile_use.context import RUNTIME_CONTEXT
+from minitap.mobile_use.controllers.mobile_command_controller import get_screen_elements
+from minitap.mobile_use.tools.mobile.wait_for_element import GUARD_TOOL_NAMES, frame_barrier
+from minitap.mobile_use.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
 
 class ExecutorToolNode(ToolNode):
     """
     ToolNode that runs tool calls one after the other - not simultaneously.
     If one error occurs, the remaining tool calls are aborted!
+
+    The tool calls form an open-loop script: actions can be followed by guards (tools waiting
+    for an element to appear or be gone on the fresh screen frames), which are its local
+    postconditions. The script runs without the LLM until its end or its first failed guard.
     """
 
     @override
@@ -49,27 +60,55 @@ class ExecutorToolNode(ToolNode):
         tool_calls, input_type = self._parse_input(input, store)
         outputs: list[Command | ToolMessage] = []
         failed = False
-        for call in tool_calls:
-            if failed:
-                output = self._get_erroneous_command(
-                    call=call,
-                    message="Aborted: a previous tool call failed!",
-                )
-            else:
-                if is_async:
-                    output = await self._arun_one(call, input_type, config)
-                else:
-                    output = self._run_one(call, input_type, config)
-                failed = self._has_tool_call_failed(call, output)
-                if failed is None:
-                    output = self._get_erroneous_command(
-                        call=call,
-                        message=f"Unexpected tool output type: {type(output)}",
+        abort_message = "Aborted: a previous tool call failed!"
+        has_guards = any(call["name"] in GUARD_TOOL_NAMES for call in tool_calls)
+        barrier_token = frame_barrier.set(None)
+        try:
+            for step, call in enumerate(tool_calls, start=1):
+                if failed:
+                    output = self._get_erroneous_command(call=call, message=abort_message)
+                    outputs.append(output)
+                    continue
+                output, failed = await self._run_call(is_async, call, input_type, config)
+                if has_guards and call["name"] not in GUARD_TOOL_NAMES:
+                    # Read once the action has returned: frames pushed while it was running
+                    # may still show the screen preceding it
+                    frame_barrier.set(await asyncio.to_thread(self._get_frame_version))
+                if failed and call["name"] in GUARD_TOOL_NAMES:
+                    logger.info(f"Guard {step}/{len(tool_calls)} failed, stopping the script")
+                    abort_message = (
+                        f"Aborted: the guard `{call['name']}` of step {step} failed, "
+                        "the screen isn't in the expected state."
                     )
-                    failed = True
-            outputs.append(output)
+                outputs.append(output)
+        finally:
+            frame_barrier.reset(barrier_token)
         return self._combine_tool_outputs(outputs, input_type)  # type: ignore
 
+    async def _run_call(
+        self, is_async: bool, call: ToolCall, input_type, config: RunnableConfig
+    ) -> tuple[Command | ToolMessage, bool]:
+        if is_async:
+            output = await self._arun_one(call, input_type, config)
+        else:
+            output = self._run_one(call, input_type, config)
+        failed = self._has_tool_call_failed(call, output)
+        if failed is None:
+            output = self._get_erroneous_command(
+                call=call,
+                message=f"Unexpected tool output type: {type(output)}",
+            )
+            failed = True
+        return output, failed
+
+    def _get_frame_version(self) -> int | None:
+        """Version of the latest screen frame, None if the screen API can't be reached."""
+        try:
+            return get_screen_elements(RUNTIME_CONTEXT.screen_api_client).version
+        except Exception as e:
+            logger.warning(f"Unable to get the latest frame version: {e}")
+            return None
+
     def _has_tool_call_failed(
         self,
         call: ToolCall,
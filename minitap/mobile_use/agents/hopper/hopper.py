@@ -1,11 +1,27 @@
-from pathlib import Path
+import asyncio
 
-from jinja2 import Template
 from langchain_core.messages import HumanMessage, SystemMessage
 from pydantic import BaseModel, Field
 
 from minitap.mobile_use.context import MobileUseContext
-from minitap.mobile_use.services.llm import get_llm
+from minitap.mobile_use.services.llm import (
+    CHARS_PER_TOKEN,
+    get_context_window,
+    get_llm_with_structured_output,
+    invoke_llm,
+)
+from minitap.mobile_use.utils.logger import get_logger
+from minitap.mobile_use.utils.prompts import prompt_registry
+
+logger = get_logger(__name__)
+
+# Share of the model context window given to the data of one request, leaving room for
+# the prompt and the output
+CHUNK_CONTEXT_SHARE = 0.25
+# Large context windows still get several chunks, extracted concurrently
+MAX_CHUNK_TOKENS = 32_000
+MIN_CHUNK_TOKENS = 1_000
+MAX_CONCURRENT_CHUNKS = 8
 
 
 class HopperOutput(BaseModel):
@@ -23,18 +39,102 @@ async def hopper(
     request: str,
     data: str,
 ) -> HopperOutput:
-    print("Starting Hopper Agent", flush=True)
-    system_message = Template(
-        Path(__file__).parent.joinpath("hopper.md").read_text(encoding="utf-8")
-    ).render()
+    """
+    Extracts the data relevant to the request. Data too large for one request is split into
+    chunks extracted concurrently (map), whose extracts are merged by a last request (reduce).
+    Extracts still too large for one request are merged the same way.
+    """
+    max_tokens = get_chunk_tokens(ctx)
+    chunks = split_data(data, max_tokens=max_tokens)
+    if len(chunks) <= 1:
+        logger.info("Starting Hopper Agent")
+        return await _extract(ctx, request=request, data=data)
+
+    logger.info(f"Starting Hopper Agent over {len(chunks)} chunks")
+    reduce_request = (
+        f"{request}\nThe data was too large to be read at once: it was split into "
+        "chunks, and here is what was extracted from each of them. "
+        "Merge them into a single output."
+    )
+    while True:
+        partials = await _extract_chunks(ctx, request=request, chunks=chunks)
+        extracts = "\n\n".join(
+            f"Extract {i}/{len(partials)} ({partial.step}):\n{partial.output}"
+            for i, partial in enumerate(partials, start=1)
+            if partial.output.strip()
+        )
+        if not extracts:
+            logger.info("No chunk held relevant data, skipping the reduce request")
+            return HopperOutput(step=partials[-1].step, output="")
+        next_chunks = split_data(extracts, max_tokens=max_tokens)
+        if len(next_chunks) <= 1:
+            return await _extract(ctx, request=reduce_request, data=extracts)
+        if len(next_chunks) >= len(chunks):
+            # The extracts don't shrink, only the ones fitting in a request are merged
+            logger.warning("The chunk extracts don't shrink, merging the first ones only")
+            return await _extract(ctx, request=reduce_request, data=next_chunks[0])
+        logger.info(f"Merging the extracts over {len(next_chunks)} chunks")
+        request, chunks = reduce_request, next_chunks
+
+
+async def _extract_chunks(
+    ctx: MobileUseContext, request: str, chunks: list[str]
+) -> list[HopperOutput]:
+    slots = asyncio.Semaphore(MAX_CONCURRENT_CHUNKS)
+
+    async def extract_chunk(chunk: str) -> HopperOutput:
+        async with slots:
+            return await _extract(ctx, request=request, data=chunk)
+
+    return await asyncio.gather(*(extract_chunk(chunk) for chunk in chunks))
+
+
+def get_chunk_tokens(ctx: MobileUseContext) -> int:
+    context_window = get_context_window(ctx.llm_config.get_utils("hopper"))
+    return max(MIN_CHUNK_TOKENS, min(MAX_CHUNK_TOKENS, int(context_window * CHUNK_CONTEXT_SHARE)))
+
+
+def split_data(data: str, max_tokens: int) -> list[str]:
+    """Splits the data on line boundaries into chunks of at most `max_tokens` (estimated)."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(data) <= max_chars:
+        return [data]
+
+    chunks: list[str] = []
+    current: list[str] = []
+    current_size = 0
+    for line in data.splitlines(keepends=True):
+        # Lines longer than a chunk are cut
+        pieces = [line[i : i + max_chars] for i in range(0, len(line), max_chars)]
+        for piece in pieces:
+            if current_size + len(piece) > max_chars and current:
+                chunks.append("".join(current))
+                current, current_size = [], 0
+            current.append(piece)
+            current_size += len(piece)
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+async def _extract(ctx: MobileUseContext, request: str, data: str) -> HopperOutput:
+    system_message = prompt_registry.render("hopper/hopper.md")
     messages = [
         SystemMessage(content=system_message),
         HumanMessage(content=f"{request}\nHere is the data you must dig:\n{data}"),
     ]
 
-    llm = get_llm(ctx=ctx, name="hopper", is_utils=True, temperature=0)
-    structured_llm = llm.with_structured_output(HopperOutput)
-    response: HopperOutput = await structured_llm.ainvoke(messages)  # type: ignore
+    structured_llm = get_llm_with_structured_output(
+        ctx=ctx, name="hopper", schema=HopperOutput, is_utils=True, temperature=0
+    )
+    response: HopperOutput = await invoke_llm(
+        ctx=ctx,
+        name="hopper",
+        llm=structured_llm,
+        messages=messages,
+        is_utils=True,
+        schema=HopperOutput,
+    )  # type: ignore
     return HopperOutput(
         step=response.step,
         output=response.output,
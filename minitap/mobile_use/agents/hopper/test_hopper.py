@@ -0,0 +1,116 @@
+import asyncio
+from unittest.mock import Mock
+
+from minitap.mobile_use.agents.hopper import hopper as hopper_module
+from minitap.mobile_use.agents.hopper.hopper import (
+    MIN_CHUNK_TOKENS,
+    HopperOutput,
+    get_chunk_tokens,
+    hopper,
+    split_data,
+)
+from minitap.mobile_use.config import LLM
+from minitap.mobile_use.services.llm import CHARS_PER_TOKEN
+
+
+def _llm(context_window: int) -> LLM:
+    return LLM(provider="openai", model="custom", context_window=context_window)
+
+
+def test_split_data_keeps_lines_whole_and_cuts_long_lines():
+    lines = [f"package:com.example.app{i}\n" for i in range(100)]
+    chunks = split_data("".join(lines), max_tokens=100)
+
+    assert len(chunks) > 1
+    assert "".join(chunks) == "".join(lines)
+    assert all(len(chunk) <= 100 * CHARS_PER_TOKEN for chunk in chunks)
+    assert all(chunk.endswith("\n") for chunk in chunks)
+
+    long_line = "x" * 1000
+    assert split_data(long_line, max_tokens=100) == [long_line[:400], long_line[400:800], "x" * 200]
+
+
+def test_chunk_size_follows_the_context_window(make_mock_context):
+    assert get_chunk_tokens(make_mock_context(_llm(16_000))) == 4_000
+    assert get_chunk_tokens(make_mock_context(_llm(1_000))) == MIN_CHUNK_TOKENS
+    assert get_chunk_tokens(make_mock_context(_llm(1_000_000))) == hopper_module.MAX_CHUNK_TOKENS
+
+
+def test_large_data_is_mapped_over_chunks_then_reduced(monkeypatch, make_mock_context):
+    requests: list[str] = []
+
+    async def invoke_llm(ctx, name, llm, messages, is_utils, schema):
+        content = messages[-1].content
+        requests.append(content)
+        if "Merge them" in content:
+            return HopperOutput(step="merged", output="com.example.app42")
+        found = "com.example.app42" if "com.example.app42\n" in content else ""
+        return HopperOutput(step="searched", output=found)
+
+    monkeypatch.setattr(hopper_module, "invoke_llm", invoke_llm)
+    monkeypatch.setattr(hopper_module, "get_llm_with_structured_output", Mock())
+    data = "".join(f"package:com.example.app{i}\n" for i in range(2000))
+
+    output = asyncio.run(hopper(make_mock_context(_llm(16_000)), request="Find app42", data=data))
+
+    assert output == HopperOutput(step="merged", output="com.example.app42")
+    # The map requests, then the reduce request with the non-empty extracts only
+    assert len(requests) == len(split_data(data, max_tokens=4_000)) + 1
+    assert requests[-1].count("Extract ") == 1
+
+
+def test_small_data_is_extracted_in_one_request(monkeypatch, make_mock_context):
+    invoke_llm = Mock(return_value=HopperOutput(step="searched", output="com.whatsapp"))
+
+    async def ainvoke_llm(**kwargs):
+        return invoke_llm(**kwargs)
+
+    monkeypatch.setattr(hopper_module, "invoke_llm", ainvoke_llm)
+    monkeypatch.setattr(hopper_module, "get_llm_with_structured_output", Mock())
+
+    output = asyncio.run(
+        hopper(make_mock_context(_llm(16_000)), request="Find WhatsApp", data="com.whatsapp")
+    )
+
+    assert output.output == "com.whatsapp"
+    assert invoke_llm.call_count == 1
+
+
+def test_extracts_too_large_for_one_request_are_reduced_over_chunks(monkeypatch, make_mock_context):
+    data_sizes: list[int] = []
+    merge_requests: list[str] = []
+
+    async def invoke_llm(ctx, name, llm, messages, is_utils, schema):
+        content = messages[-1].content
+        data_sizes.append(len(content.split("Here is the data you must dig:\n", 1)[1]))
+        if "Merge them" in content:
+            merge_requests.append(content)
+            return HopperOutput(step="merged", output="com.example.app42")
+        return HopperOutput(step="searched", output="com.example.app42 " * 60)
+
+    monkeypatch.setattr(hopper_module, "invoke_llm", invoke_llm)
+    monkeypatch.setattr(hopper_module, "get_llm_with_structured_output", Mock())
+    data = "".join(f"package:com.example.app{i}\n" for i in range(2000))
+
+    output = asyncio.run(hopper(make_mock_context(_llm(4_000)), request="Find app42", data=data))
+
+    assert output.output == "com.example.app42"
+    assert all(size <= MIN_CHUNK_TOKENS * CHARS_PER_TOKEN for size in data_sizes)
+    # The extracts are merged over several chunks, then once more
+    assert len(merge_requests) > 2
+
+
+def test_reduce_request_is_skipped_when_no_chunk_has_relevant_data(monkeypatch, make_mock_context):
+    invoke_llm = Mock(return_value=HopperOutput(step="searched", output=" "))
+
+    async def ainvoke_llm(**kwargs):
+        return invoke_llm(**kwargs)
+
+    monkeypatch.setattr(hopper_module, "invoke_llm", ainvoke_llm)
+    monkeypatch.setattr(hopper_module, "get_llm_with_structured_output", Mock())
+    data = "".join(f"package:com.example.app{i}\n" for i in range(2000))
+
+    output = asyncio.run(hopper(make_mock_context(_llm(16_000)), request="Find Maps", data=data))
+
+    assert output.output == ""
+    assert invoke_llm.call_count == len(split_data(data, max_tokens=4_000))
@@ -1,7 +1,3 @@
-import asyncio
-from pathlib import Path
-
-from jinja2 import Template
 from langchain_core.messages import HumanMessage, SystemMessage
 
 from minitap.mobile_use.agents.orchestrator.types import OrchestratorOutput
@@ -16,9 +12,10 @@ from minitap.mobile_use.agents.planner.utils import (
 )
 from minitap.mobile_use.context import MobileUseContext
 from minitap.mobile_use.graph.state import State
-from minitap.mobile_use.services.llm import get_llm_with_structured_output
+from minitap.mobile_use.services.llm import get_llm_with_structured_output, invoke_llm, with_retry
 from minitap.mobile_use.utils.decorators import wrap_with_callbacks
 from minitap.mobile_use.utils.logger import get_logger
+from minitap.mobile_use.utils.prompts import prompt_registry
 
 logger = get_logger(__name__)
 
@@ -55,12 +52,12 @@ class OrchestratorNode:
         if len(subgoals_to_examine) <= 0:
             return _get_state_update(ctx=self.ctx, state=state, thoughts=["No subgoal to examine."])
 
-        system_message = Template(
-            Path(__file__).parent.joinpath("orchestrator.md").read_text(encoding="utf-8")
-        ).render(platform=self.ctx.device.mobile_platform.value)
-        human_message = Template(
-            Path(__file__).parent.joinpath("human.md").read_text(encoding="utf-8")
-        ).render(
+        system_message = prompt_registry.render_with_static(
+            "orchestrator/orchestrator.md",
+            static={"platform": self.ctx.device.mobile_platform.value},
+        )
+        human_message = prompt_registry.render(
+            "orchestrator/human.md",
             initial_goal=state.initial_goal,
             subgoal_plan="\n".join(str(s) for s in state.subgoal_plan),
             subgoals_to_examine="\n".join(str(s) for s in subgoals_to_examine),
@@ -75,29 +72,17 @@ class OrchestratorNode:
             ctx=self.ctx, name="orchestrator", schema=OrchestratorOutput, temperature=1
         )
 
-        # Retry logic for LLM errors
-        max_retries = 3
-        retry_delay = 2
-        last_error = None
-
-        for attempt in range(max_retries):
-            try:
-                response: OrchestratorOutput = await llm.ainvoke(messages)  # type: ignore
-                break
-            except Exception as e:
-                last_error = e
-                error_msg = str(e)
-                logger.warning(
-                    f"Orchestrator LLM call failed (attempt {attempt + 1}/{max_retries}): {error_msg}"
-                )
-
-                if attempt < max_retries - 1:
-                    wait_time = retry_delay * (2**attempt)
-                    logger.info(f"Retrying in {wait_time} seconds...")
-                    await asyncio.sleep(wait_time)
-                else:
-                    logger.error(f"Orchestrator failed after {max_retries} attempts")
-                    raise last_error from None
+        response: OrchestratorOutput = await with_retry(
+            ctx=self.ctx,
+            name="orchestrator",
+            call=lambda: invoke_llm(
+                ctx=self.ctx,
+                name="orchestrator",
+                llm=llm,
+                messages=messages,
+                schema=OrchestratorOutput,
+            ),
+        )  # type: ignore
 
         if response.needs_replaning:
             thoughts = [response.reason]
@@ -1,16 +1,15 @@
 import json
-from pathlib import Path
 
-from jinja2 import Template
 from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 from pydantic import BaseModel
 
 from minitap.mobile_use.config import OutputConfig
 from minitap.mobile_use.context import MobileUseContext
 from minitap.mobile_use.graph.state import State
-from minitap.mobile_use.services.llm import get_llm
+from minitap.mobile_use.services.llm import get_llm, invoke_llm
 from minitap.mobile_use.utils.conversations import is_ai_message
 from minitap.mobile_use.utils.logger import get_logger
+from minitap.mobile_use.utils.prompts import prompt_registry
 
 logger = get_logger(__name__)
 
@@ -25,9 +24,8 @@ async def outputter(
         "You are a helpful assistant tasked with generating "
         + "the final structured output of a multi-agent reasoning process."
     )
-    human_message = Template(
-        Path(__file__).parent.joinpath("human.md").read_text(encoding="utf-8")
-    ).render(
+    human_message = prompt_registry.render(
+        "outputter/human.md",
         initial_goal=graph_output.initial_goal,
         agents_thoughts=graph_output.agents_thoughts,
         structured_output=output_config.structured_output,
@@ -47,9 +45,9 @@ async def outputter(
 
     llm = get_llm(ctx=ctx, name="outputter", is_utils=True, temperature=1)
     structured_llm = llm
+    schema: dict | type[BaseModel] | None = None
 
     if output_config.structured_output:
-        schema: dict | type[BaseModel] | None = None
         so = output_config.structured_output
 
         if isinstance(so, dict):
@@ -62,7 +60,14 @@ async def outputter(
         if schema is not None:
             structured_llm = llm.with_structured_output(schema)
 
-    response = await structured_llm.ainvoke(messages)  # type: ignore
+    response = await invoke_llm(
+        ctx=ctx,
+        name="outputter",
+        llm=structured_llm,
+        messages=messages,
+        is_utils=True,
+        schema=schema,
+    )  # type: ignore
     if isinstance(response, BaseModel):
         if output_config.output_description and hasattr(response, "content"):
             response = json.loads(response.content)  # type: ignore
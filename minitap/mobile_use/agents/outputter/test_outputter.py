@@ -12,7 +12,13 @@ sys.modules["langchain_openai"] = Mock()
 sys.modules["langchain_cerebras"] = Mock()
 
 from minitap.mobile_use.agents.outputter.outputter import outputter  # noqa: E402
-from minitap.mobile_use.config import LLM, OutputConfig  # noqa: E402
+from minitap.mobile_use.config import (  # noqa: E402
+    LLM,
+    LLMConfig,
+    LLMConfigUtils,
+    LLMWithFallback,
+    OutputConfig,
+)
 from minitap.mobile_use.context import MobileUseContext  # noqa: E402
 from minitap.mobile_use.utils.logger import get_logger  # noqa: E402
 
@@ -57,12 +63,20 @@ mocked_state = DummyState(
 def mock_context():
     """Create a properly mocked context with all required fields."""
     ctx = Mock(spec=MobileUseContext)
-    ctx.llm_config = {
-        "executor": LLM(provider="openai", model="gpt-5-nano"),
-        "cortex": LLM(provider="openai", model="gpt-5-nano"),
-        "planner": LLM(provider="openai", model="gpt-5-nano"),
-        "orchestrator": LLM(provider="openai", model="gpt-5-nano"),
-    }
+    ctx.llm_config = LLMConfig(
+        executor=LLM(provider="openai", model="gpt-5-nano"),
+        cortex=LLMWithFallback(
+            provider="openai",
+            model="gpt-5-nano",
+            fallback=LLM(provider="openai", model="gpt-5-mini"),
+        ),
+        planner=LLM(provider="openai", model="gpt-5-nano"),
+        orchestrator=LLM(provider="openai", model="gpt-5-nano"),
+        utils=LLMConfigUtils(
+            outputter=LLM(provider="openai", model="gpt-5-nano"),
+            hopper=LLM(provider="openai", model="gpt-5-nano"),
+        ),
+    )
     ctx.device = Mock()
     ctx.hw_bridge_client = Mock()
     ctx.screen_api_client = Mock()
@@ -42,6 +42,9 @@ class ScreenApiClient:
             f"Failed to get a valid response after {self.retry_count} attempts."
         )
 
+    def get(self, path: str, **kwargs):
+        return self.session.get(urljoin(self.base_url, path), **kwargs)
+
     def post(self, path: str, **kwargs):
         return self.session.post(urljoin(self.base_url, path), **kwargs)
 
@@ -31,6 +31,14 @@ class Settings(BaseSettings):
     ADB_HOST: str | None = None
     ADB_PORT: int | None = None
 
+    PROMPTS_HOT_RELOAD: bool = False
+    # Source of the rich UI hierarchy used by the tools: Maestro's last view hierarchy,
+    # or a `uiautomator` dump streamed over ADB (Android only)
+    HIERARCHY_SOURCE: Literal["maestro", "uiautomator"] = "maestro"
+    # Records every LLM response into this cassette file, to be replayed with the
+    # `replay` provider (`{"provider": "replay", "model": "<cassette path>"}`)
+    LLM_RECORD_CASSETTE: Path | None = None
+
     model_config = {"env_file": ".env", "extra": "ignore"}
 
 
@@ -90,7 +98,7 @@ def record_events(output_path: Path | None, events: list[str] | BaseModel | Any)
 
 ### LLM Configuration
 
-LLMProvider = Literal["openai", "google", "openrouter", "xai", "vertexai"]
+LLMProvider = Literal["openai", "google", "openrouter", "xai", "vertexai", "replay"]
 LLMUtilsNode = Literal["outputter", "hopper"]
 AgentNode = Literal["planner", "orchestrator", "cortex", "executor"]
 AgentNodeWithFallback = Literal["cortex"]
@@ -114,6 +122,8 @@ def validate_vertex_ai_credentials():
 class LLM(BaseModel):
     provider: LLMProvider
     model: str
+    # In tokens, defaults to the known context window of the model
+    context_window: int | None = Field(default=None, gt=0)
 
     def validate_provider(self, name: str):
         match self.provider:
@@ -131,16 +141,85 @@ class LLM(BaseModel):
             case "xai":
                 if not settings.XAI_API_KEY:
                     raise Exception(f"{name} requires XAI_API_KEY in .env")
+            case "replay":
+                if not Path(self.model).is_file():
+                    raise Exception(f"{name} replay cassette not found: {self.model}")
 
     def __str__(self):
         return f"{self.provider}/{self.model}"
 
 
+class HedgingConfig(BaseModel):
+    """
+    Hedged requests: when the main model has not answered after a latency threshold,
+    the fallback model is started concurrently and the first valid response wins.
+    The threshold is the `percentile` of the recently observed main model latencies,
+    clamped between `min_delay_seconds` and `max_delay_seconds`.
+    """
+
+    enabled: bool = True
+    percentile: float = Field(default=0.9, gt=0, le=1)
+    initial_delay_seconds: float = 10.0
+    min_delay_seconds: float = 1.0
+    max_delay_seconds: float = 60.0
+
+
 class LLMWithFallback(LLM):
     fallback: LLM
+    hedging: HedgingConfig | None = None
 
     def __str__(self):
-        return f"{self.provider}/{self.model} (fallback: {self.fallback})"
+        hedging = " (hedged)" if self.hedging and self.hedging.enabled else ""
+        return f"{self.provider}/{self.model} (fallback: {self.fallback}){hedging}"
+
+
+class RateLimitConfig(BaseModel):
+    """
+    Limits applied to every call made to a provider (`"openai"`) or to a single model of
+    a provider (`"openai/gpt-4.1"`), shared by every task running in the process.
+    """
+
+    max_concurrency: int | None = Field(default=None, ge=1)
+    requests_per_minute: float | None = Field(default=None, gt=0)
+    tokens_per_minute: float | None = Field(default=None, gt=0)
+
+
+class RetryConfig(BaseModel):
+    """
+    Retry policy of the agent LLM calls, and circuit breaker of the models having a fallback.
+
+    Rate limits, timeouts, 5xx and unparsable responses are retried with a jittered
+    exponential backoff (or the provider's Retry-After); other client errors are not.
+    After `circuit_breaker_threshold` consecutive failures, the main model is skipped in favor
+    of its fallback for `circuit_breaker_cooldown_seconds`.
+    """
+
+    max_attempts: int = Field(default=3, ge=1)
+    base_delay_seconds: float = Field(default=2.0, ge=0)
+    max_delay_seconds: float = Field(default=30.0, ge=0)
+    circuit_breaker_threshold: int = Field(default=3, ge=1)
+    circuit_breaker_cooldown_seconds: float = Field(default=60.0, ge=0)
+
+
+class ResponseCacheConfig(BaseModel):
+    """
+    Opt-in disk cache of LLM responses, keyed by a hash of the model, messages and
+    output schema. Only meant for deterministic calls (e.g. the hopper at temperature 0,
+    or the planner on the same goals in regression suites).
+    """
+
+    nodes: list[AgentNode | LLMUtilsNode] = Field(default_factory=list)
+    ttl_seconds: float = Field(default=7 * 24 * 3600, gt=0)
+    max_size_mb: float = Field(default=100, gt=0)
+    path: Path = Path.home() / ".cache" / "mobile-use" / "llm-responses.sqlite3"
+
+
+class ModelPricing(BaseModel):
+    """Prices in USD per million tokens, used to report the cost of a task."""
+
+    input: float = Field(ge=0)
+    output: float = Field(ge=0)
+    cached_input: float | None = Field(default=None, ge=0)
 
 
 class LLMConfigUtils(BaseModel):
@@ -154,6 +233,11 @@ class LLMConfig(BaseModel):
     cortex: LLMWithFallback
     executor: LLM
     utils: LLMConfigUtils
+    rate_limits: dict[str, RateLimitConfig] = Field(default_factory=dict)
+    retry: RetryConfig = Field(default_factory=RetryConfig)
+    response_cache: ResponseCacheConfig = Field(default_factory=ResponseCacheConfig)
+    # Keyed by "provider/model"
+    pricing: dict[str, ModelPricing] = Field(default_factory=dict)
 
     def validate_providers(self):
         self.planner.validate_provider("Planner")
@@ -209,7 +293,7 @@ def get_default_llm_config() -> LLMConfig:
 def deep_merge_llm_config(default: LLMConfig, override: dict) -> LLMConfig:
     def _deep_merge_dict(base: dict, extra: dict):
         for key, value in extra.items():
-            if isinstance(value, dict):
+            if isinstance(value, dict) and isinstance(base.get(key), dict):
                 _deep_merge_dict(base[key], value)
             else:
                 base[key] = value
@@ -0,0 +1,40 @@
+from collections.abc import Callable
+from unittest.mock import Mock
+
+import pytest
+
+from minitap.mobile_use.config import LLM, LLMConfig, LLMConfigUtils, LLMWithFallback
+from minitap.mobile_use.context import DevicePlatform
+
+
+@pytest.fixture
+def make_mock_context() -> Callable[..., Mock]:
+    """
+    Factory of mocked contexts on an Android emulator, whose LLMConfig uses `llm` for every
+    node (gpt-5-nano by default). Keyword arguments override LLMConfig fields.
+    """
+
+    def make(
+        llm: LLM | None = None,
+        platform: DevicePlatform = DevicePlatform.ANDROID,
+        **config,
+    ) -> Mock:
+        llm = llm or LLM(provider="openai", model="gpt-5-nano")
+        ctx = Mock()
+        ctx.device.device_id = "emulator-5554"
+        ctx.device.mobile_platform = platform
+        ctx.device.device_width = 1080
+        ctx.device.device_height = 1920
+        ctx.llm_config = LLMConfig(
+            **{
+                "planner": llm,
+                "orchestrator": llm,
+                "cortex": LLMWithFallback(provider=llm.provider, model=llm.model, fallback=llm),
+                "executor": llm,
+                "utils": LLMConfigUtils(outputter=llm, hopper=llm),
+                **config,
+            }
+        )
+        return ctx
+
+    return make
@@ -4,13 +4,14 @@ Context variables for global state management.
 Uses ContextVar to avoid prop drilling and maintain clean function signatures.
 """
 
+from contextvars import ContextVar, Token
 from enum import Enum
 from pathlib import Path
-from typing import Literal
+from typing import Literal, cast
 
 from adbutils import AdbClient
 from openai import BaseModel
-from pydantic import ConfigDict
+from pydantic import ConfigDict, Field
 
 from minitap.mobile_use.clients.device_hardware_client import DeviceHardwareClient
 from minitap.mobile_use.clients.screen_api_client import ScreenApiClient
@@ -48,6 +49,70 @@ class ExecutionSetup(BaseModel):
     trace_id: str
 
 
+class AgentNodeMetrics(BaseModel):
+    """Metrics of an agent node, accumulated over a task."""
+
+    llm_calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_tokens: int = 0
+    llm_seconds: float = 0.0
+    wall_seconds: float = 0.0
+    llm_retries: int = 0
+    llm_errors: dict[str, int] = Field(default_factory=dict)
+    fallbacks: int = 0
+    cost_usd: float | None = None
+
+
+class ContextSourceMetrics(BaseModel):
+    """Metrics of a source of device context gathered by the contextor, accumulated over a task."""
+
+    calls: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+    timeouts: int = 0
+    errors: int = 0
+
+
+class TaskMetrics(BaseModel):
+    steps: int = 0
+    nodes: dict[str, AgentNodeMetrics] = Field(default_factory=dict)
+    context_sources: dict[str, ContextSourceMetrics] = Field(default_factory=dict)
+
+    def get_node(self, name: str) -> AgentNodeMetrics:
+        return self.nodes.setdefault(name, AgentNodeMetrics())
+
+    def get_context_source(self, name: str) -> ContextSourceMetrics:
+        return self.context_sources.setdefault(name, ContextSourceMetrics())
+
+    def __str__(self):
+        lines = [f"Steps: {self.steps}"]
+        for name, node in sorted(self.nodes.items(), key=lambda n: -n[1].wall_seconds):
+            line = f"{name}: {node.wall_seconds:.1f}s"
+            if node.llm_calls:
+                line += (
+                    f", {node.llm_calls} LLM calls ({node.llm_seconds:.1f}s), "
+                    f"{node.input_tokens} in / {node.output_tokens} out / "
+                    f"{node.cached_tokens} cached tokens"
+                )
+            if node.llm_retries or node.fallbacks:
+                line += f", {node.llm_retries} retries, {node.fallbacks} fallbacks"
+            if node.cost_usd is not None:
+                line += f", ${node.cost_usd:.4f}"
+            lines.append(line)
+        for name, source in sorted(self.context_sources.items()):
+            if not source.calls:
+                continue
+            line = (
+                f"{name} (context): {source.calls} calls, "
+                f"{source.seconds / source.calls:.2f}s avg / {source.max_seconds:.2f}s max"
+            )
+            if source.timeouts or source.errors:
+                line += f", {source.timeouts} timeouts, {source.errors} errors"
+            lines.append(line)
+        return "\n".join(lines)
+
+
 class MobileUseContext(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
@@ -57,8 +122,44 @@ class MobileUseContext(BaseModel):
     llm_config: LLMConfig
     adb_client: AdbClient | None = None
     execution_setup: ExecutionSetup | None = None
+    metrics: TaskMetrics = Field(default_factory=TaskMetrics)
 
     def get_adb_client(self) -> AdbClient:
         if self.adb_client is None:
             raise ValueError("No ADB client in context.")
         return self.adb_client  # type: ignore
+
+
+_current_context: ContextVar[MobileUseContext | None] = ContextVar(
+    "mobile_use_context", default=None
+)
+
+
+def set_current_context(ctx: MobileUseContext) -> Token:
+    return _current_context.set(ctx)
+
+
+def reset_current_context(token: Token) -> None:
+    _current_context.reset(token)
+
+
+def get_current_context() -> MobileUseContext:
+    ctx = _current_context.get()
+    if ctx is None:
+        raise RuntimeError("No mobile-use context set for the current task.")
+    return ctx
+
+
+class _RuntimeContext:
+    """Resolves every attribute on the context of the task running in the current context."""
+
+    def __getattr__(self, name: str):
+        return getattr(get_current_context(), name)
+
+    def __repr__(self):
+        return "RuntimeContext()"
+
+
+# Stands for the context of the running task in the objects shared between tasks
+# (compiled graphs, tools), so that they can be built once and reused.
+RUNTIME_CONTEXT = cast(MobileUseContext, _RuntimeContext())
@@ -33,6 +33,37 @@ def get_screen_data(screen_api_client: ScreenApiClient):
     return ScreenDataResponse(**response.json())
 
 
+# Time given to the screen API to answer a long poll once its timeout is over
+_LONG_POLL_MARGIN_SECONDS = 2.0
+
+
+class ScreenElementsResponse(BaseModel):
+    version: int
+    elements: list
+    width: int
+    height: int
+    platform: str
+
+
+def get_screen_elements(
+    screen_api_client: ScreenApiClient, after_version: int = -1, timeout: float = 0
+) -> ScreenElementsResponse:
+    """
+    UI hierarchy of the latest frame. Blocks up to `timeout` seconds until a frame newer than
+    `after_version` is received, returning the latest one if none came.
+    Long polls are made once, without retries, so that they don't outlast the caller deadline.
+    """
+    params = {"after": after_version, "timeout": timeout}
+    if timeout <= 0:
+        response = screen_api_client.get_with_retry("/screen-elements", params=params, timeout=10)
+    else:
+        response = screen_api_client.get(
+            "/screen-elements", params=params, timeout=timeout + _LONG_POLL_MARGIN_SECONDS
+        )
+        response.raise_for_status()
+    return ScreenElementsResponse(**response.json())
+
+
 def take_screenshot(ctx: MobileUseContext):
     return get_screen_data(ctx.screen_api_client).base64
 
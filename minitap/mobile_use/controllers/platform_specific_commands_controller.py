@@ -1,9 +1,10 @@
 import json
-from datetime import date
+import shlex
 
 from adbutils import AdbDevice
 
 from minitap.mobile_use.context import DevicePlatform, MobileUseContext
+from minitap.mobile_use.services.adb_session import adb_sessions, list_adb_devices
 from minitap.mobile_use.utils.logger import MobileUseLogger
 from minitap.mobile_use.utils.shell_utils import run_shell_command_on_host
 
@@ -22,16 +23,21 @@ def get_first_device(
     logger: MobileUseLogger | None = None,
 ) -> tuple[str | None, DevicePlatform | None]:
     """Gets the first available device."""
-    try:
-        android_output = run_shell_command_on_host("adb devices")
-        lines = android_output.strip().split("\n")
-        for line in lines:
-            if "device" in line and not line.startswith("List of devices"):
-                return line.split()[0], DevicePlatform.ANDROID
-    except RuntimeError as e:
-        if logger:
-            logger.error(f"ADB command failed: {e}")
-        return None, None
+    android_devices = list_adb_devices()
+    if android_devices:
+        return android_devices[0], DevicePlatform.ANDROID
+    if android_devices is None:
+        # `adb devices` starts the ADB server when it is not running
+        try:
+            android_output = run_shell_command_on_host("adb devices")
+            lines = android_output.strip().split("\n")
+            for line in lines:
+                if "device" in line and not line.startswith("List of devices"):
+                    return line.split()[0], DevicePlatform.ANDROID
+        except RuntimeError as e:
+            if logger:
+                logger.error(f"ADB command failed: {e}")
+            return None, None
 
     try:
         ios_output = run_shell_command_on_host("xcrun simctl list devices booted -j")
@@ -52,15 +58,7 @@ def get_first_device(
 def get_focused_app_info(ctx: MobileUseContext) -> str | None:
     if ctx.device.mobile_platform == DevicePlatform.IOS:
         return None
-    device = get_adb_device(ctx)
-    return str(device.shell("dumpsys window | grep -E 'mCurrentFocus|mFocusedApp'"))
-
-
-def get_device_date(ctx: MobileUseContext) -> str:
-    if ctx.device.mobile_platform == DevicePlatform.IOS:
-        return date.today().strftime("%a %b %d %H:%M:%S %Z %Y")
-    device = get_adb_device(ctx)
-    return str(device.shell("date"))
+    return adb_sessions.shell(ctx, "dumpsys window | grep -E 'mCurrentFocus|mFocusedApp'")
 
 
 def list_packages(ctx: MobileUseContext) -> str:
@@ -76,6 +74,53 @@ def list_packages(ctx: MobileUseContext) -> str:
         ]
         return run_shell_command_on_host(" ".join(cmd))
     else:
-        device = get_adb_device(ctx)
         cmd = ["pm", "list", "packages", "-f"]
-        return str(device.shell(" ".join(cmd)))
+        return adb_sessions.shell(ctx, " ".join(cmd))
+
+
+# `input keycombination` was added in Android 13
+KEYCOMBINATION_MIN_SDK = 33
+KEYCODE_A = 29
+KEYCODE_DEL = 67
+KEYCODE_CTRL_LEFT = 113
+KEYCODE_MOVE_END = 123
+KEYCODE_PASTE = 279
+
+
+def select_all_and_delete(ctx: MobileUseContext, nb_chars: int, sdk_level: int | None) -> None:
+    """
+    Deletes the text of the focused input in a single shell command: select all then delete,
+    or before Android 13, move to the end then delete `nb_chars` characters in one key batch.
+    """
+    if ctx.device.mobile_platform != DevicePlatform.ANDROID:
+        raise ValueError("Device is not an Android device")
+    if sdk_level is not None and sdk_level >= KEYCOMBINATION_MIN_SDK:
+        command = (
+            f"input keycombination {KEYCODE_CTRL_LEFT} {KEYCODE_A} && input keyevent {KEYCODE_DEL}"
+        )
+    else:
+        command = f"input keyevent {KEYCODE_MOVE_END}" + f" {KEYCODE_DEL}" * nb_chars
+    adb_sessions.shell(ctx, command)
+
+
+# Clipper (https://github.com/majido/clipper) sets the clipboard from a broadcast
+CLIPPER_PACKAGE = "ca.zgrs.clipper"
+_BROADCAST_RESULT_OK = "result=-1"
+
+
+def set_clipboard_and_paste(ctx: MobileUseContext, text: str) -> bool:
+    """
+    Sets the device clipboard through the Clipper app, then pastes it into the focused input.
+    Returns False, without pasting, if the clipboard couldn't be set.
+    """
+    if ctx.device.mobile_platform != DevicePlatform.ANDROID:
+        raise ValueError("Device is not an Android device")
+    output = adb_sessions.shell(
+        ctx,
+        f"am broadcast -n {CLIPPER_PACKAGE}/.ClipperReceiver -a clipper.set "
+        f"-e text {shlex.quote(text)}",
+    )
+    if _BROADCAST_RESULT_OK not in output:
+        return False
+    adb_sessions.shell(ctx, f"input keyevent {KEYCODE_PASTE}")
+    return True
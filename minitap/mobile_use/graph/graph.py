@@ -20,7 +20,7 @@ from minitap.mobile_use.agents.planner.utils import (
 )
 from minitap.mobile_use.agents.summarizer.summarizer import SummarizerNode
 from minitap.mobile_use.constants import EXECUTOR_MESSAGES_KEY
-from minitap.mobile_use.context import MobileUseContext
+from minitap.mobile_use.context import RUNTIME_CONTEXT, MobileUseContext
 from minitap.mobile_use.graph.state import State
 from minitap.mobile_use.tools.index import (
     EXECUTOR_WRAPPERS_TOOLS,
@@ -53,10 +53,15 @@ def post_orchestrator_gate(
 
 def post_cortex_gate(
     state: State,
-) -> Literal["continue", "end_subgoal"]:
+) -> Literal["continue", "end_subgoal", "invoke_tools"]:
     logger.info("Starting post_cortex_gate")
     if len(state.complete_subgoals_by_ids) > 0:
         return "end_subgoal"
+    # The cortex decisions came with valid tool calls: no need for the executor
+    messages = state.executor_messages
+    if messages and isinstance(messages[-1], AIMessage) and messages[-1].tool_calls:
+        logger.info("🔨⏩ Found cortex tool calls: " + str(messages[-1].tool_calls))
+        return "invoke_tools"
     return "continue"
 
 
@@ -79,25 +84,42 @@ def post_executor_gate(
     return "skip"
 
 
+_graphs: dict[tuple[str, str], CompiledStateGraph] = {}
+
+
 async def get_graph(ctx: MobileUseContext) -> CompiledStateGraph:
+    """
+    Returns the graph compiled for the LLM profile and platform of `ctx`, built on first use.
+    Compiled graphs are shared between tasks: their nodes and tools act on the context set
+    with `set_current_context` for the running task.
+    """
+    key = (ctx.llm_config.model_dump_json(), ctx.device.mobile_platform.value)
+    graph = _graphs.get(key)
+    if graph is None:
+        logger.info(f"Compiling graph for {ctx.device.mobile_platform.value} devices")
+        graph = _graphs[key] = _build_graph(ctx)
+    return graph
+
+
+def _build_graph(ctx: MobileUseContext) -> CompiledStateGraph:
     graph_builder = StateGraph(State)
 
     ## Define nodes
-    graph_builder.add_node("planner", PlannerNode(ctx))
-    graph_builder.add_node("orchestrator", OrchestratorNode(ctx))
+    graph_builder.add_node("planner", PlannerNode(RUNTIME_CONTEXT))
+    graph_builder.add_node("orchestrator", OrchestratorNode(RUNTIME_CONTEXT))
 
-    graph_builder.add_node("contextor", ContextorNode(ctx))
+    graph_builder.add_node("contextor", ContextorNode(RUNTIME_CONTEXT))
 
-    graph_builder.add_node("cortex", CortexNode(ctx))
+    graph_builder.add_node("cortex", CortexNode(RUNTIME_CONTEXT))
 
-    graph_builder.add_node("executor", ExecutorNode(ctx))
+    graph_builder.add_node("executor", ExecutorNode(RUNTIME_CONTEXT))
     executor_tool_node = ExecutorToolNode(
         tools=get_tools_from_wrappers(ctx=ctx, wrappers=EXECUTOR_WRAPPERS_TOOLS),
         messages_key=EXECUTOR_MESSAGES_KEY,
     )
     graph_builder.add_node("executor_tools", executor_tool_node)
 
-    graph_builder.add_node("summarizer", SummarizerNode(ctx))
+    graph_builder.add_node("summarizer", SummarizerNode(RUNTIME_CONTEXT))
 
     # Linking nodes
     graph_builder.add_edge(START, "planner")
@@ -118,6 +140,7 @@ async def get_graph(ctx: MobileUseContext) -> CompiledStateGraph:
         {
             "continue": "executor",
             "end_subgoal": "orchestrator",
+            "invoke_tools": "executor_tools",
         },
     )
     graph_builder.add_conditional_edges(
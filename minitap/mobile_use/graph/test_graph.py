@@ -0,0 +1,57 @@
+from unittest.mock import Mock
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from minitap.mobile_use.config import LLM
+from minitap.mobile_use.context import (
+    RUNTIME_CONTEXT,
+    DevicePlatform,
+    get_current_context,
+    reset_current_context,
+    set_current_context,
+)
+from minitap.mobile_use.graph.graph import get_graph, post_cortex_gate
+from minitap.mobile_use.tools.index import EXECUTOR_WRAPPERS_TOOLS, get_tools_from_wrappers
+
+
+@pytest.mark.asyncio
+async def test_get_graph_is_compiled_once_per_profile_and_platform(make_mock_context):
+    graph = await get_graph(make_mock_context())
+
+    assert await get_graph(make_mock_context()) is graph
+    assert await get_graph(make_mock_context(platform=DevicePlatform.IOS)) is not graph
+
+
+def test_tools_are_shared_and_act_on_the_running_task_context(make_mock_context):
+    tools = get_tools_from_wrappers(make_mock_context(), EXECUTOR_WRAPPERS_TOOLS)
+    assert get_tools_from_wrappers(make_mock_context(), EXECUTOR_WRAPPERS_TOOLS) is tools
+    assert len(
+        get_tools_from_wrappers(
+            make_mock_context(executor=LLM(provider="vertexai", model="gpt-5-nano")),
+            EXECUTOR_WRAPPERS_TOOLS,
+        )
+    ) > len(tools)
+
+    first, second = make_mock_context(), make_mock_context()
+    for ctx in (first, second):
+        token = set_current_context(ctx)
+        try:
+            assert get_current_context() is ctx
+            assert RUNTIME_CONTEXT.device is ctx.device
+        finally:
+            reset_current_context(token)
+    with pytest.raises(RuntimeError):
+        get_current_context()
+
+
+def test_cortex_tool_calls_skip_the_executor():
+    state = Mock()
+    state.complete_subgoals_by_ids = []
+    state.executor_messages = [
+        AIMessage(content="", tool_calls=[{"name": "back", "args": {}, "id": "call_1"}])
+    ]
+    assert post_cortex_gate(state) == "invoke_tools"
+
+    state.executor_messages = []
+    assert post_cortex_gate(state) == "continue"
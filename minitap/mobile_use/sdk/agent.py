@@ -23,6 +23,8 @@ from minitap.mobile_use.context import (
     DevicePlatform,
     ExecutionSetup,
     MobileUseContext,
+    reset_current_context,
+    set_current_context,
 )
 from minitap.mobile_use.controllers.mobile_command_controller import (
     ScreenDataResponse,
@@ -62,6 +64,15 @@ from minitap.mobile_use.servers.start_servers import (
     start_device_screen_api,
 )
 from minitap.mobile_use.servers.stop_servers import stop_servers
+from minitap.mobile_use.services.adb_session import adb_sessions
+from minitap.mobile_use.services.device_info import device_info_service
+from minitap.mobile_use.services.focused_app import focused_app_trackers
+from minitap.mobile_use.services.llm import llm_clients
+from minitap.mobile_use.services.package_catalog import package_catalogs
+from minitap.mobile_use.services.task_metrics import (
+    TaskMetricsCallbackHandler,
+    task_metrics_handler,
+)
 from minitap.mobile_use.utils.logger import get_logger
 from minitap.mobile_use.utils.media import (
     create_gif_from_trace_folder,
@@ -296,6 +307,8 @@ class Agent:
             llm_config=agent_profile.llm_config,
         )
 
+        # Ready by the time the first app lookup happens
+        package_catalogs.prefetch(context)
         self._prepare_tracing(task=task, context=context)
         self._prepare_output_files(task=task)
 
@@ -314,6 +327,10 @@ class Agent:
         last_state: State | None = None
         last_state_snapshot: dict | None = None
         output = None
+        context_token = set_current_context(context)
+        metrics_handler_token = task_metrics_handler.set(
+            TaskMetricsCallbackHandler(metrics=context.metrics, pricing=context.llm_config.pricing)
+        )
         try:
             logger.info(f"[{task_name}] Invoking graph with input: {graph_input}")
             task.status = TaskStatus.RUNNING
@@ -370,7 +387,9 @@ class Agent:
             if not last_state:
                 err = f"[{task_name}] No result received from graph"
                 logger.warning(err)
-                task.finalize(content=output, state=last_state_snapshot, error=err)
+                task.finalize(
+                    content=output, state=last_state_snapshot, error=err, metrics=context.metrics
+                )
                 return None
 
             print_ai_response_to_stderr(graph_result=last_state)
@@ -382,7 +401,7 @@ class Agent:
                 state=last_state,
             )
             logger.info(f"✅ Automation '{task_name}' is success ✅")
-            task.finalize(content=output, state=last_state_snapshot)
+            task.finalize(content=output, state=last_state_snapshot, metrics=context.metrics)
             try:
                 await broadcaster.publish({"type": "task_end", "task_id": task.id})
             except Exception:
@@ -390,14 +409,36 @@ class Agent:
         except asyncio.CancelledError:
             err = f"[{task_name}] Task cancelled"
             logger.warning(err)
-            task.finalize(content=output, state=last_state_snapshot, error=err, cancelled=True)
+            task.finalize(
+                content=output,
+                state=last_state_snapshot,
+                error=err,
+                cancelled=True,
+                metrics=context.metrics,
+            )
             raise
         except Exception as e:
             err = f"[{task_name}] Error running automation: {e}"
             logger.error(err)
-            task.finalize(content=output, state=last_state_snapshot, error=err)
+            task.finalize(
+                content=output, state=last_state_snapshot, error=err, metrics=context.metrics
+            )
             raise
         finally:
+            task_metrics_handler.reset(metrics_handler_token)
+            reset_current_context(context_token)
+            logger.info(f"[{task_name}] Metrics:\n{context.metrics}")
+            try:
+                await broadcaster.publish(
+                    {
+                        "type": "metrics",
+                        "task_id": task.id,
+                        "metrics": context.metrics.model_dump(),
+                        "summary": str(context.metrics),
+                    }
+                )
+            except Exception:
+                pass
             self._finalize_tracing(task=task, context=context)
         return output
 
@@ -412,6 +453,11 @@ class Agent:
             logger.warning("Failed to stop Device Screen API.")
         if not hw_bridge_ok:
             logger.warning("Failed to stop Device Hardware Bridge.")
+        llm_clients.clear()
+        device_info_service.clear()
+        focused_app_trackers.clear()
+        adb_sessions.clear()
+        package_catalogs.clear()
         self._initialized = False
         logger.info("✅ Mobile-use agent stopped.")
 
@@ -11,7 +11,7 @@ from pydantic import BaseModel, Field
 
 from minitap.mobile_use.config import LLMConfig, get_default_llm_config
 from minitap.mobile_use.constants import RECURSION_LIMIT
-from minitap.mobile_use.context import DeviceContext
+from minitap.mobile_use.context import DeviceContext, TaskMetrics
 from minitap.mobile_use.sdk.utils import load_llm_config_override
 
 
@@ -114,12 +114,14 @@ class TaskResult(BaseModel):
         error: Error message if the task failed
         execution_time_seconds: How long the task took to execute
         steps_taken: Number of steps the agent took to complete the task
+        metrics: LLM call metrics of the task, per agent node
     """
 
     content: Any = None
     error: str | None = None
     execution_time_seconds: float
     steps_taken: int
+    metrics: TaskMetrics | None = None
 
     def get_as_model(self, model_class: type[T]) -> T:
         """
@@ -168,6 +170,7 @@ class Task(BaseModel):
         state: dict | None = None,
         error: str | None = None,
         cancelled: bool = False,
+        metrics: TaskMetrics | None = None,
     ):
         self.status = TaskStatus.COMPLETED if error is None else TaskStatus.FAILED
         if self.status == TaskStatus.FAILED and cancelled:
@@ -176,7 +179,9 @@ class Task(BaseModel):
 
         duration = self.ended_at - self.created_at
         steps_taken = -1
-        if state is not None:
+        if metrics is not None and metrics.steps > 0:
+            steps_taken = metrics.steps
+        elif state is not None:
             metadata = state.get("metadata", None)
             if metadata:
                 steps_taken = metadata.get("step_count", -1)
@@ -186,6 +191,7 @@ class Task(BaseModel):
             error=error,
             execution_time_seconds=duration.total_seconds(),
             steps_taken=steps_taken,
+            metrics=metrics,
         )
 
     def get_name(self) -> str:
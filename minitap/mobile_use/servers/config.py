@@ -1,3 +1,5 @@
+from typing import Literal
+
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
 
@@ -14,6 +16,13 @@ class ServerSettings(BaseSettings):
     DEVICE_HARDWARE_BRIDGE_BASE_URL: str = f"http://localhost:{DEVICE_HARDWARE_BRIDGE_PORT}"
     DEVICE_SCREEN_API_PORT: int = 9998
     ADB_HOST: str | None = None
+    ADB_PORT: int | None = None
+    # "screencap" captures Android screenshots over ADB instead of the hardware bridge PNG files
+    SCREENSHOT_BACKEND: Literal["bridge", "screencap"] = "bridge"
+    # Device captured by the screencap backend, defaults to the first online ADB device
+    SCREENCAP_DEVICE_ID: str | None = None
+    SCREENCAP_MAX_SIZE: int | None = 1280
+    SCREENCAP_JPEG_QUALITY: int = 80
 
     model_config = {"env_file": ".env", "extra": "ignore"}
 
@@ -2,11 +2,13 @@ import base64
 import json
 import threading
 import time
+from collections.abc import Callable
 from contextlib import asynccontextmanager
 
 import requests
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 from sseclient import SSEClient
 
@@ -15,15 +17,64 @@ from minitap.mobile_use.servers.utils import is_port_in_use
 
 DEVICE_HARDWARE_BRIDGE_BASE_URL = server_settings.DEVICE_HARDWARE_BRIDGE_BASE_URL
 DEVICE_HARDWARE_BRIDGE_API_URL = f"{DEVICE_HARDWARE_BRIDGE_BASE_URL}/api"
-
-_latest_screen_data = None
-_data_lock = threading.Lock()
+MAX_LONG_POLL_SECONDS = 30.0
+
+
+class FrameStore:
+    """
+    Latest screen data streamed by the hardware bridge. When a frame source is set,
+    the screenshot is captured from it on read instead of being downloaded from the bridge.
+
+    Each frame gets a new version, so that readers can wait for the next one.
+    """
+
+    def __init__(self):
+        self._data: dict | None = None
+        self._version = 0
+        self._lock = threading.Lock()
+        self._updated = threading.Condition(self._lock)
+        self.frame_source: Callable[[], str] | None = None
+
+    def update(self, data: dict | None) -> None:
+        with self._updated:
+            self._data = data
+            if data is not None:
+                self._version += 1
+                self._updated.notify_all()
+
+    def wait_for_update(self, after_version: int, timeout: float) -> tuple[int, dict | None]:
+        """
+        Waits up to `timeout` seconds for a frame newer than `after_version`, and returns
+        the latest version and data (without screenshot), updated or not.
+        """
+        with self._updated:
+            self._updated.wait_for(lambda: self._version > after_version, timeout=timeout)
+            return self._version, self._data
+
+    def has_data(self) -> bool:
+        with self._lock:
+            return self._data is not None
+
+    def get(self) -> dict | None:
+        """
+        Latest screen data. With a frame source, the screenshot is captured now: it is taken
+        after the `elements` it is served with (by the capture time, up to a few hundred ms),
+        so it may show a more recent screen when the UI is changing.
+        Blocking: to be run off the event loop.
+        """
+        with self._lock:
+            data = self._data
+        if data is None or self.frame_source is None:
+            return data
+        return {**data, "base64": self.frame_source()}
+
+
+frame_store = FrameStore()
 _stream_thread = None
 _stop_event = threading.Event()
 
 
 def _stream_worker():
-    global _latest_screen_data
     sse_url = f"{DEVICE_HARDWARE_BRIDGE_API_URL}/device-screen/sse"
     headers = {"Accept": "text/event-stream"}
 
@@ -45,28 +96,52 @@ def _stream_worker():
                         height = data.get("height")
                         platform = data.get("platform")
 
-                        image_url = f"{DEVICE_HARDWARE_BRIDGE_BASE_URL}{screenshot_path}"
-                        image_response = requests.get(image_url)
-                        image_response.raise_for_status()
-                        base64_image = base64.b64encode(image_response.content).decode("utf-8")
-                        base64_data_url = f"data:image/png;base64,{base64_image}"
+                        base64_data_url = None
+                        if frame_store.frame_source is None:
+                            image_url = f"{DEVICE_HARDWARE_BRIDGE_BASE_URL}{screenshot_path}"
+                            image_response = requests.get(image_url)
+                            image_response.raise_for_status()
+                            base64_image = base64.b64encode(image_response.content).decode("utf-8")
+                            base64_data_url = f"data:image/png;base64,{base64_image}"
 
-                        with _data_lock:
-                            _latest_screen_data = {
+                        frame_store.update(
+                            {
                                 "base64": base64_data_url,
                                 "elements": elements,
                                 "width": width,
                                 "height": height,
                                 "platform": platform,
                             }
+                        )
 
         except requests.exceptions.RequestException as e:
             print(f"Connection error in stream worker: {e}. Retrying in 2 seconds...")
-            with _data_lock:
-                _latest_screen_data = None
+            frame_store.update(None)
             time.sleep(2)
 
 
+def _start_screencap_source() -> None:
+    from adbutils import AdbClient
+
+    from minitap.mobile_use.servers.screencap import ScreencapSource
+
+    client = AdbClient(
+        host=server_settings.ADB_HOST or "127.0.0.1", port=server_settings.ADB_PORT or 5037
+    )
+    serial = server_settings.SCREENCAP_DEVICE_ID or next(
+        (device.serial for device in client.list() if device.state == "device"), None
+    )
+    if serial is None:
+        raise RuntimeError("No online ADB device to capture")
+    source = ScreencapSource(
+        client.device(serial=serial),
+        max_size=server_settings.SCREENCAP_MAX_SIZE,
+        jpeg_quality=server_settings.SCREENCAP_JPEG_QUALITY,
+    )
+    frame_store.frame_source = source.capture_base64
+    print(f"--- Screenshots captured with screencap on {serial} ---")
+
+
 def start_stream():
     global _stream_thread
     if _stream_thread is None or not _stream_thread.is_alive():
@@ -86,6 +161,11 @@ def stop_stream():
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
+    if server_settings.SCREENSHOT_BACKEND == "screencap":
+        try:
+            _start_screencap_source()
+        except Exception as e:
+            print(f"Screencap backend unavailable, using the bridge screenshots: {e}")
     start_stream()
     yield
     stop_stream()
@@ -101,9 +181,9 @@ def get_latest_data():
     start_time = time.time()
 
     while time.time() - start_time < max_wait_time:
-        with _data_lock:
-            if _latest_screen_data is not None:
-                return _latest_screen_data
+        data = frame_store.get()
+        if data is not None:
+            return data
         time.sleep(retry_delay)
 
     raise HTTPException(
@@ -114,10 +194,33 @@ def get_latest_data():
 
 @app.get("/screen-info")
 async def get_screen_info():
-    data = get_latest_data()
+    # The screenshot may be captured and encoded on read: kept off the event loop
+    data = await run_in_threadpool(get_latest_data)
     return JSONResponse(content=data)
 
 
+@app.get("/screen-elements")
+def get_screen_elements(
+    after: int = -1, timeout: float = Query(default=0, ge=0, le=MAX_LONG_POLL_SECONDS)
+):
+    """
+    Latest UI hierarchy, without the screenshot. Long polling: waits up to `timeout` seconds
+    for a frame newer than the `after` version.
+    """
+    version, data = frame_store.wait_for_update(after_version=after, timeout=timeout)
+    if data is None:
+        raise HTTPException(status_code=503, detail="Screen data is not yet available.")
+    return JSONResponse(
+        content={
+            "version": version,
+            "elements": data["elements"],
+            "width": data["width"],
+            "height": data["height"],
+            "platform": data["platform"],
+        }
+    )
+
+
 @app.get("/health")
 async def health_check():
     """Check if the Maestro Studio server is healthy."""
@@ -125,12 +228,11 @@ async def health_check():
     try:
         response = requests.get(health_url, timeout=5)
         response.raise_for_status()
-        with _data_lock:
-            if _latest_screen_data is None:
-                raise HTTPException(
-                    status_code=503,
-                    detail="Screen data is not yet available after multiple retries.",
-                )
+        if not frame_store.has_data():
+            raise HTTPException(
+                status_code=503,
+                detail="Screen data is not yet available after multiple retries.",
+            )
         return JSONResponse(content=response.json())
     except requests.exceptions.RequestException as e:
         raise HTTPException(status_code=503, detail=f"Maestro Studio not available: {e}") from e
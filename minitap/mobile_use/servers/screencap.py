@@ -0,0 +1,135 @@
+"""
+Android screenshot backend capturing raw `screencap` frames over a persistent ADB connection,
+instead of going through the hardware bridge PNG files.
+
+Frames are received straight into a preallocated NumPy buffer, then downscaled and
+JPEG-encoded in one pass.
+"""
+
+import base64
+import io
+import math
+import struct
+import threading
+
+import numpy as np
+from adbutils import AdbConnection, AdbDevice, AdbError
+from PIL import Image
+
+from minitap.mobile_use.utils.logger import get_server_logger
+
+logger = get_server_logger()
+
+# Android pixel formats of `screencap` raw output, with 4 bytes per pixel
+PIXEL_FORMAT_RGBA_8888 = 1
+PIXEL_FORMAT_RGBX_8888 = 2
+PIXEL_FORMAT_BGRA_8888 = 5
+_SUPPORTED_PIXEL_FORMATS = {PIXEL_FORMAT_RGBA_8888, PIXEL_FORMAT_RGBX_8888, PIXEL_FORMAT_BGRA_8888}
+# Android 9 added the color space to the raw header
+_COLOR_SPACE_HEADER_MIN_SDK = 28
+_MAX_SCREEN_SIDE = 16384
+
+
+def encode_jpeg(frame: np.ndarray, max_size: int | None, quality: int, bgr: bool = False) -> bytes:
+    """
+    Encodes a (height, width, 4) frame as JPEG. The downscaling to `max_size` and the alpha
+    channel removal are a single strided view of the frame, copied once before encoding.
+    """
+    height, width = frame.shape[:2]
+    step = max(1, math.ceil(max(height, width) / max_size)) if max_size else 1
+    channels = slice(2, None, -1) if bgr else slice(0, 3)
+    pixels = np.ascontiguousarray(frame[::step, ::step, channels])
+    output = io.BytesIO()
+    Image.fromarray(pixels).save(output, format="JPEG", quality=quality)
+    return output.getvalue()
+
+
+class ScreencapSource:
+    """
+    Captures frames with `screencap` run from a `sh` kept alive on the device, over a raw
+    `exec:` connection. The frame buffer is reused as long as the screen size doesn't change.
+    """
+
+    def __init__(self, device: AdbDevice, max_size: int | None = 1280, jpeg_quality: int = 80):
+        self.device = device
+        self.max_size = max_size
+        self.jpeg_quality = jpeg_quality
+        sdk_level = device.getprop("ro.build.version.sdk")
+        self._header_size = (
+            16 if sdk_level.isdigit() and int(sdk_level) >= _COLOR_SPACE_HEADER_MIN_SDK else 12
+        )
+        self._connection: AdbConnection | None = None
+        self._frame: np.ndarray | None = None
+        self._lock = threading.Lock()
+
+    def capture(self) -> tuple[np.ndarray, int]:
+        """
+        Returns the (height, width, 4) frame and its pixel format.
+        The frame is only valid until the next capture.
+        """
+        with self._lock:
+            return self._capture()
+
+    def capture_jpeg(self) -> bytes:
+        with self._lock:
+            frame, pixel_format = self._capture()
+            return encode_jpeg(
+                frame,
+                max_size=self.max_size,
+                quality=self.jpeg_quality,
+                bgr=pixel_format == PIXEL_FORMAT_BGRA_8888,
+            )
+
+    def capture_base64(self) -> str:
+        return "data:image/jpeg;base64," + base64.b64encode(self.capture_jpeg()).decode("utf-8")
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _capture(self) -> tuple[np.ndarray, int]:
+        try:
+            return self._read_frame(self._get_connection())
+        except (AdbError, OSError, ValueError):
+            # The stream may be out of sync, it is reopened on the next capture
+            self.close()
+            raise
+
+    def _read_frame(self, connection: AdbConnection) -> tuple[np.ndarray, int]:
+        connection.send(b"screencap\n")
+        header = self._read_exactly(connection, bytearray(self._header_size))
+        width, height, pixel_format = struct.unpack_from("<III", header)
+        if (
+            pixel_format not in _SUPPORTED_PIXEL_FORMATS
+            or not 0 < width <= _MAX_SCREEN_SIDE
+            or not 0 < height <= _MAX_SCREEN_SIDE
+        ):
+            raise ValueError(
+                f"Unexpected screencap header: {width}x{height}, format {pixel_format}"
+            )
+
+        if self._frame is None or self._frame.shape[:2] != (height, width):
+            logger.info(f"Allocating a {width}x{height} screencap frame buffer")
+            self._frame = np.empty((height, width, 4), dtype=np.uint8)
+        self._read_exactly(connection, self._frame)
+        return self._frame, pixel_format
+
+    def _get_connection(self) -> AdbConnection:
+        if self._connection is None:
+            connection = self.device.open_transport()
+            connection.send_command("exec:sh")
+            connection.check_okay()
+            self._connection = connection
+        return self._connection
+
+    @staticmethod
+    def _read_exactly(connection: AdbConnection, buffer):
+        view = memoryview(buffer).cast("B")
+        received = 0
+        while received < len(view):
+            count = connection.conn.recv_into(view[received:])
+            if count == 0:
+                raise AdbError("Screencap connection closed")
+            received += count
+        return buffer
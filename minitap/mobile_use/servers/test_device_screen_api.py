@@ -0,0 +1,55 @@
+import threading
+import time
+from unittest.mock import Mock
+
+import adbutils
+
+from minitap.mobile_use.servers import device_screen_api, screencap
+from minitap.mobile_use.servers.config import server_settings
+from minitap.mobile_use.servers.device_screen_api import FrameStore
+
+FRAME = {"base64": None, "elements": [], "width": 1, "height": 1, "platform": "android"}
+
+
+def test_wait_for_update_returns_on_the_next_frame():
+    store = FrameStore()
+    store.update(FRAME)
+    version, _ = store.wait_for_update(after_version=-1, timeout=0)
+
+    timer = threading.Timer(0.05, store.update, args=({**FRAME, "elements": [{"text": "a"}]},))
+    timer.start()
+    start = time.monotonic()
+    new_version, data = store.wait_for_update(after_version=version, timeout=5)
+
+    assert time.monotonic() - start < 2
+    assert new_version == version + 1
+    assert data is not None and data["elements"] == [{"text": "a"}]
+
+
+def test_wait_for_update_returns_the_latest_frame_on_timeout():
+    store = FrameStore()
+    store.update(FRAME)
+
+    version, data = store.wait_for_update(after_version=1, timeout=0.05)
+
+    assert version == 1
+    assert data == FRAME
+
+
+def test_screencap_source_captures_the_first_online_device(monkeypatch):
+    client = Mock()
+    client.list.return_value = [
+        Mock(serial="emulator-5554", state="offline"),
+        Mock(serial="emulator-5556", state="device"),
+    ]
+    client_class = Mock(return_value=client)
+    monkeypatch.setattr(adbutils, "AdbClient", client_class)
+    monkeypatch.setattr(screencap, "ScreencapSource", Mock())
+    monkeypatch.setattr(server_settings, "ADB_PORT", 5038)
+    monkeypatch.setattr(server_settings, "SCREENCAP_DEVICE_ID", None)
+    monkeypatch.setattr(device_screen_api.frame_store, "frame_source", None)
+
+    device_screen_api._start_screencap_source()
+
+    assert client_class.call_args.kwargs["port"] == 5038
+    client.device.assert_called_once_with(serial="emulator-5556")
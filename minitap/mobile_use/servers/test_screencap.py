@@ -0,0 +1,84 @@
+import io
+import socket
+import struct
+from unittest.mock import Mock
+
+import numpy as np
+from PIL import Image
+
+from minitap.mobile_use.servers.device_screen_api import FrameStore
+from minitap.mobile_use.servers.screencap import (
+    PIXEL_FORMAT_BGRA_8888,
+    PIXEL_FORMAT_RGBA_8888,
+    ScreencapSource,
+    encode_jpeg,
+)
+
+
+def _raw_frame(width: int, height: int, rgba: tuple[int, int, int, int], pixel_format: int):
+    header = struct.pack("<IIII", width, height, pixel_format, 1)
+    return header + bytes(rgba) * (width * height)
+
+
+class _FakeScreencapDevice:
+    """Answers every `screencap` line written to the exec connection with a raw frame."""
+
+    def __init__(self, raw_frame: bytes):
+        self.raw_frame = raw_frame
+        self.transports = 0
+
+    def getprop(self, name: str) -> str:
+        return "34"
+
+    def open_transport(self):
+        self.transports += 1
+        device_end, host_end = socket.socketpair()
+        connection = Mock()
+        connection.conn = host_end
+        connection.send = lambda data: device_end.sendall(self.raw_frame * data.count(b"\n"))
+        return connection
+
+
+def test_encode_jpeg_downscales_and_drops_alpha():
+    frame = np.zeros((2400, 1080, 4), dtype=np.uint8)
+    frame[..., 0] = 255
+
+    image = Image.open(io.BytesIO(encode_jpeg(frame, max_size=1280, quality=80)))
+
+    assert image.size == (540, 1200)
+    assert image.mode == "RGB"
+    red, green, blue = image.getpixel((10, 10))  # type: ignore
+    assert red > 240 and green < 15 and blue < 15
+
+
+def test_screencap_source_reuses_its_connection_and_frame_buffer():
+    device = _FakeScreencapDevice(_raw_frame(64, 128, (10, 20, 30, 255), PIXEL_FORMAT_RGBA_8888))
+    source = ScreencapSource(device, max_size=None)  # type: ignore
+
+    first, pixel_format = source.capture()
+    buffer = first.ctypes.data
+    second, _ = source.capture()
+
+    assert pixel_format == PIXEL_FORMAT_RGBA_8888
+    assert second.shape == (128, 64, 4)
+    assert second.ctypes.data == buffer
+    assert tuple(second[5, 5]) == (10, 20, 30, 255)
+    assert device.transports == 1
+
+
+def test_screencap_source_swaps_bgra_channels():
+    device = _FakeScreencapDevice(_raw_frame(16, 16, (0, 0, 255, 255), PIXEL_FORMAT_BGRA_8888))
+    source = ScreencapSource(device, max_size=None)  # type: ignore
+
+    image = Image.open(io.BytesIO(source.capture_jpeg()))
+
+    red, _, blue = image.getpixel((8, 8))  # type: ignore
+    assert red > 240 and blue < 15
+
+
+def test_frame_store_captures_screenshots_from_its_frame_source():
+    store = FrameStore()
+    store.update({"base64": None, "elements": [], "width": 1, "height": 1, "platform": "android"})
+    store.frame_source = lambda: "data:image/jpeg;base64,abc"
+
+    assert store.get()["base64"] == "data:image/jpeg;base64,abc"  # type: ignore
@@ -1,100 +1,214 @@
-import asyncio
-import logging
-import re
+"""
+UI hierarchy source streaming `uiautomator dump` from the device.
 
-# Set up basic logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+The dump is parsed incrementally while it is received, and each XML node is converted on the fly
+into the rich hierarchy model returned by Maestro's `last-view-hierarchy`
+(`{"attributes": {...}, "children": [...]}` nodes), so that it can replace it.
 
+`uiautomator dump` registers its own UiAutomation connection, while Maestro's driver holds
+one during the whole session: depending on the Android version, the dump may then fail
+(e.g. "UiAutomationService ... already registered"). The first failed dump on a device turns
+this source off for that device, and Maestro's hierarchy is used from then on.
+"""
 
-async def run_subprocess(command: str) -> tuple[str, str]:
-    """
-    Executes a shell command in a subprocess.
-
-    Args:
-        command: The command to execute.
-
-    Returns:
-        A tuple containing the stdout and stderr of the command.
-    """
-    process = await asyncio.create_subprocess_shell(
-        command,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-    )
-    stdout, stderr = await process.communicate()
-    return stdout.decode(errors="ignore"), stderr.decode(errors="ignore")
-
-
-async def get_accessibility_tree(device_id: str | None = None) -> str:
-    """
-    Retrieves the UI accessibility tree from an Android device as an XML string.
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections.abc import Callable, Iterable
 
-    This function uses `uiautomator` to dump the current UI hierarchy.
+from adbutils import AdbDevice
 
-    Args:
-        device_id: The optional ID of the target device. If not provided,
-                   the command will run on the only connected device.
+from minitap.mobile_use.config import settings
+from minitap.mobile_use.context import DevicePlatform, MobileUseContext
+from minitap.mobile_use.controllers.platform_specific_commands_controller import get_adb_device
+from minitap.mobile_use.utils.logger import get_logger
 
-    Returns:
-        The UI hierarchy as an XML string.
-        Returns an empty string if the command fails.
-    """
-    adb_command = "adb"
-    if device_id:
-        adb_command = f"adb -s {device_id}"
-
-    # The '/dev/tty' trick is used to get the raw XML output directly.
-    # On some devices, '/dev/null' or a temporary file might be needed.
-    command = f"{adb_command} shell uiautomator dump /dev/tty"
-
-    logger.info(f"Executing command: {command}")
-
-    try:
-        stdout, stderr = await run_subprocess(command)
-
-        if "UI hierchary dumped to" in stderr:  # Mispelling is in the original tool
-            # The XML is often in stdout, but sometimes mixed with stderr
-            # We'll clean it up to ensure we only get the XML part.
-            xml_output = re.sub(r"UI hierchary dumped to.*", "", stderr, flags=re.DOTALL).strip()
-            if not xml_output.startswith("<?xml"):
-                xml_output = stdout
-
-            # Clean up potential non-XML text at the beginning
-            xml_start_index = xml_output.find("<?xml")
-            if xml_start_index != -1:
-                return xml_output[xml_start_index:].strip()
-            else:
-                logger.error("Could not find XML content in the output.")
-                return ""
+logger = get_logger(__name__)
 
-        elif "ERROR" in stderr:
-            logger.error(f"Failed to get accessibility tree: {stderr.strip()}")
-            return ""
+UIAUTOMATOR_DUMP_COMMAND = "uiautomator dump /dev/tty"
+DEFAULT_DUMP_TIMEOUT_SECONDS = 15.0
 
-        return stdout.strip()
+# uiautomator attribute names, renamed to match the Maestro hierarchy attributes
+_ATTRIBUTE_NAMES = {"content-desc": "accessibilityText", "hint": "hintText"}
+_STATE_ATTRIBUTES = ("clickable", "enabled", "focused", "checked", "selected")
+_READ_SIZE = 64 * 1024
 
-    except Exception as e:
-        logger.error(f"An exception occurred while getting the accessibility tree: {e}")
-        return ""
+# Devices on which a uiautomator dump failed, read from Maestro only
+_uiautomator_failed_devices: set[str] = set()
+_uiautomator_failed_devices_lock = threading.Lock()
 
 
-# Example of how to run this function
-async def main():
-    print("Attempting to retrieve accessibility tree from the connected device...")
-    # You can specify a device_id like "emulator-5554" if you have multiple devices
-    accessibility_tree = await get_accessibility_tree()
+class HierarchyParser:
+    """
+    Incremental parser of a `uiautomator dump` output, fed with the chunks as they arrive.
+    The text printed by uiautomator around the XML document is ignored.
+    """
 
-    if accessibility_tree:
-        print("\n--- Accessibility Tree XML ---")
-        print(accessibility_tree)
-        print("\n----------------------------")
-    else:
-        print("\nFailed to retrieve the accessibility tree.")
+    def __init__(self):
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._started = False
+        self._pending = b""
+        self._stack: list[dict] = []
+        self.root: dict | None = None
+
+    @property
+    def done(self) -> bool:
+        return self.root is not None and not self._stack
+
+    def feed(self, chunk: bytes) -> None:
+        if self.done:
+            return
+        if not self._started:
+            # Waits for the XML declaration, which may be split across chunks
+            self._pending += chunk
+            start = self._pending.find(b"<?xml")
+            if start < 0:
+                start = self._pending.find(b"<hierarchy")
+            if start < 0:
+                self._pending = self._pending[-16:]
+                return
+            self._started = True
+            chunk, self._pending = self._pending[start:], b""
+
+        self._parser.feed(chunk)
+        self._read_events()
+
+    def close(self) -> None:
+        """Parses the data held back by expat, to be called once the stream has ended."""
+        if self._started and not self.done:
+            # Expat defers large tokens until enough data arrived (Python 3.13+)
+            flush = getattr(self._parser, "flush", None)
+            if flush is not None:
+                try:
+                    flush()
+                except ET.ParseError:
+                    pass  # an incomplete document is reported by `result`
+                self._read_events()
+
+    def result(self) -> list[dict]:
+        if not self.done or self.root is None:
+            raise ValueError("Incomplete uiautomator dump")
+        return self.root["children"]
+
+    def _read_events(self) -> None:
+        try:
+            for event, element in self._parser.read_events():
+                self._on_event(event, element)
+        except ET.ParseError:
+            # The text printed after the document ("UI hierchary dumped to: /dev/tty")
+            if not self.done:
+                raise
+
+    def _on_event(self, event: str, element: ET.Element) -> None:
+        if event == "start":
+            node = to_hierarchy_node(element.attrib)
+            if self._stack:
+                self._stack[-1]["children"].append(node)
+            else:
+                self.root = node
+            self._stack.append(node)
+        else:
+            self._stack.pop()
+            # Nodes are converted as soon as they start: the XML tree doesn't need to be kept
+            element.clear()
+
+
+def to_hierarchy_node(xml_attributes: dict[str, str]) -> dict:
+    attributes = {_ATTRIBUTE_NAMES.get(name, name): value for name, value in xml_attributes.items()}
+    node: dict = {"attributes": attributes, "children": []}
+    for name in _STATE_ATTRIBUTES:
+        if name in attributes:
+            node[name] = attributes[name] == "true"
+    return node
+
+
+def parse_hierarchy(chunks: Iterable[bytes]) -> list[dict]:
+    parser = HierarchyParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+        if parser.done:
+            break
+    parser.close()
+    return parser.result()
+
+
+def stream_uiautomator_hierarchy(
+    device: AdbDevice, timeout: float = DEFAULT_DUMP_TIMEOUT_SECONDS
+) -> list[dict]:
+    """Dumps the UI hierarchy of the device, parsing it while it streams."""
+    connection = device.shell(UIAUTOMATOR_DUMP_COMMAND, stream=True, timeout=timeout)
+    parser = HierarchyParser()
+    with connection:
+        connection.conn.settimeout(timeout)
+        while not parser.done:
+            chunk = connection.conn.recv(_READ_SIZE)
+            if not chunk:
+                break
+            parser.feed(chunk)
+    parser.close()
+    return parser.result()
+
+
+def get_rich_hierarchy(ctx: MobileUseContext) -> list[dict]:
+    """
+    UI hierarchy from the source selected with `HIERARCHY_SOURCE`: Maestro's last view hierarchy
+    by default, or a streamed `uiautomator` dump on Android.
+    """
+    if (
+        settings.HIERARCHY_SOURCE == "uiautomator"
+        and ctx.device.mobile_platform == DevicePlatform.ANDROID
+        and ctx.device.device_id not in _uiautomator_failed_devices
+    ):
+        device_id = ctx.device.device_id
+        try:
+            return stream_uiautomator_hierarchy(get_adb_device(ctx))
+        except Exception as e:
+            with _uiautomator_failed_devices_lock:
+                _uiautomator_failed_devices.add(device_id)
+            logger.warning(
+                f"uiautomator hierarchy dump failed on {device_id}, "
+                f"using Maestro's hierarchy for this device from now on: {e}"
+            )
+    return ctx.hw_bridge_client.get_rich_hierarchy()
+
+
+def count_nodes(hierarchy: list[dict]) -> int:
+    return sum(1 + count_nodes(node["children"]) for node in hierarchy)
+
+
+def benchmark_hierarchy_sources(
+    sources: dict[str, Callable[[], list[dict]]], iterations: int = 5
+) -> dict[str, float]:
+    """Average seconds taken by each hierarchy source."""
+    results: dict[str, float] = {}
+    for name, source in sources.items():
+        start = time.perf_counter()
+        for _ in range(iterations):
+            nodes = count_nodes(source())
+        results[name] = (time.perf_counter() - start) / iterations
+        logger.info(f"{name}: {results[name] * 1000:.0f}ms for {nodes} nodes")
+    return results
 
 
 if __name__ == "__main__":
-    # To run this example, save it as a Python file (e.g., `get_tree.py`)
-    # and run `python get_tree.py` in your terminal.
-    # Make sure you have an Android device connected with ADB enabled.
-    asyncio.run(main())
+    import argparse
+
+    from minitap.mobile_use.clients.device_hardware_client import get_client
+    from minitap.mobile_use.services.adb_session import get_adb_client
+
+    parser = argparse.ArgumentParser(description="Benchmark the UI hierarchy sources")
+    parser.add_argument("--serial", help="Device serial, defaults to the first device")
+    parser.add_argument("--bridge-url", help="Maestro hardware bridge URL")
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+
+    client = get_adb_client()
+    device = client.device(serial=args.serial or client.list()[0].serial)
+    bridge = get_client(args.bridge_url)
+    benchmark_hierarchy_sources(
+        {
+            "maestro": bridge.get_rich_hierarchy,
+            "uiautomator": lambda: stream_uiautomator_hierarchy(device),
+        },
+        iterations=args.iterations,
+    )
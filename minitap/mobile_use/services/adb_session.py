@@ -0,0 +1,337 @@
+"""
+Persistent ADB shell sessions.
+
+`AdbDevice.shell` opens a new ADB transport and spawns a new shell on the device for every
+command. Sessions instead keep a few `sh` processes alive per device and run commands over
+their stdin, each command output being delimited by a unique end marker carrying its exit code.
+"""
+
+import asyncio
+import bisect
+import math
+import queue
+import threading
+import time
+import uuid
+from collections.abc import Callable
+
+from adbutils import AdbClient, AdbConnection, AdbDevice, AdbError, AdbTimeout
+from pydantic import BaseModel, Field
+
+from minitap.mobile_use.config import settings
+from minitap.mobile_use.context import MobileUseContext
+from minitap.mobile_use.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+MAX_SESSIONS_PER_DEVICE = 3
+DEFAULT_COMMAND_TIMEOUT_SECONDS = 30.0
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, math.inf)
+
+_READ_SIZE = 64 * 1024
+
+
+class ShellResult(BaseModel):
+    command: str
+    output: str
+    returncode: int
+
+
+class LatencyHistogram(BaseModel):
+    counts: list[int] = Field(default_factory=lambda: [0] * len(LATENCY_BUCKETS_MS))
+    total_seconds: float = 0.0
+
+    @property
+    def calls(self) -> int:
+        return sum(self.counts)
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, seconds * 1000)] += 1
+        self.total_seconds += seconds
+
+    def percentile_ms(self, percentile: float) -> float | None:
+        """Upper bound of the bucket holding the given percentile (0-1) of the calls."""
+        calls = self.calls
+        if not calls:
+            return None
+        rank = max(1, math.ceil(percentile * calls))
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, self.counts, strict=True):
+            seen += count
+            if seen >= rank:
+                return bound
+        return math.inf
+
+    def __str__(self) -> str:
+        if not self.calls:
+            return "no calls"
+        return (
+            f"{self.calls} calls, {self.total_seconds / self.calls * 1000:.1f}ms avg, "
+            f"p50 <= {self.percentile_ms(0.5)}ms, p95 <= {self.percentile_ms(0.95)}ms"
+        )
+
+
+def get_command_type(command: str) -> str:
+    """Groups commands by program, e.g. `dumpsys`, `getprop`, `input`."""
+    words = command.split()
+    return words[0].rsplit("/", 1)[-1] if words else "empty"
+
+
+class AdbLatencyStats:
+    """Latency histograms of shell commands, per command type."""
+
+    def __init__(self):
+        self._histograms: dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, command: str, seconds: float) -> None:
+        with self._lock:
+            self._histograms.setdefault(get_command_type(command), LatencyHistogram()).record(
+                seconds
+            )
+
+    def get(self) -> dict[str, LatencyHistogram]:
+        with self._lock:
+            return {key: h.model_copy(deep=True) for key, h in self._histograms.items()}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+
+class AdbShellSession:
+    """A `sh` process kept alive on the device, running one command at a time."""
+
+    def __init__(self, device: AdbDevice):
+        self._connection: AdbConnection = device.open_shell("sh")
+        self._buffer = b""
+
+    @property
+    def closed(self) -> bool:
+        return self._connection.closed
+
+    def run(self, command: str, timeout: float = DEFAULT_COMMAND_TIMEOUT_SECONDS) -> ShellResult:
+        marker = f"__MU_END_{uuid.uuid4().hex}__".encode()
+        # The command can't consume the next ones from stdin, and its output is followed by
+        # a newline so that the marker always starts a line
+        script = f"{{ {command}\n}} </dev/null; printf '\\n%s %d\\n' {marker.decode()} $?\n"
+        self._connection.send(script.encode())
+
+        deadline = time.monotonic() + timeout
+        end = b"\n" + marker + b" "
+        while True:
+            index = self._buffer.find(end)
+            if index >= 0:
+                line_end = self._buffer.find(b"\n", index + len(end))
+                if line_end >= 0:
+                    break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.close()
+                raise AdbTimeout(f"Shell command timed out after {timeout}s: {command}")
+            self._connection.conn.settimeout(remaining)
+            try:
+                chunk = self._connection.conn.recv(_READ_SIZE)
+            except TimeoutError:
+                continue
+            if not chunk:
+                self.close()
+                raise AdbError(f"Shell session closed while running: {command}")
+            self._buffer += chunk
+
+        output = self._buffer[:index].decode("utf-8", errors="replace")
+        returncode = int(self._buffer[index + len(end) : line_end])
+        self._buffer = self._buffer[line_end + 1 :]
+        return ShellResult(command=command, output=output.rstrip(), returncode=returncode)
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+class AdbSessionPool:
+    """
+    Persistent shell sessions of one device. Commands are spread over at most `max_sessions`
+    sessions, opened lazily, and wait for a free session beyond that.
+    """
+
+    def __init__(
+        self,
+        device: AdbDevice,
+        max_sessions: int = MAX_SESSIONS_PER_DEVICE,
+        stats: AdbLatencyStats | None = None,
+    ):
+        self.device = device
+        self.stats = stats or AdbLatencyStats()
+        self._slots = threading.BoundedSemaphore(max_sessions)
+        self._idle: queue.SimpleQueue[AdbShellSession] = queue.SimpleQueue()
+        self._sessions: list[AdbShellSession] = []
+        self._lock = threading.Lock()
+
+    def run(self, command: str, timeout: float = DEFAULT_COMMAND_TIMEOUT_SECONDS) -> ShellResult:
+        start = time.perf_counter()
+        with self._slots:
+            session = self._acquire()
+            try:
+                result = session.run(command, timeout=timeout)
+            except AdbTimeout:
+                raise
+            except (AdbError, OSError):
+                # The session may have been closed by the device (e.g. adbd restart):
+                # the command is retried once on a new one
+                session.close()
+                session = self._acquire()
+                result = session.run(command, timeout=timeout)
+            finally:
+                if not session.closed:
+                    self._idle.put(session)
+        self.stats.record(command, time.perf_counter() - start)
+        return result
+
+    async def arun(
+        self, command: str, timeout: float = DEFAULT_COMMAND_TIMEOUT_SECONDS
+    ) -> ShellResult:
+        return await asyncio.to_thread(self.run, command, timeout)
+
+    def shell(self, command: str, timeout: float = DEFAULT_COMMAND_TIMEOUT_SECONDS) -> str:
+        """Output of `command`, as returned by `AdbDevice.shell`."""
+        return self.run(command, timeout=timeout).output
+
+    async def ashell(self, command: str, timeout: float = DEFAULT_COMMAND_TIMEOUT_SECONDS) -> str:
+        return (await self.arun(command, timeout=timeout)).output
+
+    def close(self) -> None:
+        with self._lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions.clear()
+
+    def _acquire(self) -> AdbShellSession:
+        while True:
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if not session.closed:
+                return session
+        session = AdbShellSession(self.device)
+        with self._lock:
+            self._sessions = [s for s in self._sessions if not s.closed] + [session]
+        return session
+
+
+class AdbSessionManager:
+    """Process-wide persistent shell sessions, by device, sharing one latency histogram set."""
+
+    def __init__(self, max_sessions_per_device: int = MAX_SESSIONS_PER_DEVICE):
+        self.max_sessions_per_device = max_sessions_per_device
+        self.stats = AdbLatencyStats()
+        self._pools: dict[str, AdbSessionPool] = {}
+        self._lock = threading.Lock()
+
+    def get(self, ctx: MobileUseContext) -> AdbSessionPool:
+        with self._lock:
+            pool = self._pools.get(ctx.device.device_id)
+            if pool is None:
+                pool = self._pools[ctx.device.device_id] = AdbSessionPool(
+                    ctx.get_adb_client().device(serial=ctx.device.device_id),
+                    max_sessions=self.max_sessions_per_device,
+                    stats=self.stats,
+                )
+            return pool
+
+    def shell(
+        self, ctx: MobileUseContext, command: str, timeout: float = DEFAULT_COMMAND_TIMEOUT_SECONDS
+    ) -> str:
+        return self.get(ctx).shell(command, timeout=timeout)
+
+    async def ashell(
+        self, ctx: MobileUseContext, command: str, timeout: float = DEFAULT_COMMAND_TIMEOUT_SECONDS
+    ) -> str:
+        return await self.get(ctx).ashell(command, timeout=timeout)
+
+    def clear(self) -> None:
+        with self._lock:
+            for pool in self._pools.values():
+                pool.close()
+            self._pools.clear()
+
+
+def get_adb_client() -> AdbClient:
+    """Client of the ADB server set by ADB_HOST and ADB_PORT."""
+    return AdbClient(host=settings.ADB_HOST or "localhost", port=settings.ADB_PORT or 5037)
+
+
+def list_adb_devices(adb_client: AdbClient | None = None) -> list[str] | None:
+    """
+    Serials of the devices ready on the ADB server, queried over its socket instead of spawning
+    `adb devices`. Returns None if the server can't be reached.
+    """
+    if adb_client is None:
+        adb_client = get_adb_client()
+    try:
+        return [device.serial for device in adb_client.list() if device.state == "device"]
+    except (AdbError, OSError) as e:
+        logger.debug(f"ADB server unreachable: {e}")
+        return None
+
+
+class AdbBenchmarkResult(BaseModel):
+    per_call: dict[str, LatencyHistogram]
+    session: dict[str, LatencyHistogram]
+
+    def __str__(self) -> str:
+        lines = []
+        for command_type in sorted(self.per_call):
+            lines.append(f"{command_type}:")
+            lines.append(f"  per call: {self.per_call[command_type]}")
+            lines.append(f"  session:  {self.session.get(command_type, LatencyHistogram())}")
+        return "\n".join(lines)
+
+
+def benchmark_adb_shell(
+    device: AdbDevice, commands: list[str], iterations: int = 20
+) -> AdbBenchmarkResult:
+    """Compares the latency of `commands` run with `AdbDevice.shell` and over a session pool."""
+    per_call, session = AdbLatencyStats(), AdbLatencyStats()
+    pool = AdbSessionPool(device, max_sessions=1)
+
+    def measure(run: Callable[[str], object], stats: AdbLatencyStats) -> None:
+        for _ in range(iterations):
+            for command in commands:
+                start = time.perf_counter()
+                run(command)
+                stats.record(command, time.perf_counter() - start)
+
+    try:
+        pool.run("true")  # opens the session outside of the measures
+        measure(device.shell, per_call)
+        measure(pool.shell, session)
+        return AdbBenchmarkResult(per_call=per_call.get(), session=session.get())
+    finally:
+        pool.close()
+
+
+adb_sessions = AdbSessionManager()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark persistent ADB shell sessions")
+    parser.add_argument("--serial", help="Device serial, defaults to the first device")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    client = get_adb_client()
+    print(
+        benchmark_adb_shell(
+            client.device(serial=args.serial or client.list()[0].serial),
+            commands=[
+                "date",
+                "getprop ro.build.version.sdk",
+                "dumpsys window | grep mCurrentFocus",
+            ],
+            iterations=args.iterations,
+        )
+    )
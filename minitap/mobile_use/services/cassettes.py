@@ -0,0 +1,151 @@
+"""
+LLM cassettes: responses recorded from live runs (see `LLM_RECORD_CASSETTE`) and replayed
+by the `replay` provider, to run the graph offline and deterministically.
+
+A cassette is a JSONL file with one entry per LLM call:
+`{"node": ..., "index": ..., "messages_hash": ..., "response": ...}`.
+"""
+
+import json
+import threading
+from pathlib import Path
+from typing import Any
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, messages_from_dict
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import BaseModel
+
+from minitap.mobile_use.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class CassetteMissError(LookupError):
+    pass
+
+
+class CassetteEntry(BaseModel):
+    node: str
+    index: int
+    messages_hash: str
+    response: Any
+
+
+class LLMCassette:
+    """
+    Replayed responses are matched by agent node and messages hash first, so that replaying
+    an identical run is exact. When the messages differ (e.g. a new screenshot),
+    the next unused response recorded for the node is served, following the call order.
+
+    Recording into an existing cassette appends to it, numbering the calls of each node
+    after the recorded ones.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        # Every entry, in recording order
+        self._all_entries: list[CassetteEntry] = []
+        self._entries: dict[str, list[CassetteEntry]] = {}
+        self._used: set[int] = set()
+        self._recorded_calls: dict[str, int] = {}
+        if path.exists():
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = CassetteEntry.model_validate_json(line)
+                        self._all_entries.append(entry)
+                        self._entries.setdefault(entry.node, []).append(entry)
+                        self._recorded_calls[entry.node] = max(
+                            self._recorded_calls.get(entry.node, 0), entry.index + 1
+                        )
+
+    def next_response(self, node: str | None, messages_hash: str) -> Any:
+        """
+        Serves the response recorded for `node`, or for any node when it is None
+        (e.g. a replay model invoked directly, which doesn't know its node).
+        """
+        with self._lock:
+            entries = self._all_entries if node is None else self._entries.get(node, [])
+            unused = [entry for entry in entries if id(entry) not in self._used]
+            match = next((e for e in unused if e.messages_hash == messages_hash), None)
+            if match is None and unused:
+                match = unused[0]
+                logger.debug(
+                    f"No recorded {node or 'LLM'} call matches the messages, replaying in order"
+                )
+            if match is None:
+                raise CassetteMissError(
+                    f"No recorded {node or 'LLM'} response left in cassette {self.path} "
+                    f"({len(entries)} recorded)"
+                )
+            self._used.add(id(match))
+            return match.response
+
+    def record(self, node: str, messages_hash: str, response: Any) -> None:
+        with self._lock:
+            index = self._recorded_calls.get(node, 0)
+            self._recorded_calls[node] = index + 1
+            entry = CassetteEntry(
+                node=node, index=index, messages_hash=messages_hash, response=response
+            )
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(entry.model_dump_json() + "\n")
+
+
+_cassettes: dict[Path, LLMCassette] = {}
+_cassettes_lock = threading.Lock()
+
+
+def get_cassette(path: Path | str) -> LLMCassette:
+    path = Path(path).resolve()
+    with _cassettes_lock:
+        cassette = _cassettes.get(path)
+        if cassette is None:
+            cassette = _cassettes[path] = LLMCassette(path)
+        return cassette
+
+
+def clear_cassettes() -> None:
+    with _cassettes_lock:
+        _cassettes.clear()
+
+
+class ReplayChatModel(BaseChatModel):
+    """
+    Chat model of the `replay` provider, whose `model` is the cassette path.
+    Its responses are served by `invoke_llm`, which knows the agent node and output schema
+    they were recorded for; tools and structured output are therefore no-ops.
+    Invoked directly, it serves the responses of any node, as messages.
+    """
+
+    cassette_path: str
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    def _generate(self, messages: list[BaseMessage], *args, **kwargs) -> ChatResult:
+        # Imported here, as the LLM service depends on this module
+        from minitap.mobile_use.services.llm import get_messages_hash
+
+        response = get_cassette(self.cassette_path).next_response(
+            node=None, messages_hash=get_messages_hash(messages)
+        )
+        return ChatResult(generations=[ChatGeneration(message=_to_message(response))])
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def with_structured_output(self, schema, **kwargs):
+        return self
+
+
+def _to_message(response: dict) -> BaseMessage:
+    """The recorded response as a message: structured outputs become their JSON content."""
+    if "message" in response:
+        return messages_from_dict([response["message"]])[0]
+    value = response["model"] if "model" in response else response.get("dict")
+    return AIMessage(content=json.dumps(value, ensure_ascii=False))
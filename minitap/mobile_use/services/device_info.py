@@ -0,0 +1,169 @@
+"""
+Device facts cached once per session: static ones (screen size, SDK level, locale, timezone)
+and the device/host clock offset, from which the device date is computed locally.
+"""
+
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone, tzinfo
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from pydantic import BaseModel
+
+from minitap.mobile_use.context import DevicePlatform, MobileUseContext
+from minitap.mobile_use.services.adb_session import adb_sessions
+from minitap.mobile_use.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEVICE_DATE_FORMAT = "%a %b %d %H:%M:%S %Z %Y"
+# The clock offset drifts slowly (NTP sync, manual change), it is re-measured on this interval
+CLOCK_RECHECK_INTERVAL_SECONDS = 600.0
+
+_CLOCK_COMMAND = "date +'%s %z %Z'"
+_STATIC_PROPS_COMMAND = (
+    "getprop ro.build.version.sdk; getprop persist.sys.locale; getprop ro.product.locale; "
+    "getprop persist.sys.timezone; wm size"
+)
+_SCREEN_SIZE_RE = re.compile(r"size:\s*(\d+)x(\d+)")
+_UTC_OFFSET_RE = re.compile(r"^([+-])(\d{2})(\d{2})$")
+
+
+class DeviceClock(BaseModel):
+    # Device time minus host time, in seconds
+    offset_seconds: float
+    utc_offset_seconds: int
+    timezone_abbreviation: str | None = None
+    measured_at: float
+
+
+class DeviceInfo(BaseModel):
+    device_id: str
+    platform: DevicePlatform
+    screen_width: int
+    screen_height: int
+    sdk_level: int | None = None
+    locale: str | None = None
+    timezone: str | None = None
+    clock: DeviceClock | None = None
+
+    def get_timezone(self) -> tzinfo | None:
+        if self.timezone:
+            try:
+                return ZoneInfo(self.timezone)
+            except (ZoneInfoNotFoundError, ValueError):
+                pass
+        if self.clock is None:
+            return None
+        return timezone(
+            timedelta(seconds=self.clock.utc_offset_seconds), self.clock.timezone_abbreviation
+        )
+
+    def now(self) -> datetime:
+        """Current device date, computed from the host clock and the measured offset."""
+        if self.clock is None:
+            return datetime.now().astimezone()
+        return datetime.fromtimestamp(time.time() + self.clock.offset_seconds, self.get_timezone())
+
+
+class DeviceInfoService:
+    """
+    Process-wide cache of `DeviceInfo`, by device.
+
+    Static facts are queried once; the clock is measured with the same round trip on first use
+    and re-measured every `clock_recheck_interval_seconds`.
+    """
+
+    def __init__(self, clock_recheck_interval_seconds: float = CLOCK_RECHECK_INTERVAL_SECONDS):
+        self.clock_recheck_interval_seconds = clock_recheck_interval_seconds
+        self._infos: dict[str, DeviceInfo] = {}
+        self._lock = threading.Lock()
+        # Probes run under a lock per device, so that a slow device doesn't block the others
+        self._device_locks: dict[str, threading.Lock] = {}
+
+    def get(self, ctx: MobileUseContext) -> DeviceInfo:
+        device_id = ctx.device.device_id
+        with self._lock:
+            device_lock = self._device_locks.setdefault(device_id, threading.Lock())
+        with device_lock:
+            with self._lock:
+                info = self._infos.get(device_id)
+            if info is None:
+                info = _probe_device_info(ctx)
+                with self._lock:
+                    self._infos[device_id] = info
+            elif (
+                info.clock is not None
+                and time.monotonic() - info.clock.measured_at > self.clock_recheck_interval_seconds
+            ):
+                info.clock = _probe_clock(ctx)
+            return info
+
+    def get_device_date(self, ctx: MobileUseContext) -> str:
+        return self.get(ctx).now().strftime(DEVICE_DATE_FORMAT)
+
+    def evict(self, device_id: str) -> None:
+        with self._lock:
+            self._infos.pop(device_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._infos.clear()
+
+
+def _probe_device_info(ctx: MobileUseContext) -> DeviceInfo:
+    info = DeviceInfo(
+        device_id=ctx.device.device_id,
+        platform=ctx.device.mobile_platform,
+        screen_width=ctx.device.device_width,
+        screen_height=ctx.device.device_height,
+    )
+    if ctx.device.mobile_platform == DevicePlatform.IOS:
+        # Simulators share the host clock and timezone
+        return info
+
+    output = adb_sessions.shell(ctx, _STATIC_PROPS_COMMAND)
+    lines = [line.strip() for line in output.splitlines()]
+    lines += [""] * (4 - len(lines))
+    sdk_level, persist_locale, product_locale, tz_name = lines[:4]
+    info.sdk_level = int(sdk_level) if sdk_level.isdigit() else None
+    info.locale = persist_locale or product_locale or None
+    info.timezone = tz_name or None
+    # The override size, listed last, is the one in effect
+    screen_sizes = _SCREEN_SIZE_RE.findall("\n".join(lines[4:]))
+    if screen_sizes:
+        info.screen_width, info.screen_height = (int(v) for v in screen_sizes[-1])
+    info.clock = _probe_clock(ctx)
+    logger.info(
+        f"Device {info.device_id}: SDK {info.sdk_level}, locale {info.locale}, "
+        f"timezone {info.timezone}, clock offset {info.clock.offset_seconds:+.1f}s"
+    )
+    return info
+
+
+def _probe_clock(ctx: MobileUseContext) -> DeviceClock:
+    start = time.time()
+    output = adb_sessions.shell(ctx, _CLOCK_COMMAND).strip()
+    # The device clock is read halfway through the round trip
+    host_time = (start + time.time()) / 2
+    epoch, utc_offset, *abbreviation = output.split()
+    return DeviceClock(
+        # `date +%s` has a one second resolution: smaller offsets are noise
+        offset_seconds=round(int(epoch) - host_time),
+        utc_offset_seconds=_parse_utc_offset(utc_offset),
+        timezone_abbreviation=abbreviation[0] if abbreviation else None,
+        measured_at=time.monotonic(),
+    )
+
+
+def _parse_utc_offset(value: str) -> int:
+    match = _UTC_OFFSET_RE.match(value)
+    if not match:
+        return 0
+    sign, hours, minutes = match.groups()
+    seconds = int(hours) * 3600 + int(minutes) * 60
+    return -seconds if sign == "-" else seconds
+
+
+device_info_service = DeviceInfoService()
@@ -0,0 +1,180 @@
+"""
+Tracks the foreground app of a device from signals that are already available, instead of
+running the expensive `dumpsys window` on every step:
+- the packages of the UI hierarchy streamed by the Screen API,
+- the activity launches logged by the ActivityTaskManager, followed by a background logcat stream.
+
+`dumpsys window` is only used when the hierarchy does not tell the foreground package apart.
+"""
+
+import re
+import threading
+from collections import Counter
+
+from adbutils import AdbConnection, AdbDevice
+from pydantic import BaseModel
+
+from minitap.mobile_use.context import DevicePlatform, MobileUseContext
+from minitap.mobile_use.controllers.platform_specific_commands_controller import (
+    get_adb_device,
+    get_focused_app_info,
+)
+from minitap.mobile_use.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Packages drawing over every app, which never are the focused app by themselves
+OVERLAY_PACKAGES = {"android", "com.android.systemui"}
+# Share of the hierarchy packages the foreground package must reach to be trusted
+MIN_PACKAGE_SHARE = 0.6
+
+_LOGCAT_COMMAND = "logcat -v brief -T 1 ActivityTaskManager:I ActivityManager:I *:S"
+_LOGCAT_RETRY_SECONDS = 5.0
+_DISPLAYED_RE = re.compile(r"Displayed ([\w.]+)/([\w.$]+)")
+_START_RE = re.compile(r"START u\d+ \{.*?cmp=([\w.]+)/([\w.$]+)")
+_DUMPSYS_FOCUS_RE = re.compile(r"mCurrentFocus=Window\{\S+ \S+ ([\w.]+)(?:/([\w.$]+))?\}")
+
+
+class FocusedApp(BaseModel):
+    package: str
+    activity: str | None = None
+    source: str
+
+    def __str__(self) -> str:
+        return f"{self.package}/{self.activity}" if self.activity else self.package
+
+
+def get_hierarchy_packages(elements: list) -> Counter[str]:
+    """Counts the packages of the elements of a UI hierarchy, from their package or resource-id."""
+    packages: Counter[str] = Counter()
+    stack = list(elements)
+    while stack:
+        element = stack.pop()
+        if not isinstance(element, dict):
+            continue
+        attributes = element.get("attributes", element)
+        package = attributes.get("package") or attributes.get("packageName")
+        resource_id = attributes.get("resource-id") or attributes.get("resourceId") or ""
+        if not package and ":id/" in resource_id:
+            package = resource_id.split(":id/", 1)[0]
+        if package:
+            packages[package] += 1
+        stack.extend(element.get("children", []))
+    return packages
+
+
+def get_foreground_package(elements: list) -> str | None:
+    """The package owning most of the hierarchy, or None when the hierarchy is ambiguous."""
+    packages = get_hierarchy_packages(elements)
+    for overlay in OVERLAY_PACKAGES:
+        packages.pop(overlay, None)
+    if not packages:
+        return None
+    package, count = packages.most_common(1)[0]
+    if count / packages.total() < MIN_PACKAGE_SHARE:
+        return None
+    return package
+
+
+class FocusedAppTracker:
+    """
+    Foreground app of one device. The latest activity launch is followed by a background logcat
+    stream, and the foreground package is confirmed against each new UI hierarchy.
+    """
+
+    def __init__(self, ctx: MobileUseContext):
+        self.ctx = ctx
+        self.current: FocusedApp | None = None
+        self._last_launch: tuple[str, str] | None = None
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._connection: AdbConnection | None = None
+
+    def start(self) -> None:
+        if self.ctx.device.mobile_platform != DevicePlatform.ANDROID:
+            return
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._follow_launches, args=(get_adb_device(self.ctx),), daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._connection is not None:
+            self._connection.close()
+
+    def update(self, elements: list) -> FocusedApp | None:
+        """
+        Updates the focused app from a new UI hierarchy, falling back to `dumpsys window`
+        when the hierarchy is ambiguous.
+        """
+        if self.ctx.device.mobile_platform != DevicePlatform.ANDROID:
+            return None
+        package = get_foreground_package(elements)
+        if package is None:
+            self.current = self._get_from_dumpsys()
+            return self.current
+
+        last_launch = self._last_launch
+        if last_launch is not None and last_launch[0] == package:
+            self.current = FocusedApp(package=package, activity=last_launch[1], source="logcat")
+        elif self.current is None or self.current.package != package:
+            self.current = FocusedApp(package=package, source="hierarchy")
+        return self.current
+
+    def on_log_line(self, line: str) -> None:
+        match = _DISPLAYED_RE.search(line) or _START_RE.search(line)
+        if match:
+            self._last_launch = (match.group(1), match.group(2))
+
+    def _follow_launches(self, device: AdbDevice) -> None:
+        while not self._stop_event.is_set():
+            try:
+                connection = self._connection = device.shell(
+                    _LOGCAT_COMMAND, stream=True, timeout=None
+                )
+                with connection, connection.conn.makefile("r", errors="ignore") as lines:
+                    for line in lines:
+                        if self._stop_event.is_set():
+                            return
+                        self.on_log_line(line)
+            except Exception as e:
+                logger.debug(f"Focused app logcat stream interrupted: {e}")
+            self._stop_event.wait(_LOGCAT_RETRY_SECONDS)
+
+    def _get_from_dumpsys(self) -> FocusedApp | None:
+        output = get_focused_app_info(self.ctx)
+        if not output:
+            return None
+        match = _DUMPSYS_FOCUS_RE.search(output)
+        if match is None:
+            logger.debug(f"Unable to parse the focused app from dumpsys: {output}")
+            return None
+        return FocusedApp(package=match.group(1), activity=match.group(2), source="dumpsys")
+
+
+class FocusedAppTrackers:
+    """Process-wide focused app trackers, by device, (re)started when read."""
+
+    def __init__(self):
+        self._trackers: dict[str, FocusedAppTracker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, ctx: MobileUseContext) -> FocusedAppTracker:
+        with self._lock:
+            tracker = self._trackers.get(ctx.device.device_id)
+            if tracker is None:
+                tracker = self._trackers[ctx.device.device_id] = FocusedAppTracker(ctx)
+        tracker.start()
+        return tracker
+
+    def clear(self) -> None:
+        with self._lock:
+            for tracker in self._trackers.values():
+                tracker.stop()
+            self._trackers.clear()
+
+
+focused_app_trackers = FocusedAppTrackers()
@@ -1,23 +1,205 @@
+import asyncio
+import hashlib
+import json
 import logging
-from collections.abc import Awaitable, Callable
-from typing import Literal, TypeVar, overload
+import math
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Hashable
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Literal, overload
 
+import httpx
+import openai
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.exceptions import OutputParserException
 from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, message_to_dict, messages_from_dict
+from langchain_core.messages.ai import UsageMetadata, add_usage
+from langchain_core.outputs import LLMResult
+from langchain_core.runnables import Runnable, RunnableLambda
+from langchain_core.runnables.config import ensure_config, merge_configs
+from langchain_core.tools import BaseTool
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_google_vertexai import ChatVertexAI
 from langchain_openai import ChatOpenAI
+from openai import DefaultAsyncHttpxClient, DefaultHttpxClient
+from pydantic import BaseModel, ValidationError
 
 from minitap.mobile_use.config import (
+    LLM,
     AgentNode,
     AgentNodeWithFallback,
+    HedgingConfig,
+    LLMProvider,
     LLMUtilsNode,
     LLMWithFallback,
+    RateLimitConfig,
+    ResponseCacheConfig,
+    RetryConfig,
     settings,
 )
 from minitap.mobile_use.context import MobileUseContext
+from minitap.mobile_use.services.cassettes import CassetteMissError, ReplayChatModel, get_cassette
+from minitap.mobile_use.services.task_metrics import (
+    AGENT_NODE_METADATA_KEY,
+    LLM_FALLBACK_METADATA_KEY,
+    LLM_MODEL_METADATA_KEY,
+)
+from minitap.mobile_use.utils.json_repair import coerce_to_model, repair_json
 
 logger = logging.getLogger(__name__)
 
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+XAI_BASE_URL = "https://api.x.ai/v1"
+
+# Connection pool limits shared by every OpenAI-compatible client (openai, openrouter, xai)
+HTTP_POOL_LIMITS = httpx.Limits(
+    max_connections=64,
+    max_keepalive_connections=16,
+    keepalive_expiry=60,
+)
+
+
+class LLMClientMetrics(BaseModel):
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    build_seconds_total: float = 0.0
+    live_clients: int = 0
+    live_http_pools: int = 0
+
+
+class _LoopScope:
+    """The clients and async HTTP clients of one event loop."""
+
+    def __init__(self):
+        self.clients: dict[tuple[Hashable, ...], Any] = {}
+        self.async_http_clients: dict[str, httpx.AsyncClient] = {}
+
+
+class LLMClientRegistry:
+    """
+    Process-wide registry of LLM clients.
+
+    Clients are memoized by (provider, model, temperature, structured schema) so that every
+    node invocation reuses the same client instead of building a new one. OpenAI-compatible
+    providers additionally share one HTTP connection pool per base URL, so TLS connections are
+    kept alive across nodes, steps and tasks.
+
+    Async HTTP pools are bound to the event loop that created them: clients are memoized per
+    event loop, and dropped once their loop is closed. Sync HTTP pools are
+    shared by every loop and thread, and never closed by the registry since a client built
+    earlier may still use them: evicted pools are closed by the garbage collector.
+    """
+
+    def __init__(self):
+        self._scopes: dict[asyncio.AbstractEventLoop, _LoopScope] = {}
+        # Clients built outside of any event loop
+        self._default_scope = _LoopScope()
+        self._sync_http_clients: dict[str, httpx.Client] = {}
+        self._lock = threading.RLock()
+        self._metrics = LLMClientMetrics()
+
+    def get_or_create(self, key: tuple[Hashable, ...], factory: Callable[[], Any]) -> Any:
+        with self._lock:
+            scope = self._get_scope()
+            client = scope.clients.get(key)
+            if client is not None:
+                self._metrics.hits += 1
+                return client
+
+            start = time.perf_counter()
+            client = factory()
+            elapsed = time.perf_counter() - start
+            scope.clients[key] = client
+            self._metrics.misses += 1
+            self._metrics.build_seconds_total += elapsed
+            logger.debug(f"Built LLM client {key} in {elapsed * 1000:.1f}ms")
+            return client
+
+    def get_http_clients(self, base_url: str | None) -> tuple[httpx.Client, httpx.AsyncClient]:
+        """
+        Returns the sync HTTP client shared by every client of this base URL, and the async
+        HTTP client shared by the clients of this base URL on the running event loop.
+        """
+        pool_key = base_url or "default"
+        with self._lock:
+            sync_client = self._sync_http_clients.get(pool_key)
+            if sync_client is None:
+                sync_client = DefaultHttpxClient(limits=HTTP_POOL_LIMITS)
+                self._sync_http_clients[pool_key] = sync_client
+            scope = self._get_scope()
+            async_client = scope.async_http_clients.get(pool_key)
+            if async_client is None:
+                async_client = DefaultAsyncHttpxClient(limits=HTTP_POOL_LIMITS)
+                scope.async_http_clients[pool_key] = async_client
+            return sync_client, async_client
+
+    def evict(self, provider: LLMProvider | None = None, model: str | None = None) -> int:
+        """
+        Evicts the memoized clients matching the given provider and/or model, on every event
+        loop. Evicts every client when no filter is given. Returns the number of evicted clients.
+        """
+        with self._lock:
+            evicted = 0
+            for scope in self._all_scopes():
+                keys = [
+                    key
+                    for key in scope.clients
+                    if (provider is None or key[0] == provider)
+                    and (model is None or key[1] == model)
+                ]
+                for key in keys:
+                    del scope.clients[key]
+                evicted += len(keys)
+            self._metrics.evictions += evicted
+            if provider is None and model is None:
+                self._scopes.clear()
+                self._default_scope = _LoopScope()
+                self._sync_http_clients.clear()
+            return evicted
+
+    def clear(self) -> None:
+        self.evict()
+
+    def metrics(self) -> LLMClientMetrics:
+        with self._lock:
+            return self._metrics.model_copy(
+                update={
+                    "live_clients": sum(len(scope.clients) for scope in self._all_scopes()),
+                    "live_http_pools": len(self._sync_http_clients),
+                }
+            )
+
+    def _get_scope(self) -> _LoopScope:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return self._default_scope
+        scope = self._scopes.get(loop)
+        if scope is None:
+            # The clients of closed loops can't be used anymore
+            for closed_loop in [other for other in self._scopes if other.is_closed()]:
+                del self._scopes[closed_loop]
+            scope = self._scopes[loop] = _LoopScope()
+        return scope
+
+    def _all_scopes(self) -> list[_LoopScope]:
+        return [self._default_scope, *self._scopes.values()]
+
+
+llm_clients = LLMClientRegistry()
+
+
+def get_llm_client_metrics() -> LLMClientMetrics:
+    return llm_clients.metrics()
+
 
 def get_google_llm(
     model_name: str = "gemini-2.5-pro",
@@ -52,11 +234,14 @@ def get_openai_llm(
     temperature: float = 1,
 ) -> ChatOpenAI:
     assert settings.OPENAI_API_KEY is not None
+    http_client, http_async_client = llm_clients.get_http_clients(settings.OPENAI_BASE_URL)
     client = ChatOpenAI(
         model=model_name,
         api_key=settings.OPENAI_API_KEY,
         base_url=settings.OPENAI_BASE_URL,
         temperature=temperature,
+        http_client=http_client,
+        http_async_client=http_async_client,
     )
     return client
 
@@ -65,22 +250,28 @@ def get_openrouter_llm(model_name: str, temperature: float = 1):
     assert settings.OPEN_ROUTER_API_KEY is not None
     # Return a standard ChatOpenAI client for OpenRouter. Structured output handling
     # will be applied by helper functions to avoid modifying Pydantic model fields.
+    http_client, http_async_client = llm_clients.get_http_clients(OPENROUTER_BASE_URL)
     client = ChatOpenAI(
         model=model_name,
         temperature=temperature,
         api_key=settings.OPEN_ROUTER_API_KEY,
-        base_url="https://openrouter.ai/api/v1",
+        base_url=OPENROUTER_BASE_URL,
+        http_client=http_client,
+        http_async_client=http_async_client,
     )
     return client
 
 
 def get_grok_llm(model_name: str, temperature: float = 1) -> ChatOpenAI:
     assert settings.XAI_API_KEY is not None
+    http_client, http_async_client = llm_clients.get_http_clients(XAI_BASE_URL)
     client = ChatOpenAI(
         model=model_name,
         api_key=settings.XAI_API_KEY,
         temperature=temperature,
-        base_url="https://api.x.ai/v1",
+        base_url=XAI_BASE_URL,
+        http_client=http_client,
+        http_async_client=http_async_client,
     )
     return client
 
@@ -121,6 +312,49 @@ def get_llm(
     use_fallback: bool = False,
     temperature: float = 1,
 ) -> BaseChatModel:
+    llm = resolve_llm_config(ctx, name, is_utils=is_utils, use_fallback=use_fallback)
+    return _get_chat_model(llm, temperature)
+
+
+def get_llm_with_tools(
+    ctx: MobileUseContext,
+    name: AgentNode,
+    tools: list[BaseTool],
+    *,
+    tool_schemas: list[dict] | None = None,
+    temperature: float = 1,
+) -> Runnable:
+    """
+    Returns the LLM of the given agent node bound to `tools`, memoized per model and tools list.
+    OpenAI-compatible clients are bound to the pre-serialized `tool_schemas` when given.
+    """
+    llm = resolve_llm_config(ctx, name)
+    return llm_clients.get_or_create(
+        key=(llm.provider, llm.model, temperature, ("tools", tuple(id(tool) for tool in tools))),
+        factory=lambda: _bind_tools(
+            _get_chat_model(llm, temperature), tools=tools, tool_schemas=tool_schemas
+        ),
+    )
+
+
+def _bind_tools(
+    client: BaseChatModel, tools: list[BaseTool], tool_schemas: list[dict] | None
+) -> Runnable:
+    if isinstance(client, ChatOpenAI) and tool_schemas is not None:
+        # Parallel tool calls are executed one after the other by the ExecutorToolNode
+        return client.bind_tools(tool_schemas, parallel_tool_calls=True)
+    # ChatGoogleGenerativeAI does not support the "parallel_tool_calls" keyword
+    if isinstance(client, ChatGoogleGenerativeAI | ChatVertexAI):
+        return client.bind_tools(tools)
+    return client.bind_tools(tools, parallel_tool_calls=True)
+
+
+def resolve_llm_config(
+    ctx: MobileUseContext,
+    name: AgentNode | LLMUtilsNode | AgentNodeWithFallback,
+    is_utils: bool = False,
+    use_fallback: bool = False,
+) -> LLM:
     llm = (
         ctx.llm_config.get_utils(name)  # type: ignore
         if is_utils
@@ -131,6 +365,17 @@ def get_llm(
             llm = llm.fallback
         else:
             raise ValueError("LLM has no fallback!")
+    return llm
+
+
+def _get_chat_model(llm: LLM, temperature: float) -> BaseChatModel:
+    return llm_clients.get_or_create(
+        key=(llm.provider, llm.model, temperature, None),
+        factory=lambda: _build_chat_model(llm, temperature),
+    )
+
+
+def _build_chat_model(llm: LLM, temperature: float) -> BaseChatModel:
     if llm.provider == "openai":
         return get_openai_llm(llm.model, temperature)
     elif llm.provider == "google":
@@ -141,18 +386,554 @@ def get_llm(
         return get_openrouter_llm(llm.model, temperature)
     elif llm.provider == "xai":
         return get_grok_llm(llm.model, temperature)
+    elif llm.provider == "replay":
+        return ReplayChatModel(cassette_path=llm.model)
     else:
         raise ValueError(f"Unsupported provider: {llm.provider}")
 
 
-T = TypeVar("T")
+### Rate limiting
+
+# Rough token estimations, used to consume the token buckets before the actual usage is known
+CHARS_PER_TOKEN = 4
+IMAGE_TOKENS_ESTIMATE = 1000
+
+
+class LoopSafeSemaphore:
+    """
+    Semaphore shared by coroutines running on any event loop, in any thread, unlike
+    `asyncio.Semaphore` which is bound to the loop that first uses it.
+    Waiters are served in FIFO order, and woken up on their own event loop.
+    """
+
+    def __init__(self, value: int):
+        self._value = value
+        self._waiters: deque[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self._lock = threading.Lock()
+
+    async def acquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._value > 0 and not self._waiters:
+                self._value -= 1
+                return
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                is_waiting = waiter in self._waiters
+                if is_waiting:
+                    self._waiters.remove(waiter)
+            # The slot was handed over before the cancellation: pass it on
+            if not is_waiting and waiter[1].done() and not waiter[1].cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            while self._waiters:
+                loop, future = self._waiters.popleft()
+                if loop.is_closed():
+                    continue
+                # The slot is handed over to the waiter, on its own event loop
+                loop.call_soon_threadsafe(self._wake_up, future)
+                return
+            self._value += 1
+
+    def _wake_up(self, future: asyncio.Future) -> None:
+        if future.done():
+            # Cancelled in the meantime
+            self.release()
+        else:
+            future.set_result(None)
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.release()
+
+
+class TokenBucket:
+    """
+    Async token bucket refilled continuously at `per_minute` tokens per minute, usable from
+    any event loop. Waiters are served in FIFO order. Consumption can go negative when the
+    actual usage of a call exceeds its estimation, which delays the next calls accordingly.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self._rate_per_second = per_minute / 60
+        self._tokens = per_minute
+        self._updated_at = time.monotonic()
+        self._waiters = LoopSafeSemaphore(1)
+        self._state_lock = threading.Lock()
 
+    async def acquire(self, amount: float) -> float:
+        """Waits until `amount` tokens are available and consumes them. Returns the wait time."""
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        async with self._waiters:
+            while True:
+                with self._state_lock:
+                    self._refill()
+                    if self._tokens >= amount:
+                        self._tokens -= amount
+                        return waited
+                    wait_time = (amount - self._tokens) / self._rate_per_second
+                await asyncio.sleep(wait_time)
+                waited += wait_time
 
-async def with_fallback(
+    def adjust(self, amount: float) -> None:
+        """Consumes (or gives back, when negative) tokens without waiting."""
+        with self._state_lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens - amount)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated_at) * self._rate_per_second
+        )
+        self._updated_at = now
+
+
+class RateLimiterStats(BaseModel):
+    calls: int = 0
+    queued_calls: int = 0
+    wait_seconds_total: float = 0.0
+    in_flight: int = 0
+
+
+class _RateLimitState:
+    def __init__(self, config: RateLimitConfig):
+        self.config = config
+        self.semaphore = (
+            LoopSafeSemaphore(config.max_concurrency) if config.max_concurrency else None
+        )
+        self.requests = (
+            TokenBucket(config.requests_per_minute) if config.requests_per_minute else None
+        )
+        self.tokens = TokenBucket(config.tokens_per_minute) if config.tokens_per_minute else None
+        self.stats = RateLimiterStats()
+
+
+class LLMRateLimiter:
+    """
+    Process-wide rate limiter for LLM calls, configured from the `rate_limits` section of
+    the LLM config. Limits are keyed either by provider (`"openrouter"`) or by model
+    (`"openrouter/<model>"`); a call must satisfy both.
+
+    Calls exceeding a limit wait in a queue instead of being sent and rejected by the provider.
+    The limits are shared by the calls of every event loop and thread.
+    """
+
+    def __init__(self):
+        self._configs: dict[str, RateLimitConfig] = {}
+        self._states: dict[str, _RateLimitState] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, rate_limits: dict[str, RateLimitConfig]) -> None:
+        with self._lock:
+            for key, config in rate_limits.items():
+                if self._configs.get(key) != config:
+                    self._configs[key] = config
+                    self._states.pop(key, None)
+
+    @asynccontextmanager
+    async def limit(self, llm: LLM, estimated_tokens: int):
+        """
+        Waits for a free slot for the given model, and yields a callback used to report the
+        actual number of tokens used by the call.
+        """
+        states = [
+            state
+            for key in (llm.provider, f"{llm.provider}/{llm.model}")
+            if (state := self._get_state(key)) is not None
+        ]
+        acquired: list[LoopSafeSemaphore] = []
+        entered: list[_RateLimitState] = []
+        try:
+            start = time.perf_counter()
+            # Buckets are waited for before taking a concurrency slot, so that a call waiting
+            # for its budget doesn't hold a slot while sleeping
+            for state in states:
+                if state.requests is not None:
+                    await state.requests.acquire(1)
+                if state.tokens is not None:
+                    await state.tokens.acquire(estimated_tokens)
+            for state in states:
+                if state.semaphore is not None:
+                    await state.semaphore.acquire()
+                    acquired.append(state.semaphore)
+            waited = time.perf_counter() - start
+            for state in states:
+                state.stats.calls += 1
+                state.stats.in_flight += 1
+                entered.append(state)
+                if waited > 0.01:
+                    state.stats.queued_calls += 1
+                    state.stats.wait_seconds_total += waited
+            if waited > 0.01:
+                logger.debug(f"LLM call to {llm} waited {waited:.2f}s for rate limits")
+
+            def report_usage(total_tokens: int) -> None:
+                for state in states:
+                    if state.tokens is not None:
+                        state.tokens.adjust(total_tokens - estimated_tokens)
+
+            yield report_usage
+        finally:
+            for state in entered:
+                state.stats.in_flight -= 1
+            for semaphore in acquired:
+                semaphore.release()
+
+    def stats(self) -> dict[str, RateLimiterStats]:
+        with self._lock:
+            return {key: state.stats.model_copy() for key, state in self._states.items()}
+
+    def _get_state(self, key: str) -> _RateLimitState | None:
+        with self._lock:
+            state = self._states.get(key)
+            if state is None and key in self._configs:
+                state = self._states[key] = _RateLimitState(self._configs[key])
+            return state
+
+
+rate_limiter = LLMRateLimiter()
+
+
+def get_rate_limiter_stats() -> dict[str, RateLimiterStats]:
+    return rate_limiter.stats()
+
+
+def estimate_tokens(messages: list[BaseMessage]) -> int:
+    chars = 0
+    images = 0
+    for message in messages:
+        if isinstance(message.content, str):
+            chars += len(message.content)
+            continue
+        for part in message.content:
+            if isinstance(part, str):
+                chars += len(part)
+            elif part.get("type") in ("image_url", "image"):
+                images += 1
+            else:
+                chars += len(str(part.get("text", "")))
+    return chars // CHARS_PER_TOKEN + images * IMAGE_TOKENS_ESTIMATE
+
+
+DEFAULT_CONTEXT_WINDOW = 128_000
+# Context windows of known model families, in tokens, by model name prefix
+KNOWN_CONTEXT_WINDOWS = {
+    "gpt-4.1": 1_047_576,
+    "gpt-5": 400_000,
+    "gpt-4o": 128_000,
+    "o3": 200_000,
+    "o4-mini": 200_000,
+    "gemini": 1_048_576,
+    "grok-4": 256_000,
+    "grok-3": 131_072,
+    "deepseek-chat": 163_840,
+    "qwen3-coder": 262_144,
+}
+
+
+def get_context_window(llm: LLM) -> int:
+    """Context window of the model, from its config or the known model families."""
+    if llm.context_window:
+        return llm.context_window
+    # OpenRouter models are prefixed by their vendor, e.g. "openai/gpt-4.1"
+    model = llm.model.lower().rsplit("/", 1)[-1]
+    for prefix, context_window in KNOWN_CONTEXT_WINDOWS.items():
+        if model.startswith(prefix):
+            return context_window
+    return DEFAULT_CONTEXT_WINDOW
+
+
+LLMErrorKind = Literal[
+    "rate_limit",
+    "timeout",
+    "server_error",
+    "parse_error",
+    "client_error",
+    "circuit_open",
+    "unknown",
+]
+
+NON_RETRYABLE_ERROR_KINDS: set[LLMErrorKind] = {"client_error", "circuit_open"}
+# Failures that mean the model itself is unhealthy, as opposed to a bad request or response
+CIRCUIT_BREAKER_ERROR_KINDS: set[LLMErrorKind] = {"rate_limit", "timeout", "server_error"}
+MAX_RETRY_AFTER_SECONDS = 120.0
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, llm: LLM, retry_in_seconds: float):
+        super().__init__(f"Circuit breaker open for {llm}, retrying it in {retry_in_seconds:.0f}s")
+        self.llm = llm
+
+
+def _get_error_status_code(error: BaseException) -> int | None:
+    for attr in ("status_code", "code"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(error, "response", None)
+    status_code = getattr(response, "status_code", None)
+    return status_code if isinstance(status_code, int) else None
+
+
+def classify_llm_error(error: BaseException) -> LLMErrorKind:
+    if isinstance(error, CircuitOpenError):
+        return "circuit_open"
+    if isinstance(error, CassetteMissError):
+        return "client_error"
+    if isinstance(
+        error, TimeoutError | httpx.TimeoutException | openai.APITimeoutError
+    ):  # APITimeoutError must be checked before its APIConnectionError parent
+        return "timeout"
+    if isinstance(error, OutputParserException | ValidationError | json.JSONDecodeError):
+        return "parse_error"
+    status_code = _get_error_status_code(error)
+    if status_code is not None:
+        if status_code == 429:
+            return "rate_limit"
+        if status_code in (408, 504):
+            return "timeout"
+        if status_code >= 500:
+            return "server_error"
+        if 400 <= status_code < 500:
+            return "client_error"
+    if isinstance(error, httpx.TransportError | openai.APIConnectionError):
+        return "server_error"
+    return "unknown"
+
+
+def get_retry_after_seconds(error: BaseException) -> float | None:
+    """Reads the Retry-After delay sent by the provider along with the error, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failures of a model. While open, calls to the model
+    are rejected so that they go straight to the fallback model. Once `cooldown_seconds` have
+    elapsed, a single probe call is let through: it closes the breaker on success,
+    and reopens it on failure.
+    """
+
+    def __init__(self, threshold: int, cooldown_seconds: float):
+        self.threshold = threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self.times_opened = 0
+        self._probing = False
+        # Calls of a model run on several threads (sync invokes, tools run in threads)
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def retry_in_seconds(self) -> float:
+        opened_at = self.opened_at
+        if opened_at is None:
+            return 0.0
+        return max(0.0, opened_at + self.cooldown_seconds - time.monotonic())
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self._probing or self.retry_in_seconds() > 0:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def release_probe(self) -> None:
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            if self._probing or (
+                self.opened_at is None and self.consecutive_failures >= self.threshold
+            ):
+                self.opened_at = time.monotonic()
+                self.times_opened += 1
+            self._probing = False
+
+
+_circuit_breakers: dict[str, CircuitBreaker] = {}
+_circuit_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(llm: LLM, config: RetryConfig) -> CircuitBreaker:
+    key = f"{llm.provider}/{llm.model}"
+    with _circuit_breakers_lock:
+        breaker = _circuit_breakers.get(key)
+        if (
+            breaker is None
+            or breaker.threshold != config.circuit_breaker_threshold
+            or breaker.cooldown_seconds != config.circuit_breaker_cooldown_seconds
+        ):
+            breaker = _circuit_breakers[key] = CircuitBreaker(
+                threshold=config.circuit_breaker_threshold,
+                cooldown_seconds=config.circuit_breaker_cooldown_seconds,
+            )
+        return breaker
+
+
+def get_retry_delay(config: RetryConfig, attempt: int, error: BaseException) -> float:
+    """Delay before retrying the given (0-indexed) attempt that failed with `error`."""
+    retry_after = get_retry_after_seconds(error)
+    if retry_after is not None:
+        return min(retry_after, MAX_RETRY_AFTER_SECONDS)
+    if classify_llm_error(error) == "parse_error":
+        # Another sample of the same prompt is as likely to parse: no need to wait
+        return 0.0
+    # Full jitter, so that concurrent tasks hitting the same error do not retry in lockstep
+    backoff = min(config.max_delay_seconds, config.base_delay_seconds * (2**attempt))
+    return random.uniform(0, backoff)
+
+
+async def with_retry[T](
+    ctx: MobileUseContext,
+    name: AgentNode | LLMUtilsNode | AgentNodeWithFallback,
+    call: Callable[[], Awaitable[T]],
+) -> T:
+    """
+    Runs an agent node LLM call under the retry policy of the LLM config.
+    Retries and errors are counted in the node metrics of the task.
+    """
+    config = ctx.llm_config.retry
+    node_metrics = ctx.metrics.get_node(name)
+    for attempt in range(config.max_attempts):
+        try:
+            return await call()
+        except Exception as e:
+            kind = classify_llm_error(e)
+            node_metrics.llm_errors[kind] = node_metrics.llm_errors.get(kind, 0) + 1
+            logger.warning(
+                f"{name} LLM call failed with {kind} error "
+                f"(attempt {attempt + 1}/{config.max_attempts}): {e}"
+            )
+            if kind in NON_RETRYABLE_ERROR_KINDS or attempt == config.max_attempts - 1:
+                logger.error(f"{name} failed after {attempt + 1} attempt(s)")
+                raise
+            delay = get_retry_delay(config=config, attempt=attempt, error=e)
+            node_metrics.llm_retries += 1
+            logger.info(f"Retrying {name} in {delay:.1f} seconds...")
+            await asyncio.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+LATENCY_WINDOW_SIZE = 50
+LATENCY_MIN_SAMPLES = 5
+
+
+class LatencyTracker:
+    """Keeps a sliding window of the latest call latencies, per key."""
+
+    def __init__(self, window_size: int = LATENCY_WINDOW_SIZE):
+        self._window_size = window_size
+        self._samples: dict[str, deque[float]] = {}
+
+    def record(self, key: str, seconds: float) -> None:
+        self._samples.setdefault(key, deque(maxlen=self._window_size)).append(seconds)
+
+    def percentile(self, key: str, percentile: float) -> float | None:
+        samples = self._samples.get(key)
+        if not samples or len(samples) < LATENCY_MIN_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(percentile * len(ordered)) - 1))
+        return ordered[index]
+
+
+class HedgeStats(BaseModel):
+    calls: int = 0
+    hedged_calls: int = 0
+    main_wins: int = 0
+    fallback_wins: int = 0
+    failures: int = 0
+
+
+main_llm_latencies = LatencyTracker()
+_hedge_stats: dict[str, HedgeStats] = {}
+
+
+def get_hedge_stats() -> dict[str, HedgeStats]:
+    """Hedging statistics, per main model provider."""
+    return {provider: stats.model_copy() for provider, stats in _hedge_stats.items()}
+
+
+class HedgingPolicy:
+    def __init__(self, latency_key: str, provider: LLMProvider, config: HedgingConfig):
+        self.latency_key = latency_key
+        self.config = config
+        self.stats = _hedge_stats.setdefault(provider, HedgeStats())
+
+    def get_delay(self) -> float:
+        observed = main_llm_latencies.percentile(self.latency_key, self.config.percentile)
+        if observed is None:
+            return self.config.initial_delay_seconds
+        return min(self.config.max_delay_seconds, max(self.config.min_delay_seconds, observed))
+
+
+def get_hedging_policy(ctx: MobileUseContext, name: AgentNodeWithFallback) -> HedgingPolicy | None:
+    llm = ctx.llm_config.get_agent(name)
+    if not isinstance(llm, LLMWithFallback) or not llm.hedging or not llm.hedging.enabled:
+        return None
+    return HedgingPolicy(latency_key=f"{name}:{llm}", provider=llm.provider, config=llm.hedging)
+
+
+async def with_fallback[T](
     main_call: Callable[[], Awaitable[T]],
     fallback_call: Callable[[], Awaitable[T]],
     none_should_fallback: bool = True,
+    hedging: HedgingPolicy | None = None,
 ) -> T:
+    if hedging is not None:
+        return await _with_hedged_fallback(
+            main_call=main_call,
+            fallback_call=fallback_call,
+            none_should_fallback=none_should_fallback,
+            hedging=hedging,
+        )
     try:
         result = await main_call()
         if result is None and none_should_fallback:
@@ -164,6 +945,72 @@ async def with_fallback(
         return await fallback_call()
 
 
+async def _with_hedged_fallback[T](
+    main_call: Callable[[], Awaitable[T]],
+    fallback_call: Callable[[], Awaitable[T]],
+    none_should_fallback: bool,
+    hedging: HedgingPolicy,
+) -> T:
+    """
+    Runs the main call, and starts the fallback call concurrently if the main one has not
+    answered within the hedging delay. The first valid response wins, the other call is cancelled.
+    """
+    stats = hedging.stats
+    stats.calls += 1
+    start = time.perf_counter()
+    main_task = asyncio.ensure_future(main_call())
+    tasks = {main_task}
+    try:
+        delay = hedging.get_delay()
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done:
+            logger.info(f"Main LLM did not answer within {delay:.1f}s, hedging with fallback...")
+            stats.hedged_calls += 1
+            tasks.add(asyncio.ensure_future(fallback_call()))
+
+        pending = set(tasks)
+        last_error: BaseException | None = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                is_main = task is main_task
+                error = task.exception()
+                if error is not None:
+                    logger.warning(f"❗ {'Main' if is_main else 'Fallback'} LLM failed: {error}")
+                    last_error = error
+                elif task.result() is None and none_should_fallback:
+                    logger.warning(f"{'Main' if is_main else 'Fallback'} LLM returned None.")
+                else:
+                    if is_main:
+                        main_llm_latencies.record(hedging.latency_key, time.perf_counter() - start)
+                        stats.main_wins += 1
+                    else:
+                        stats.fallback_wins += 1
+                        if not main_task.done():
+                            # The main call is cancelled: its latency is at least the elapsed
+                            # time. Recording it keeps the slow calls in the distribution, or
+                            # the hedging delay would only be computed from the fast ones.
+                            main_llm_latencies.record(
+                                hedging.latency_key, time.perf_counter() - start
+                            )
+                    return task.result()
+
+                if is_main and len(tasks) == 1:
+                    # The main call failed before the hedging delay: fall back right away
+                    fallback_task = asyncio.ensure_future(fallback_call())
+                    tasks.add(fallback_task)
+                    pending.add(fallback_task)
+
+        stats.failures += 1
+        if last_error is not None:
+            raise last_error
+        return None  # type: ignore
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
 # Helper that returns a structured-output runnable with provider-aware settings
 
 
@@ -176,45 +1023,437 @@ def get_llm_with_structured_output(
     use_fallback: bool = False,
     temperature: float = 1,
 ):
-    # Resolve LLM configuration (provider/model), honoring utils and fallback
-    llm_cfg = (
-        ctx.llm_config.get_utils(name)  # type: ignore
-        if is_utils
-        else ctx.llm_config.get_agent(name)  # type: ignore
+    llm_cfg = resolve_llm_config(ctx, name, is_utils=is_utils, use_fallback=use_fallback)
+    return llm_clients.get_or_create(
+        key=(llm_cfg.provider, llm_cfg.model, temperature, _schema_cache_key(schema)),
+        factory=lambda: _build_structured_output_runnable(
+            llm_cfg=llm_cfg,
+            client=_get_chat_model(llm_cfg, temperature),
+            schema=schema,
+        ),
     )
 
-    if use_fallback:
-        if isinstance(llm_cfg, LLMWithFallback):
-            llm_cfg = llm_cfg.fallback
-        else:
-            raise ValueError("LLM has no fallback!")
-
-    provider = llm_cfg.provider
-    model_name = llm_cfg.model
-
-    # Instantiate the base client as get_llm would
-    if provider == "openai":
-        client = get_openai_llm(model_name, temperature)
-    elif provider == "google":
-        client = get_google_llm(model_name, temperature)
-    elif provider == "vertexai":
-        client = get_vertex_llm(model_name, temperature)
-    elif provider == "openrouter":
-        client = get_openrouter_llm(model_name, temperature)
-    elif provider == "xai":
-        client = get_grok_llm(model_name, temperature)
-    else:
-        raise ValueError(f"Unsupported provider: {provider}")
 
+def _build_structured_output_runnable(llm_cfg: LLM, client: BaseChatModel, schema):
     # IMPORTANT: Choose structured output method per provider
-    if provider == "openrouter":
-        # OpenRouter free models don't support json_schema; force json_mode/json_object
-        # include_raw False keeps interface like regular structured output
+    # OpenRouter free models don't support json_schema; force json_mode/json_object
+    kwargs = {"method": "json_mode"} if llm_cfg.provider == "openrouter" else {}
+    if llm_cfg.provider == "replay":
+        return client
+    if not (isinstance(schema, type) and issubclass(schema, BaseModel)):
+        return client.with_structured_output(schema, **kwargs)
+    # Keep the raw message, so that a malformed output can be repaired locally
+    # instead of re-querying the model
+    structured_llm = client.with_structured_output(schema, include_raw=True, **kwargs)
+    return structured_llm | RunnableLambda(
+        lambda output: parse_structured_output(output=output, schema=schema)
+    )
+
+
+class StructuredOutputRepairStats(BaseModel):
+    parse_failures: int = 0
+    repaired: int = 0
+
+    @property
+    def success_rate(self) -> float | None:
+        return self.repaired / self.parse_failures if self.parse_failures else None
+
+
+_repair_stats: dict[str, StructuredOutputRepairStats] = {}
+
+
+def get_structured_output_repair_stats() -> dict[str, StructuredOutputRepairStats]:
+    """Local repair statistics of the structured outputs that failed to parse, per schema."""
+    return {schema: stats.model_copy() for schema, stats in _repair_stats.items()}
+
+
+def parse_structured_output[TModel: BaseModel](output: dict, schema: type[TModel]) -> TModel:
+    """
+    Post-processes the output of a `with_structured_output(..., include_raw=True)` runnable.
+    When the model output could not be parsed, it is repaired locally; the parsing error
+    is only raised (and the call retried) if the repair fails too.
+    """
+    parsed = output.get("parsed")
+    parsing_error = output.get("parsing_error")
+    if parsed is not None and parsing_error is None:
+        return parsed
+
+    stats = _repair_stats.setdefault(schema.__name__, StructuredOutputRepairStats())
+    stats.parse_failures += 1
+    raw = output.get("raw")
+    for candidate in _get_raw_output_candidates(raw):
         try:
-            return client.with_structured_output(schema, method="json_mode", include_raw=False)
-        except TypeError:
-            # Older langchain_openai may not accept include_raw. Fall back gracefully.
-            return client.with_structured_output(schema, method="json_mode")
+            data = repair_json(candidate) if isinstance(candidate, str) else candidate
+            repaired = schema.model_validate(coerce_to_model(data, schema))
+        except (ValueError, ValidationError):
+            continue
+        stats.repaired += 1
+        logger.info(f"Repaired malformed {schema.__name__} structured output locally")
+        return repaired
+
+    logger.warning(f"Unable to repair {schema.__name__} structured output: {parsing_error}")
+    if parsing_error is not None:
+        raise parsing_error
+    raise OutputParserException(f"No {schema.__name__} structured output found", llm_output=raw)
+
+
+def _get_raw_output_candidates(raw: Any) -> list[str | dict]:
+    if not isinstance(raw, AIMessage):
+        return []
+    candidates: list[str | dict] = [tool_call["args"] for tool_call in raw.tool_calls]
+    candidates += [
+        tool_call["args"] for tool_call in raw.invalid_tool_calls if tool_call.get("args")
+    ]
+    if isinstance(raw.content, str):
+        candidates.append(raw.content)
+    else:
+        candidates.append(
+            "".join(
+                part if isinstance(part, str) else str(part.get("text", "")) for part in raw.content
+            )
+        )
+    return [candidate for candidate in candidates if candidate]
+
+
+def _schema_cache_key(schema) -> Hashable:
+    if isinstance(schema, dict):
+        return json.dumps(schema, sort_keys=True, default=str)
+    return schema
+
+
+# Providers caching prompt prefixes only where the request marks a cache breakpoint.
+# OpenAI, xAI and Gemini models used directly cache prefixes implicitly.
+CACHE_BREAKPOINT_MODEL_PREFIXES = {"openrouter": ("anthropic/", "google/gemini")}
+
+
+def supports_cache_breakpoints(llm: LLM) -> bool:
+    return llm.model.startswith(CACHE_BREAKPOINT_MODEL_PREFIXES.get(llm.provider, ()))
+
+
+def with_cache_breakpoints(
+    llm: LLM, messages: list[BaseMessage], breakpoints: list[int]
+) -> list[BaseMessage]:
+    """
+    Marks the messages at the given indexes as the end of a cacheable prompt prefix,
+    for the providers that need explicit cache breakpoints.
+    """
+    if not supports_cache_breakpoints(llm):
+        return messages
+    marked = list(messages)
+    for index in breakpoints:
+        message = marked[index]
+        content = (
+            [{"type": "text", "text": message.content}]
+            if isinstance(message.content, str)
+            else [
+                part if isinstance(part, dict) else {"type": "text", "text": part}
+                for part in message.content
+            ]
+        )
+        content[-1] = {**content[-1], "cache_control": {"type": "ephemeral"}}
+        marked[index] = message.model_copy(update={"content": content})
+    return marked
+
+
+class PromptCacheStats(BaseModel):
+    calls: int = 0
+    input_tokens: int = 0
+    cached_tokens: int = 0
+
+    @property
+    def cached_ratio(self) -> float | None:
+        return self.cached_tokens / self.input_tokens if self.input_tokens else None
+
+
+_prompt_cache_stats: dict[str, PromptCacheStats] = {}
+
+
+def get_prompt_cache_stats() -> dict[str, PromptCacheStats]:
+    """Share of the input tokens served from the provider prompt cache, per agent node."""
+    return {node: stats.model_copy() for node, stats in _prompt_cache_stats.items()}
+
+
+def _record_prompt_cache_usage(name: str, llm: LLM, usage: UsageMetadata) -> None:
+    input_tokens = usage.get("input_tokens", 0)
+    cached_tokens = usage.get("input_token_details", {}).get("cache_read", 0) or 0
+    stats = _prompt_cache_stats.setdefault(name, PromptCacheStats())
+    stats.calls += 1
+    stats.input_tokens += input_tokens
+    stats.cached_tokens += cached_tokens
+    if input_tokens:
+        logger.debug(
+            f"{name} call to {llm}: {cached_tokens}/{input_tokens} input tokens cached "
+            f"({cached_tokens / input_tokens:.0%})"
+        )
+
+
+class _UsageCollector(BaseCallbackHandler):
+    """Collects the token usage of the chat model calls made by a runnable."""
+
+    run_inline = True
+
+    def __init__(self):
+        self.usage: UsageMetadata | None = None
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                if isinstance(message, AIMessage) and message.usage_metadata:
+                    self.usage = add_usage(self.usage, message.usage_metadata)
+
+
+class ResponseCacheStats(BaseModel):
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+
+
+class LLMResponseCache:
+    """
+    SQLite store of LLM responses. Entries expire after `ttl_seconds`, and the least recently
+    used ones are evicted when the store grows over `max_size_mb`.
+    """
+
+    def __init__(self, path: Path, ttl_seconds: float, max_size_mb: float):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.stats: dict[str, ResponseCacheStats] = {}
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, node: str, key: str) -> Any | None:
+        stats = self.stats.setdefault(node, ResponseCacheStats())
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                stats.evictions += 1
+                row = None
+            elif row is not None:
+                self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        if row is None:
+            stats.misses += 1
+            return None
+        stats.hits += 1
+        return json.loads(row[0])
+
+    def set(self, node: str, key: str, value: Any) -> None:
+        stats = self.stats.setdefault(node, ResponseCacheStats())
+        serialized = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, serialized, len(serialized), now, now),
+            )
+            stats.writes += 1
+            stats.evictions += self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> int:
+        evicted = self._conn.execute(
+            "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)
+        ).rowcount
+        (total_size,) = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if total_size <= self.max_size_bytes:
+            return evicted
+        rows = self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+        ).fetchall()
+        to_delete = []
+        for key, size in rows:
+            if total_size <= self.max_size_bytes:
+                break
+            to_delete.append((key,))
+            total_size -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", to_delete)
+        return evicted + len(to_delete)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_response_caches: dict[Path, LLMResponseCache] = {}
+
+
+def get_response_cache(config: ResponseCacheConfig) -> LLMResponseCache:
+    cache = _response_caches.get(config.path)
+    if cache is None:
+        cache = _response_caches[config.path] = LLMResponseCache(
+            path=config.path,
+            ttl_seconds=config.ttl_seconds,
+            max_size_mb=config.max_size_mb,
+        )
+    cache.ttl_seconds = config.ttl_seconds
+    cache.max_size_bytes = int(config.max_size_mb * 1024 * 1024)
+    return cache
+
+
+def get_response_cache_stats() -> dict[str, ResponseCacheStats]:
+    """Response cache hits and misses, per agent node."""
+    stats: dict[str, ResponseCacheStats] = {}
+    for cache in _response_caches.values():
+        for node, node_stats in cache.stats.items():
+            merged = stats.setdefault(node, ResponseCacheStats())
+            for field in ResponseCacheStats.model_fields:
+                setattr(merged, field, getattr(merged, field) + getattr(node_stats, field))
+    return stats
+
+
+def get_response_cache_key(llm: LLM, messages: list[BaseMessage], schema=None) -> str:
+    return _hash_request({"model": str(llm)}, messages, schema)
+
+
+def get_messages_hash(messages: list[BaseMessage], schema=None) -> str:
+    """Hash of an LLM request independent of the model, used to match cassette entries."""
+    return _hash_request({}, messages, schema)
+
+
+def _hash_request(payload: dict, messages: list[BaseMessage], schema) -> str:
+    if isinstance(schema, type) and issubclass(schema, BaseModel):
+        schema = schema.model_json_schema()
+    serialized = json.dumps(
+        {
+            **payload,
+            "messages": [message_to_dict(message) for message in messages],
+            "schema": schema,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+def _serialize_response(response: Any) -> Any | None:
+    if isinstance(response, BaseMessage):
+        return {"message": message_to_dict(response)}
+    if isinstance(response, BaseModel):
+        return {"model": response.model_dump(mode="json")}
+    if isinstance(response, dict):
+        return {"dict": response}
+    return None
+
+
+def _deserialize_response(value: dict, schema=None) -> Any:
+    if "message" in value:
+        return messages_from_dict([value["message"]])[0]
+    if "model" in value and isinstance(schema, type) and issubclass(schema, BaseModel):
+        return schema.model_validate(value["model"])
+    return value.get("dict")
+
+
+async def invoke_llm(
+    ctx: MobileUseContext,
+    name: AgentNode | LLMUtilsNode | AgentNodeWithFallback,
+    llm: Runnable,
+    messages: list[BaseMessage],
+    *,
+    is_utils: bool = False,
+    use_fallback: bool = False,
+    schema=None,
+):
+    """
+    Invokes a runnable built from the LLM configured for the given agent node
+    (see `get_llm` / `get_llm_with_structured_output`), under the shared rate limits.
+    `schema` is the structured output schema of the runnable, if any: it is part of the
+    response cache key, and is used to restore cached or replayed responses.
+    """
+    llm_cfg = resolve_llm_config(ctx, name, is_utils=is_utils, use_fallback=use_fallback)
+    if llm_cfg.provider == "replay":
+        response = get_cassette(llm_cfg.model).next_response(
+            node=name, messages_hash=get_messages_hash(messages, schema)
+        )
+        return _deserialize_response(response, schema)
+
+    cache_config = ctx.llm_config.response_cache
+    cache = get_response_cache(cache_config) if name in cache_config.nodes else None
+    cache_key = get_response_cache_key(llm_cfg, messages, schema) if cache else None
+    cached = await asyncio.to_thread(cache.get, name, cache_key) if cache else None
+    if cached is not None:
+        logger.debug(f"{name} LLM response served from cache")
+        response = _deserialize_response(cached, schema)
     else:
-        # Default behavior for providers that support json_schema/function calling
-        return client.with_structured_output(schema)
+        response = await _invoke_llm(ctx, name, llm_cfg, llm, messages, is_utils, use_fallback)
+
+    serialized = _serialize_response(response)
+    if serialized is None:
+        return response
+    if cache and cached is None:
+        await asyncio.to_thread(cache.set, name, cache_key, serialized)
+    if settings.LLM_RECORD_CASSETTE:
+        get_cassette(settings.LLM_RECORD_CASSETTE).record(
+            node=name, messages_hash=get_messages_hash(messages, schema), response=serialized
+        )
+    return response
+
+
+async def _invoke_llm(
+    ctx: MobileUseContext,
+    name: AgentNode | LLMUtilsNode | AgentNodeWithFallback,
+    llm_cfg: LLM,
+    llm: Runnable,
+    messages: list[BaseMessage],
+    is_utils: bool,
+    use_fallback: bool,
+):
+    breaker = get_circuit_breaker(llm_cfg, ctx.llm_config.retry)
+    # The breaker only short-circuits main models that can be replaced by their fallback
+    has_fallback = (
+        not is_utils
+        and not use_fallback
+        and isinstance(ctx.llm_config.get_agent(name), LLMWithFallback)  # type: ignore
+    )
+    if has_fallback and not breaker.allow_request():
+        raise CircuitOpenError(llm_cfg, retry_in_seconds=breaker.retry_in_seconds())
+
+    rate_limiter.configure(ctx.llm_config.rate_limits)
+    try:
+        async with rate_limiter.limit(llm_cfg, estimate_tokens(messages)) as report_usage:
+            usage_collector = _UsageCollector()
+            config = merge_configs(
+                ensure_config(),
+                {
+                    "callbacks": [usage_collector],
+                    "metadata": {
+                        AGENT_NODE_METADATA_KEY: name,
+                        LLM_MODEL_METADATA_KEY: f"{llm_cfg.provider}/{llm_cfg.model}",
+                        LLM_FALLBACK_METADATA_KEY: use_fallback,
+                    },
+                },
+            )
+            response = await llm.ainvoke(messages, config=config)
+            if usage_collector.usage is not None:
+                report_usage(usage_collector.usage["total_tokens"])
+                _record_prompt_cache_usage(name, llm_cfg, usage_collector.usage)
+    except BaseException as e:
+        if isinstance(e, Exception) and classify_llm_error(e) in CIRCUIT_BREAKER_ERROR_KINDS:
+            was_open = breaker.is_open
+            breaker.record_failure()
+            if breaker.is_open and not was_open:
+                logger.warning(f"Circuit breaker opened for {llm_cfg}")
+        else:
+            # Cancelled (e.g. by hedging) or failed for a reason unrelated to the model health
+            breaker.release_probe()
+        raise
+    if breaker.is_open:
+        logger.info(f"Circuit breaker closed for {llm_cfg}")
+    breaker.record_success()
+    return response
@@ -0,0 +1,232 @@
+"""
+Per-device catalog of the installed apps, with a local fuzzy index from app names to packages
+(Android) or bundle ids (iOS), so that most app lookups don't need an LLM.
+"""
+
+import re
+import threading
+import time
+from difflib import SequenceMatcher
+
+from pydantic import BaseModel
+
+from minitap.mobile_use.context import DevicePlatform, MobileUseContext
+from minitap.mobile_use.controllers.platform_specific_commands_controller import list_packages
+from minitap.mobile_use.services.adb_session import adb_sessions
+from minitap.mobile_use.utils.logger import get_logger
+from minitap.mobile_use.utils.shell_utils import run_shell_command_on_host
+
+logger = get_logger(__name__)
+
+# A match is trusted when it scores at least this, with a margin over the next candidate
+MIN_MATCH_SCORE = 0.8
+MIN_MATCH_MARGIN = 0.1
+MAX_CANDIDATES = 8
+# Scales the score of apps without a launcher activity, e.g. `com.android.providers.calendar`.
+# Kept clear of 1 - MIN_MATCH_MARGIN, so that an exact hit on a launchable app isn't ambiguous.
+NON_LAUNCHABLE_PENALTY = 0.85
+# A catalog missing an app isn't rebuilt more often than this, e.g. for an app not installed
+MIN_REBUILD_INTERVAL_SECONDS = 60.0
+
+_LAUNCHER_ACTIVITIES_COMMAND = (
+    "cmd package query-activities --brief -a android.intent.action.MAIN "
+    "-c android.intent.category.LAUNCHER"
+)
+# Package name segments which don't tell apps apart
+_GENERIC_PACKAGE_TOKENS = {"com", "org", "net", "io", "android", "apps", "app", "mobile"}
+_ANDROID_PACKAGE_RE = re.compile(r"^package:(?:(.*)=)?([\w.]+)$")
+_LAUNCHER_COMPONENT_RE = re.compile(r"^\s*([\w.]+)/")
+_IOS_APP_BLOCK_RE = re.compile(r'^ {4}"?([\w.\-]+)"?\s*=\s*\{', re.MULTILINE)
+_IOS_NAME_RE = re.compile(r'CFBundle(?:Display)?Name\s*=\s*"?([^";]+)"?;')
+
+
+class PackageEntry(BaseModel):
+    package: str
+    label: str | None = None
+    launchable: bool = True
+
+
+class PackageMatch(BaseModel):
+    app_name: str
+    package: str | None = None
+    candidates: list[PackageEntry] = []
+
+    @property
+    def ambiguous(self) -> bool:
+        return self.package is None
+
+
+def normalize(text: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", text.lower())
+
+
+def _name_tokens(text: str) -> set[str]:
+    return {token for token in re.split(r"[^a-z0-9]+", text.lower()) if token}
+
+
+class PackageCatalog:
+    def __init__(self, entries: list[PackageEntry]):
+        self.entries = entries
+        self.built_at = time.monotonic()
+        self._index = [(entry, self._index_keys(entry)) for entry in entries]
+        self._packages = {entry.package for entry in entries}
+
+    def has_package(self, package: str) -> bool:
+        return package in self._packages
+
+    @staticmethod
+    def _index_keys(entry: PackageEntry) -> tuple[set[str], set[str]]:
+        """The full names of the app (label, last package segment), and its name tokens."""
+        names = {normalize(entry.package.rsplit(".", 1)[-1])}
+        tokens = _name_tokens(entry.package) - _GENERIC_PACKAGE_TOKENS
+        if entry.label:
+            names.add(normalize(entry.label))
+            tokens |= _name_tokens(entry.label)
+        return names, tokens
+
+    def search(self, app_name: str) -> list[tuple[PackageEntry, float]]:
+        """Entries matching `app_name`, best first, with a score between 0 and 1."""
+        query = normalize(app_name)
+        query_tokens = _name_tokens(app_name)
+        if not query:
+            return []
+        scored: list[tuple[PackageEntry, float]] = []
+        for entry, (names, tokens) in self._index:
+            if query in names:
+                score = 1.0
+            else:
+                # Names only found among the package tokens rank below full names
+                token_score = len(query_tokens & tokens) / len(query_tokens) * 0.9
+                if query in tokens:
+                    token_score = 0.85
+                fuzzy_score = max(
+                    SequenceMatcher(None, query, name).ratio() for name in names | tokens
+                )
+                score = max(token_score, fuzzy_score * 0.85)
+            if not entry.launchable:
+                score *= NON_LAUNCHABLE_PENALTY
+            if score > 0.3:
+                scored.append((entry, score))
+        scored.sort(key=lambda match: -match[1])
+        return scored
+
+    def match(self, app_name: str) -> PackageMatch:
+        """
+        Resolves `app_name` locally when the best match is clear and launchable (all entries are
+        without launcher data, e.g. on iOS). Otherwise the match is ambiguous, e.g. "Phone"
+        best matching the telephony service `com.android.phone` rather than the dialer app.
+        """
+        results = self.search(app_name)[:MAX_CANDIDATES]
+        candidates = [entry for entry, _ in results]
+        if not results:
+            return PackageMatch(app_name=app_name)
+        best_entry, best_score = results[0]
+        next_score = results[1][1] if len(results) > 1 else 0.0
+        if (
+            best_entry.launchable
+            and best_score >= MIN_MATCH_SCORE
+            and best_score - next_score >= MIN_MATCH_MARGIN
+        ):
+            return PackageMatch(
+                app_name=app_name, package=results[0][0].package, candidates=candidates
+            )
+        return PackageMatch(app_name=app_name, candidates=candidates)
+
+
+def parse_android_packages(packages_output: str, launcher_output: str) -> list[PackageEntry]:
+    launchable = {
+        match.group(1)
+        for line in launcher_output.splitlines()
+        if (match := _LAUNCHER_COMPONENT_RE.match(line))
+    }
+    entries: list[PackageEntry] = []
+    for line in packages_output.splitlines():
+        match = _ANDROID_PACKAGE_RE.match(line.strip())
+        if match:
+            package = match.group(2)
+            entries.append(
+                PackageEntry(package=package, launchable=not launchable or package in launchable)
+            )
+    return entries
+
+
+def parse_ios_apps(listapps_output: str) -> list[PackageEntry]:
+    blocks = list(_IOS_APP_BLOCK_RE.finditer(listapps_output))
+    entries: list[PackageEntry] = []
+    for i, block in enumerate(blocks):
+        end = blocks[i + 1].start() if i + 1 < len(blocks) else len(listapps_output)
+        names = _IOS_NAME_RE.findall(listapps_output[block.end() : end])
+        entries.append(PackageEntry(package=block.group(1), label=names[0] if names else None))
+    return entries
+
+
+def _build_catalog(ctx: MobileUseContext) -> PackageCatalog:
+    start = time.perf_counter()
+    if ctx.device.mobile_platform == DevicePlatform.IOS:
+        # The full listing, unlike `list_packages`, holds the app names
+        entries = parse_ios_apps(run_shell_command_on_host("xcrun simctl listapps booted"))
+    else:
+        try:
+            launcher_output = adb_sessions.shell(ctx, _LAUNCHER_ACTIVITIES_COMMAND)
+        except Exception as e:
+            logger.debug(f"Unable to list the launcher activities: {e}")
+            launcher_output = ""
+        entries = parse_android_packages(list_packages(ctx), launcher_output)
+    logger.info(
+        f"Built the package catalog of {ctx.device.device_id}: {len(entries)} apps "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    return PackageCatalog(entries)
+
+
+class PackageCatalogs:
+    """
+    Process-wide package catalogs, by device. A catalog is built on first use or prefetched,
+    and rebuilt after `invalidate`, e.g. when a looked up app is missing since it was installed.
+    """
+
+    def __init__(self):
+        self._catalogs: dict[str, PackageCatalog] = {}
+        self._lock = threading.Lock()
+        # Builds run under a lock per device, so that a slow build doesn't block other devices
+        self._build_locks: dict[str, threading.Lock] = {}
+
+    def get(self, ctx: MobileUseContext) -> PackageCatalog:
+        device_id = ctx.device.device_id
+        with self._lock:
+            catalog = self._catalogs.get(device_id)
+            if catalog is not None:
+                return catalog
+            build_lock = self._build_locks.setdefault(device_id, threading.Lock())
+        with build_lock:
+            with self._lock:
+                catalog = self._catalogs.get(device_id)
+            if catalog is None:
+                catalog = _build_catalog(ctx)
+                with self._lock:
+                    self._catalogs[device_id] = catalog
+            return catalog
+
+    def prefetch(self, ctx: MobileUseContext) -> None:
+        """Builds the catalog of the device in the background, if it isn't built yet."""
+        if ctx.device.device_id in self._catalogs:
+            return
+
+        def build():
+            try:
+                self.get(ctx)
+            except Exception as e:
+                logger.warning(f"Failed to prefetch the package catalog: {e}")
+
+        threading.Thread(target=build, daemon=True).start()
+
+    def invalidate(self, device_id: str) -> None:
+        with self._lock:
+            self._catalogs.pop(device_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._catalogs.clear()
+
+
+package_catalogs = PackageCatalogs()
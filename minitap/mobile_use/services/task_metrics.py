@@ -0,0 +1,111 @@
+import time
+from contextvars import ContextVar
+from typing import Any
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import LLMResult
+from langchain_core.tracers.context import register_configure_hook
+
+from minitap.mobile_use.config import ModelPricing
+from minitap.mobile_use.context import AgentNodeMetrics, TaskMetrics
+
+# Metadata set by `invoke_llm` on every LLM call
+AGENT_NODE_METADATA_KEY = "agent_node"
+LLM_MODEL_METADATA_KEY = "llm_model"
+LLM_FALLBACK_METADATA_KEY = "llm_fallback"
+
+
+class TaskMetricsCallbackHandler(BaseCallbackHandler):
+    """
+    Aggregates, per agent node, the LLM calls, tokens, latency and cost of a task,
+    as well as the wall time spent in each graph node.
+    """
+
+    run_inline = True
+
+    def __init__(self, metrics: TaskMetrics, pricing: dict[str, ModelPricing] | None = None):
+        self.metrics = metrics
+        self.pricing = pricing or {}
+        self._llm_runs: dict[UUID, tuple[AgentNodeMetrics, str | None, float]] = {}
+        self._node_runs: dict[UUID, tuple[AgentNodeMetrics, float]] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start_llm_run(run_id, kwargs.get("metadata"))
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start_llm_run(run_id, kwargs.get("metadata"))
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        run = self._llm_runs.pop(run_id, None)
+        if run is None:
+            return
+        node, model, start = run
+        node.llm_seconds += time.perf_counter() - start
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                if isinstance(message, AIMessage) and message.usage_metadata:
+                    self._add_usage(node, model, message.usage_metadata)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        run = self._llm_runs.pop(run_id, None)
+        if run is not None:
+            node, _, start = run
+            node.llm_seconds += time.perf_counter() - start
+
+    def on_chain_start(self, serialized, inputs, *, run_id: UUID, **kwargs: Any) -> None:
+        metadata = kwargs.get("metadata") or {}
+        graph_node = metadata.get("langgraph_node")
+        if graph_node is None or kwargs.get("name") != graph_node:
+            return
+        self.metrics.steps = max(self.metrics.steps, metadata.get("langgraph_step", 0))
+        self._node_runs[run_id] = (self.metrics.get_node(graph_node), time.perf_counter())
+
+    def on_chain_end(self, outputs, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end_node_run(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end_node_run(run_id)
+
+    def _start_llm_run(self, run_id: UUID, metadata: dict | None) -> None:
+        metadata = metadata or {}
+        name = metadata.get(AGENT_NODE_METADATA_KEY) or metadata.get("langgraph_node", "unknown")
+        node = self.metrics.get_node(name)
+        node.llm_calls += 1
+        if metadata.get(LLM_FALLBACK_METADATA_KEY):
+            node.fallbacks += 1
+        self._llm_runs[run_id] = (node, metadata.get(LLM_MODEL_METADATA_KEY), time.perf_counter())
+
+    def _end_node_run(self, run_id: UUID) -> None:
+        run = self._node_runs.pop(run_id, None)
+        if run is not None:
+            node, start = run
+            node.wall_seconds += time.perf_counter() - start
+
+    def _add_usage(self, node: AgentNodeMetrics, model: str | None, usage) -> None:
+        input_tokens = usage.get("input_tokens", 0)
+        output_tokens = usage.get("output_tokens", 0)
+        cached_tokens = usage.get("input_token_details", {}).get("cache_read", 0) or 0
+        node.input_tokens += input_tokens
+        node.output_tokens += output_tokens
+        node.cached_tokens += cached_tokens
+
+        pricing = self.pricing.get(model) if model else None
+        if pricing is None:
+            return
+        cached_price = pricing.cached_input if pricing.cached_input is not None else pricing.input
+        cost = (
+            (input_tokens - cached_tokens) * pricing.input
+            + cached_tokens * cached_price
+            + output_tokens * pricing.output
+        ) / 1_000_000
+        node.cost_usd = (node.cost_usd or 0.0) + cost
+
+
+task_metrics_handler: ContextVar[TaskMetricsCallbackHandler | None] = ContextVar(
+    "task_metrics_handler", default=None
+)
+# Attaches the handler of the running task to every LangChain run started in its context
+register_configure_hook(task_metrics_handler, inheritable=True)
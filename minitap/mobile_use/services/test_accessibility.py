@@ -0,0 +1,88 @@
+import gc
+import tracemalloc
+from unittest.mock import Mock
+
+from minitap.mobile_use.config import settings
+from minitap.mobile_use.context import DevicePlatform
+from minitap.mobile_use.services import accessibility
+from minitap.mobile_use.services.accessibility import (
+    HierarchyParser,
+    count_nodes,
+    get_rich_hierarchy,
+    parse_hierarchy,
+)
+
+_DUMP = (
+    b"<?xml version='1.0' encoding='UTF-8' standalone='yes' ?>"
+    b'<hierarchy rotation="0">'
+    b'<node index="0" text="" resource-id="com.app:id/root" class="android.widget.FrameLayout" '
+    b'package="com.app" content-desc="" clickable="false" focused="false" '
+    b'bounds="[0,0][1080,2400]">'
+    b'<node index="0" text="Search" resource-id="com.app:id/search" '
+    b'class="android.widget.EditText" package="com.app" content-desc="Search box" '
+    b'clickable="true" focused="true" bounds="[0,100][1080,200]" />'
+    b"</node>"
+    b"</hierarchy>"
+    b"UI hierchary dumped to: /dev/tty\n"
+)
+
+
+def _chunks(data: bytes, size: int) -> list[bytes]:
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+def test_parser_builds_the_rich_hierarchy_from_streamed_chunks():
+    hierarchy = parse_hierarchy(_chunks(b"WARNING: linker noise\n" + _DUMP, 7))
+
+    assert len(hierarchy) == 1
+    root = hierarchy[0]
+    assert root["attributes"]["resource-id"] == "com.app:id/root"
+    search = root["children"][0]
+    assert search["attributes"]["text"] == "Search"
+    assert search["attributes"]["accessibilityText"] == "Search box"
+    assert search["attributes"]["focused"] == "true"
+    assert search["clickable"] is True and search["focused"] is True
+
+
+def test_parser_does_not_keep_the_xml_tree_of_large_screens():
+    node = (
+        b'<node index="0" text="Item" resource-id="com.app:id/item" class="android.widget.TextView" '
+        b'package="com.app" content-desc="" clickable="true" bounds="[0,0][100,100]" />'
+    )
+    rows = b"".join(b"<node index='0' class='row'>" + node * 9 + b"</node>" for _ in range(2000))
+    dump = b"<?xml version='1.0' ?><hierarchy rotation='0'>" + rows + b"</hierarchy>"
+
+    tracemalloc.start()
+    try:
+        parser = HierarchyParser()
+        for chunk in _chunks(dump, 64 * 1024):
+            parser.feed(chunk)
+        parser.close()
+        hierarchy = parser.result()
+        with_parser, _ = tracemalloc.get_traced_memory()
+        del parser
+        gc.collect()
+        without_parser, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert count_nodes(hierarchy) == 20000
+    # Parsed elements are cleared: the parser only keeps a small fraction of the dump size
+    # (keeping the XML tree takes more than twice the dump size)
+    assert with_parser - without_parser < len(dump) / 4
+
+
+def test_failed_uiautomator_dump_turns_the_source_off_for_the_device(monkeypatch):
+    monkeypatch.setattr(settings, "HIERARCHY_SOURCE", "uiautomator")
+    monkeypatch.setattr(accessibility, "_uiautomator_failed_devices", set())
+    dump = Mock(side_effect=RuntimeError("UiAutomationService already registered"))
+    monkeypatch.setattr(accessibility, "stream_uiautomator_hierarchy", dump)
+    monkeypatch.setattr(accessibility, "get_adb_device", Mock())
+    ctx = Mock()
+    ctx.device.device_id = "emulator-5554"
+    ctx.device.mobile_platform = DevicePlatform.ANDROID
+    ctx.hw_bridge_client.get_rich_hierarchy.return_value = [{"attributes": {}, "children": []}]
+
+    for _ in range(3):
+        assert get_rich_hierarchy(ctx) == [{"attributes": {}, "children": []}]
+    dump.assert_called_once()
@@ -0,0 +1,117 @@
+import re
+
+import pytest
+from adbutils import AdbTimeout
+
+from minitap.mobile_use.config import settings
+from minitap.mobile_use.services import adb_session
+from minitap.mobile_use.services.adb_session import (
+    AdbSessionPool,
+    LatencyHistogram,
+    get_command_type,
+    list_adb_devices,
+)
+
+_SCRIPT_RE = re.compile(r"\{ (.*)\n\} </dev/null; printf '\\n%s %d\\n' (\S+) \$\?\n", re.DOTALL)
+
+
+class _FakeSocket:
+    def __init__(self):
+        self.pending: list[bytes] = []
+
+    def settimeout(self, timeout):
+        pass
+
+    def recv(self, size: int) -> bytes:
+        if not self.pending:
+            raise TimeoutError
+        return self.pending.pop(0)
+
+
+class _FakeShellConnection:
+    """Answers each script like `sh` would, with outputs chunked to exercise the buffering."""
+
+    def __init__(self, outputs: dict[str, str]):
+        self.outputs = outputs
+        self.conn = _FakeSocket()
+        self.closed = False
+        self.scripts = 0
+
+    def send(self, data: bytes) -> None:
+        self.scripts += 1
+        command, marker = _SCRIPT_RE.fullmatch(data.decode()).groups()  # type: ignore
+        if command in self.outputs:
+            response = f"{self.outputs[command]}\n{marker} 0\n".encode()
+            self.conn.pending.extend(response[i : i + 7] for i in range(0, len(response), 7))
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class _FakeDevice:
+    def __init__(self, outputs: dict[str, str]):
+        self.outputs = outputs
+        self.connections: list[_FakeShellConnection] = []
+
+    def open_shell(self, cmdargs: str) -> _FakeShellConnection:
+        assert cmdargs == "sh"
+        connection = _FakeShellConnection(self.outputs)
+        self.connections.append(connection)
+        return connection
+
+
+def test_session_pool_reuses_a_persistent_shell():
+    device = _FakeDevice({"date": "Mon Oct 19", "getprop ro.build.version.sdk": "34"})
+    pool = AdbSessionPool(device)  # type: ignore
+
+    assert pool.shell("date") == "Mon Oct 19"
+    assert pool.shell("getprop ro.build.version.sdk") == "34"
+    assert pool.run("date").returncode == 0
+
+    assert len(device.connections) == 1
+    assert device.connections[0].scripts == 3
+    assert {key: h.calls for key, h in pool.stats.get().items()} == {"date": 2, "getprop": 1}
+
+
+def test_session_is_dropped_when_a_command_times_out():
+    device = _FakeDevice({"date": "Mon Oct 19"})
+    pool = AdbSessionPool(device)  # type: ignore
+
+    with pytest.raises(AdbTimeout):
+        pool.run("sleep 10", timeout=0.01)
+
+    assert device.connections[0].closed
+    assert pool.shell("date") == "Mon Oct 19"
+    assert len(device.connections) == 2
+
+
+def test_latency_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for seconds in (0.004, 0.02, 0.02, 0.3, 2):
+        histogram.record(seconds)
+
+    assert histogram.calls == 5
+    assert histogram.percentile_ms(0.5) == 25
+    assert histogram.percentile_ms(1) == 2500
+    assert get_command_type("/system/bin/dumpsys window | grep x") == "dumpsys"
+
+
+def test_list_adb_devices_uses_the_configured_server(monkeypatch):
+    clients = []
+
+    class _FakeClient:
+        def __init__(self, host, port):
+            clients.append((host, port))
+
+        def list(self):
+            return [
+                type("Entry", (), {"serial": "emulator-5554", "state": "device"})(),
+                type("Entry", (), {"serial": "R58M", "state": "unauthorized"})(),
+            ]
+
+    monkeypatch.setattr(adb_session, "AdbClient", _FakeClient)
+    monkeypatch.setattr(settings, "ADB_HOST", "10.0.0.2")
+    monkeypatch.setattr(settings, "ADB_PORT", 5038)
+
+    assert list_adb_devices() == ["emulator-5554"]
+    assert clients == [("10.0.0.2", 5038)]
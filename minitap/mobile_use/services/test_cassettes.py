@@ -0,0 +1,80 @@
+import json
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
+
+from minitap.mobile_use.agents.planner.types import PlannerOutput, PlannerSubgoalOutput
+from minitap.mobile_use.config import LLM, settings
+from minitap.mobile_use.services.cassettes import CassetteMissError, clear_cassettes
+from minitap.mobile_use.services.llm import get_llm, invoke_llm
+
+
+@pytest.mark.asyncio
+async def test_recorded_responses_are_replayed(tmp_path, monkeypatch, make_mock_context):
+    cassette_path = tmp_path / "run.jsonl"
+    plan = PlannerOutput(subgoals=[PlannerSubgoalOutput(description="Open settings")])
+    tool_call = AIMessage(
+        content="", tool_calls=[{"name": "back", "args": {}, "id": "call_1", "type": "tool_call"}]
+    )
+    messages = [HumanMessage(content="Open the settings")]
+
+    live_ctx = make_mock_context()
+    monkeypatch.setattr(settings, "LLM_RECORD_CASSETTE", cassette_path)
+    await invoke_llm(
+        ctx=live_ctx,
+        name="planner",
+        llm=RunnableLambda(lambda _: plan),
+        messages=messages,
+        schema=PlannerOutput,
+    )
+    await invoke_llm(
+        ctx=live_ctx, name="executor", llm=RunnableLambda(lambda _: tool_call), messages=messages
+    )
+    monkeypatch.setattr(settings, "LLM_RECORD_CASSETTE", None)
+    clear_cassettes()
+
+    replay_ctx = make_mock_context(LLM(provider="replay", model=str(cassette_path)))
+    replay_llm = get_llm(ctx=replay_ctx, name="executor").bind_tools([])
+    replayed_plan = await invoke_llm(
+        ctx=replay_ctx, name="planner", llm=replay_llm, messages=messages, schema=PlannerOutput
+    )
+    # Messages differ from the recorded ones: served in call order
+    replayed_tool_call = await invoke_llm(
+        ctx=replay_ctx,
+        name="executor",
+        llm=replay_llm,
+        messages=[HumanMessage(content="Something else")],
+    )
+
+    assert replayed_plan == plan
+    assert replayed_tool_call.tool_calls == tool_call.tool_calls
+    with pytest.raises(CassetteMissError):
+        await invoke_llm(ctx=replay_ctx, name="planner", llm=replay_llm, messages=messages)
+
+
+@pytest.mark.asyncio
+async def test_replay_model_serves_direct_invocations(tmp_path, monkeypatch, make_mock_context):
+    cassette_path = tmp_path / "run.jsonl"
+    messages = [HumanMessage(content="Go back")]
+    live_ctx = make_mock_context()
+    monkeypatch.setattr(settings, "LLM_RECORD_CASSETTE", cassette_path)
+    for answer in ("first", "second"):
+        await invoke_llm(
+            ctx=live_ctx,
+            name="executor",
+            llm=RunnableLambda(lambda _, answer=answer: AIMessage(content=answer)),
+            messages=messages,
+        )
+        # Recording again into the existing cassette continues the call numbering
+        clear_cassettes()
+    monkeypatch.setattr(settings, "LLM_RECORD_CASSETTE", None)
+
+    entries = [json.loads(line) for line in cassette_path.read_text().splitlines()]
+    assert [entry["index"] for entry in entries] == [0, 1]
+
+    replay_llm = get_llm(
+        ctx=make_mock_context(LLM(provider="replay", model=str(cassette_path))), name="cortex"
+    )
+    assert replay_llm.invoke(messages).content == "first"
+    assert replay_llm.invoke([HumanMessage(content="Something else")]).content == "second"
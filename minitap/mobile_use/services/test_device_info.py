@@ -0,0 +1,92 @@
+import threading
+import time
+from unittest.mock import Mock
+
+from minitap.mobile_use.context import DevicePlatform
+from minitap.mobile_use.services import device_info
+from minitap.mobile_use.services.device_info import DeviceInfo, DeviceInfoService
+
+
+def _fake_device(monkeypatch, clock_offset: int = 3600) -> Mock:
+    def shell(command: str) -> str:
+        if command.startswith("date"):
+            return f"{int(time.time()) + clock_offset} +0200 CEST\n"
+        return "34\nfr-FR\nen-US\nEurope/Paris\nPhysical size: 1080x2400\nOverride size: 720x1600\n"
+
+    sessions = Mock()
+    sessions.shell = Mock(side_effect=lambda ctx, command: shell(command))
+    monkeypatch.setattr(device_info, "adb_sessions", sessions)
+    return sessions
+
+
+def test_device_info_caches_static_facts_and_clock(monkeypatch, make_mock_context):
+    device = _fake_device(monkeypatch)
+    service = DeviceInfoService()
+
+    info = service.get(make_mock_context())
+    service.get_device_date(make_mock_context())
+    service.get_device_date(make_mock_context())
+
+    assert device.shell.call_count == 2
+    assert info.sdk_level == 34
+    assert info.locale == "fr-FR"
+    assert info.timezone == "Europe/Paris"
+    assert (info.screen_width, info.screen_height) == (720, 1600)
+    assert info.clock is not None and abs(info.clock.offset_seconds - 3600) <= 1
+    assert info.clock.utc_offset_seconds == 7200
+
+
+def test_device_date_is_computed_from_the_clock_offset(monkeypatch, make_mock_context):
+    _fake_device(monkeypatch, clock_offset=86400)
+    service = DeviceInfoService()
+
+    device_now = service.get(make_mock_context()).now()
+
+    assert abs(device_now.timestamp() - (time.time() + 86400)) <= 2
+    assert str(device_now.tzinfo) == "Europe/Paris"
+
+
+def test_clock_is_rechecked_after_the_interval(monkeypatch, make_mock_context):
+    device = _fake_device(monkeypatch)
+    service = DeviceInfoService(clock_recheck_interval_seconds=0)
+
+    service.get_device_date(make_mock_context())
+    service.get_device_date(make_mock_context())
+
+    assert [call.args[1].startswith("date") for call in device.shell.call_args_list] == [
+        False,
+        True,
+        True,
+    ]
+
+
+def test_a_slow_device_does_not_block_other_devices(monkeypatch, make_mock_context):
+    probing, release = threading.Event(), threading.Event()
+
+    def probe(ctx):
+        if ctx.device.device_id == "slow":
+            probing.set()
+            release.wait(timeout=5)
+        return DeviceInfo(
+            device_id=ctx.device.device_id,
+            platform=DevicePlatform.ANDROID,
+            screen_width=1080,
+            screen_height=1920,
+        )
+
+    monkeypatch.setattr(device_info, "_probe_device_info", probe)
+    service = DeviceInfoService()
+    slow, fast = make_mock_context(), make_mock_context()
+    slow.device.device_id, fast.device.device_id = "slow", "fast"
+    slow_thread = threading.Thread(target=service.get, args=(slow,))
+    slow_thread.start()
+    probing.wait(timeout=5)
+    fast_thread = threading.Thread(target=service.get, args=(fast,))
+    fast_thread.start()
+    try:
+        fast_thread.join(timeout=1)
+        assert not fast_thread.is_alive()
+    finally:
+        release.set()
+        slow_thread.join()
+        fast_thread.join()
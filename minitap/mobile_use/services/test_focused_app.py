@@ -0,0 +1,52 @@
+from unittest.mock import Mock
+
+from minitap.mobile_use.context import DevicePlatform
+from minitap.mobile_use.services import focused_app
+from minitap.mobile_use.services.focused_app import FocusedAppTracker, get_foreground_package
+
+
+def _element(resource_id: str, children: list | None = None) -> dict:
+    return {"resourceId": resource_id, "children": children or []}
+
+
+def _tracker(monkeypatch, dumpsys_output: str | None = None) -> tuple[FocusedAppTracker, Mock]:
+    dumpsys = Mock(return_value=dumpsys_output)
+    monkeypatch.setattr(focused_app, "get_focused_app_info", dumpsys)
+    ctx = Mock()
+    ctx.device.mobile_platform = DevicePlatform.ANDROID
+    return FocusedAppTracker(ctx), dumpsys
+
+
+def test_foreground_package_ignores_overlays_and_ambiguous_hierarchies():
+    app = [
+        _element("com.android.systemui:id/clock"),
+        _element("com.app:id/root", [_element("com.app:id/title"), _element("android:id/text1")]),
+    ]
+    assert get_foreground_package(app) == "com.app"
+    assert get_foreground_package([_element("com.a:id/x"), _element("com.b:id/y")]) is None
+    assert get_foreground_package([{"text": "no ids"}]) is None
+
+
+def test_tracker_uses_the_hierarchy_and_the_last_launched_activity(monkeypatch):
+    tracker, dumpsys = _tracker(monkeypatch)
+
+    assert str(tracker.update([_element("com.app:id/root")])) == "com.app"
+    tracker.on_log_line("I/ActivityTaskManager( 540): Displayed com.app/.MainActivity: +350ms")
+    assert str(tracker.update([_element("com.app:id/root")])) == "com.app/.MainActivity"
+    # The launched activity is stale once another app is in the foreground
+    assert str(tracker.update([_element("com.other:id/root")])) == "com.other"
+    dumpsys.assert_not_called()
+
+
+def test_tracker_falls_back_to_dumpsys_when_ambiguous(monkeypatch):
+    tracker, dumpsys = _tracker(
+        monkeypatch,
+        "  mCurrentFocus=Window{4f1c u0 com.app/com.app.MainActivity}\n"
+        "  mFocusedApp=ActivityRecord{9a2 u0 com.app/.MainActivity t12}",
+    )
+
+    app = tracker.update([_element("com.a:id/x"), _element("com.b:id/y")])
+
+    assert app is not None and app.source == "dumpsys"
+    assert str(app) == "com.app/com.app.MainActivity"
+    dumpsys.assert_called_once()
@@ -0,0 +1,440 @@
+import asyncio
+import threading
+import time
+from unittest.mock import Mock
+
+import httpx
+import openai
+import pytest
+from langchain_core.exceptions import OutputParserException
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableLambda
+
+from minitap.mobile_use.agents.cortex.types import CortexOutput
+from minitap.mobile_use.config import (
+    LLM,
+    HedgingConfig,
+    RateLimitConfig,
+    ResponseCacheConfig,
+    RetryConfig,
+)
+from minitap.mobile_use.context import TaskMetrics
+from minitap.mobile_use.services.llm import (
+    CircuitBreaker,
+    HedgingPolicy,
+    LatencyTracker,
+    LLMClientRegistry,
+    LLMRateLimiter,
+    LLMResponseCache,
+    TokenBucket,
+    classify_llm_error,
+    get_prompt_cache_stats,
+    get_response_cache_stats,
+    get_retry_delay,
+    get_structured_output_repair_stats,
+    invoke_llm,
+    main_llm_latencies,
+    parse_structured_output,
+    with_cache_breakpoints,
+    with_fallback,
+    with_retry,
+)
+
+
+def test_registry_memoizes_clients_by_key():
+    registry = LLMClientRegistry()
+    factory = Mock(side_effect=lambda: object())
+
+    first = registry.get_or_create(("openai", "gpt-4.1", 1, None), factory)
+    second = registry.get_or_create(("openai", "gpt-4.1", 1, None), factory)
+    other = registry.get_or_create(("openai", "gpt-4.1", 0, None), factory)
+
+    assert first is second
+    assert other is not first
+    assert factory.call_count == 2
+    metrics = registry.metrics()
+    assert metrics.hits == 1
+    assert metrics.misses == 2
+    assert metrics.live_clients == 2
+
+
+def test_registry_eviction_by_provider_and_model():
+    registry = LLMClientRegistry()
+    registry.get_or_create(("openai", "gpt-4.1", 1, None), object)
+    registry.get_or_create(("openai", "o3", 1, None), object)
+    registry.get_or_create(("google", "gemini-2.5-pro", 1, None), object)
+
+    assert registry.evict(provider="openai", model="o3") == 1
+    assert registry.evict(provider="openai") == 1
+    assert registry.metrics().live_clients == 1
+
+    registry.clear()
+    metrics = registry.metrics()
+    assert metrics.live_clients == 0
+    assert metrics.evictions == 3
+
+
+def test_registry_memoizes_clients_per_event_loop():
+    registry = LLMClientRegistry()
+    key = ("openai", "gpt-4.1", 1, None)
+
+    async def get_clients():
+        client = registry.get_or_create(key, object)
+        assert registry.get_or_create(key, object) is client
+        return client, registry.get_http_clients("https://api.test")
+
+    first_client, (first_sync, first_async) = asyncio.run(get_clients())
+    second_client, (second_sync, second_async) = asyncio.run(get_clients())
+
+    # Async pools are bound to their loop, while sync pools are shared and kept open
+    assert second_client is not first_client
+    assert second_async is not first_async
+    assert second_sync is first_sync
+    assert not first_sync.is_closed
+    assert registry.metrics().evictions == 0
+    # The clients of the closed loops are dropped when a new loop uses the registry
+    asyncio.run(get_clients())
+    assert registry.metrics().live_clients == 1
+
+
+def _hedging_policy(initial_delay_seconds: float) -> HedgingPolicy:
+    return HedgingPolicy(
+        latency_key=f"test:{initial_delay_seconds}",
+        provider="openai",
+        config=HedgingConfig(initial_delay_seconds=initial_delay_seconds),
+    )
+
+
+@pytest.mark.asyncio
+async def test_hedged_fallback_wins_when_main_is_slow():
+    main_cancelled = asyncio.Event()
+
+    async def slow_main():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            main_cancelled.set()
+            raise
+        return "main"
+
+    async def fast_fallback():
+        return "fallback"
+
+    hedging = _hedging_policy(initial_delay_seconds=0.01)
+    result = await with_fallback(slow_main, fast_fallback, hedging=hedging)
+
+    assert result == "fallback"
+    await asyncio.wait_for(main_cancelled.wait(), timeout=1)
+    assert hedging.stats.hedged_calls >= 1
+    assert hedging.stats.fallback_wins >= 1
+    # The cancelled main call still counts in the latencies, as at least the elapsed time
+    samples = main_llm_latencies._samples[hedging.latency_key]
+    assert len(samples) == 1 and samples[0] >= 0.01
+
+
+@pytest.mark.asyncio
+async def test_hedged_fallback_keeps_fast_main_response():
+    fallback = Mock()
+
+    async def fast_main():
+        return "main"
+
+    result = await with_fallback(fast_main, fallback, hedging=_hedging_policy(1))
+
+    assert result == "main"
+    fallback.assert_not_called()
+
+
+def test_latency_tracker_percentile():
+    tracker = LatencyTracker()
+    assert tracker.percentile("cortex", 0.9) is None
+    for seconds in range(1, 11):
+        tracker.record("cortex", float(seconds))
+    assert tracker.percentile("cortex", 0.9) == 9.0
+    assert tracker.percentile("cortex", 0.5) == 5.0
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_caps_concurrency_per_provider():
+    limiter = LLMRateLimiter()
+    limiter.configure({"openai": RateLimitConfig(max_concurrency=2)})
+    llm = LLM(provider="openai", model="gpt-5-nano")
+    in_flight = 0
+    max_in_flight = 0
+
+    async def call():
+        nonlocal in_flight, max_in_flight
+        async with limiter.limit(llm, estimated_tokens=100):
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.02)
+            in_flight -= 1
+
+    await asyncio.gather(*(call() for _ in range(6)))
+
+    stats = limiter.stats()["openai"]
+    assert max_in_flight == 2
+    assert stats.calls == 6
+    assert stats.queued_calls > 0
+    assert stats.in_flight == 0
+
+
+def test_rate_limiter_is_shared_by_event_loops_in_threads():
+    limiter = LLMRateLimiter()
+    limiter.configure({"openai": RateLimitConfig(max_concurrency=1)})
+    llm = LLM(provider="openai", model="gpt-5-nano")
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+
+    async def calls():
+        nonlocal in_flight, max_in_flight
+        for _ in range(3):
+            async with limiter.limit(llm, estimated_tokens=100):
+                with lock:
+                    in_flight += 1
+                    max_in_flight = max(max_in_flight, in_flight)
+                await asyncio.sleep(0.01)
+                with lock:
+                    in_flight -= 1
+
+    threads = [threading.Thread(target=asyncio.run, args=(calls(),)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert max_in_flight == 1
+    assert limiter.stats()["openai"].calls == 9
+
+
+@pytest.mark.asyncio
+async def test_calls_waiting_for_tokens_do_not_hold_a_concurrency_slot():
+    limiter = LLMRateLimiter()
+    limiter.configure(
+        {
+            "openai": RateLimitConfig(max_concurrency=1),
+            "openai/gpt-5": RateLimitConfig(tokens_per_minute=60),
+        }
+    )
+    async with limiter.limit(LLM(provider="openai", model="gpt-5"), estimated_tokens=60):
+        pass
+    # The next gpt-5 call waits for its token bucket to refill (about a minute)
+    throttled = asyncio.ensure_future(
+        limiter.limit(LLM(provider="openai", model="gpt-5"), estimated_tokens=60).__aenter__()
+    )
+    await asyncio.sleep(0.01)
+
+    async with asyncio.timeout(1):
+        async with limiter.limit(LLM(provider="openai", model="gpt-5-nano"), estimated_tokens=1):
+            pass
+    throttled.cancel()
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(per_minute=600)  # 10 tokens per second
+
+    assert await bucket.acquire(600) == 0
+    waited = await bucket.acquire(1)
+
+    assert 0.05 < waited < 0.5
+
+
+def _status_error(status_code: int, headers: dict | None = None) -> openai.APIStatusError:
+    response = httpx.Response(
+        status_code, headers=headers, request=httpx.Request("POST", "https://api.test")
+    )
+    return openai.APIStatusError("error", response=response, body=None)
+
+
+def test_classify_llm_error():
+    assert classify_llm_error(_status_error(429)) == "rate_limit"
+    assert classify_llm_error(_status_error(503)) == "server_error"
+    assert classify_llm_error(_status_error(400)) == "client_error"
+    assert classify_llm_error(TimeoutError()) == "timeout"
+    assert classify_llm_error(ValueError("boom")) == "unknown"
+
+
+def test_retry_delay_respects_retry_after():
+    config = RetryConfig(base_delay_seconds=2, max_delay_seconds=30)
+
+    assert get_retry_delay(config, 0, _status_error(429, {"retry-after": "7"})) == 7
+    assert 0 <= get_retry_delay(config, 3, _status_error(503)) <= 16
+
+
+@pytest.mark.asyncio
+async def test_with_retry_retries_transient_errors_and_counts_them(make_mock_context):
+    ctx = make_mock_context(retry=RetryConfig(max_attempts=3, base_delay_seconds=0))
+    ctx.metrics = TaskMetrics()
+    call = Mock(side_effect=[_status_error(503), TimeoutError(), "ok"])
+
+    async def run():
+        result = call()
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    assert await with_retry(ctx=ctx, name="planner", call=run) == "ok"
+    metrics = ctx.metrics.get_node("planner")
+    assert metrics.llm_retries == 2
+    assert metrics.llm_errors == {"server_error": 1, "timeout": 1}
+
+
+@pytest.mark.asyncio
+async def test_with_retry_does_not_retry_client_errors(make_mock_context):
+    ctx = make_mock_context(retry=RetryConfig(max_attempts=3, base_delay_seconds=0))
+    ctx.metrics = TaskMetrics()
+    calls = 0
+
+    async def run():
+        nonlocal calls
+        calls += 1
+        raise _status_error(400)
+
+    with pytest.raises(openai.APIStatusError):
+        await with_retry(ctx=ctx, name="planner", call=run)
+    assert calls == 1
+    assert ctx.metrics.get_node("planner").llm_retries == 0
+
+
+def test_circuit_breaker_opens_then_probes_after_cooldown():
+    breaker = CircuitBreaker(threshold=2, cooldown_seconds=0.05)
+
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.is_open
+    assert not breaker.allow_request()
+
+    time.sleep(0.06)
+    assert breaker.allow_request()  # single probe
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert not breaker.is_open
+    assert breaker.allow_request()
+
+
+def test_circuit_breaker_lets_a_single_probe_through_across_threads():
+    breaker = CircuitBreaker(threshold=1, cooldown_seconds=0)
+    breaker.record_failure()
+    barrier = threading.Barrier(16)
+    allowed = []
+
+    def request():
+        barrier.wait()
+        allowed.append(breaker.allow_request())
+
+    threads = [threading.Thread(target=request) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert allowed.count(True) == 1
+
+
+def test_parse_structured_output_repairs_malformed_json():
+    raw = AIMessage(
+        content='```json\n{"decisions": {"action": "tap"}, "agent_thought": "ok",}\n```'
+    )
+    output = {"raw": raw, "parsed": None, "parsing_error": OutputParserException("bad json")}
+
+    parsed = parse_structured_output(output=output, schema=CortexOutput)
+
+    assert parsed.decisions == '{"action": "tap"}'
+    assert get_structured_output_repair_stats()["CortexOutput"].repaired >= 1
+
+
+def test_parse_structured_output_raises_when_repair_fails():
+    error = OutputParserException("bad json")
+    output = {"raw": AIMessage(content="Sorry, I can't."), "parsed": None, "parsing_error": error}
+
+    with pytest.raises(OutputParserException):
+        parse_structured_output(output=output, schema=CortexOutput)
+
+
+def test_response_cache_expires_and_evicts_entries(tmp_path):
+    cache = LLMResponseCache(path=tmp_path / "cache.sqlite3", ttl_seconds=60, max_size_mb=1)
+    cache.set("hopper", "a", {"dict": {"value": "a"}})
+    assert cache.get("hopper", "a") == {"dict": {"value": "a"}}
+    assert cache.get("hopper", "missing") is None
+
+    cache.ttl_seconds = 0
+    assert cache.get("hopper", "a") is None
+
+    cache.ttl_seconds = 60
+    cache.max_size_bytes = 100
+    cache.set("hopper", "b", {"dict": {"value": "b" * 40}})
+    cache.set("hopper", "c", {"dict": {"value": "c" * 40}})
+    assert cache.get("hopper", "b") is None
+    assert cache.get("hopper", "c") is not None
+    assert cache.stats["hopper"].evictions == 2
+
+
+@pytest.mark.asyncio
+async def test_invoke_llm_serves_cached_responses_for_enabled_nodes(tmp_path, make_mock_context):
+    ctx = make_mock_context(
+        response_cache=ResponseCacheConfig(nodes=["orchestrator"], path=tmp_path / "c.sqlite3")
+    )
+    calls = 0
+
+    def answer(_):
+        nonlocal calls
+        calls += 1
+        return CortexOutput(decisions="{}", agent_thought=f"call {calls}")
+
+    runnable = RunnableLambda(answer)
+    messages = [HumanMessage(content="same request")]
+    cached = [
+        await invoke_llm(
+            ctx=ctx, name="orchestrator", llm=runnable, messages=messages, schema=CortexOutput
+        )
+        for _ in range(2)
+    ]
+    second = await invoke_llm(ctx=ctx, name="planner", llm=runnable, messages=messages)
+
+    assert cached == [CortexOutput(decisions="{}", agent_thought="call 1")] * 2
+    assert second.agent_thought == "call 2"
+    assert get_response_cache_stats()["orchestrator"].hits == 1
+
+
+def test_cache_breakpoints_only_added_for_supporting_providers():
+    messages = [SystemMessage(content="instructions"), HumanMessage(content="device info")]
+
+    openai_messages = with_cache_breakpoints(LLM(provider="openai", model="gpt-5"), messages, [1])
+    marked = with_cache_breakpoints(
+        LLM(provider="openrouter", model="anthropic/claude-sonnet-4"), messages, [1]
+    )
+
+    assert openai_messages is messages
+    assert marked[0] is messages[0]
+    assert marked[1].content == [
+        {"type": "text", "text": "device info", "cache_control": {"type": "ephemeral"}}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_invoke_llm_records_cached_token_ratio(make_mock_context):
+    response = AIMessage(
+        content="done",
+        usage_metadata={
+            "input_tokens": 1000,
+            "output_tokens": 10,
+            "total_tokens": 1010,
+            "input_token_details": {"cache_read": 800},
+        },
+    )
+    chat_model = GenericFakeChatModel(messages=iter([response]))
+
+    await invoke_llm(
+        ctx=make_mock_context(),
+        name="executor",
+        llm=chat_model,
+        messages=[HumanMessage(content="hi")],
+    )
+
+    stats = get_prompt_cache_stats()["executor"]
+    assert stats.calls == 1
+    assert stats.cached_ratio == 0.8
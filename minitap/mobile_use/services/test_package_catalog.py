@@ -0,0 +1,140 @@
+import threading
+from unittest.mock import Mock
+
+from minitap.mobile_use.context import DevicePlatform
+from minitap.mobile_use.services import package_catalog
+from minitap.mobile_use.services.package_catalog import (
+    PackageCatalog,
+    PackageCatalogs,
+    PackageEntry,
+    parse_android_packages,
+    parse_ios_apps,
+)
+
+PACKAGES_OUTPUT = """package:/data/app/~~a==/com.whatsapp-1/base.apk=com.whatsapp
+package:/data/app/~~b==/com.google.android.youtube-2/base.apk=com.google.android.youtube
+package:/data/app/~~c==/com.google.android.apps.youtube.music-3/base.apk=com.google.android.apps.youtube.music
+package:/system/priv-app/Settings/Settings.apk=com.android.settings
+package:/system/app/Bluetooth/Bluetooth.apk=com.android.bluetooth
+package:/system/priv-app/TeleService/TeleService.apk=com.android.phone
+package:/product/priv-app/Dialer/Dialer.apk=com.google.android.dialer
+"""
+LAUNCHER_OUTPUT = """com.whatsapp/.Main
+com.google.android.youtube/com.google.android.apps.youtube.app.WatchWhileActivity
+com.google.android.apps.youtube.music/.activities.MusicActivity
+com.android.settings/.Settings
+com.google.android.dialer/.extensions.GoogleDialtactsActivity
+"""
+IOS_OUTPUT = """{
+    "com.apple.Preferences" =     {
+        CFBundleDisplayName = Settings;
+        CFBundleIdentifier = "com.apple.Preferences";
+    };
+    "com.apple.mobilesafari" =     {
+        CFBundleDisplayName = Safari;
+        CFBundleIdentifier = "com.apple.mobilesafari";
+        CFBundleName = Safari;
+    };
+}
+"""
+
+
+def _catalog() -> PackageCatalog:
+    return PackageCatalog(parse_android_packages(PACKAGES_OUTPUT, LAUNCHER_OUTPUT))
+
+
+def test_parse_android_packages_flags_launchable_apps():
+    entries = {entry.package: entry for entry in _catalog().entries}
+
+    assert len(entries) == 7
+    assert entries["com.whatsapp"].launchable
+    assert not entries["com.android.bluetooth"].launchable
+
+
+def test_parse_ios_apps_reads_display_names():
+    entries = parse_ios_apps(IOS_OUTPUT)
+
+    assert entries == [
+        PackageEntry(package="com.apple.Preferences", label="Settings"),
+        PackageEntry(package="com.apple.mobilesafari", label="Safari"),
+    ]
+
+
+def test_unambiguous_names_are_matched_locally():
+    catalog = _catalog()
+
+    assert catalog.match("WhatsApp").package == "com.whatsapp"
+    assert catalog.match("YouTube").package == "com.google.android.youtube"
+    assert catalog.match("settings").package == "com.android.settings"
+    assert catalog.match("YouTube Music").package == "com.google.android.apps.youtube.music"
+    assert PackageCatalog(parse_ios_apps(IOS_OUTPUT)).match("Safari").package == (
+        "com.apple.mobilesafari"
+    )
+
+
+def test_close_names_are_ambiguous_with_candidates():
+    match = _catalog().match("Tube")
+
+    assert match.ambiguous
+    assert {entry.package for entry in match.candidates[:2]} == {
+        "com.google.android.youtube",
+        "com.google.android.apps.youtube.music",
+    }
+
+
+def test_system_packages_are_never_matched_locally():
+    match = _catalog().match("Phone")
+
+    assert match.ambiguous
+    assert match.candidates[0].package == "com.android.phone"
+    assert not match.candidates[0].launchable
+
+
+def test_exact_names_are_not_ambiguous_with_their_provider_packages():
+    catalog = PackageCatalog(
+        parse_android_packages(
+            "package:com.android.calendar\npackage:com.android.providers.calendar\n"
+            "package:com.android.contacts\npackage:com.android.providers.contacts\n",
+            "com.android.calendar/.AllInOneActivity\ncom.android.contacts/.activities.Main\n",
+        )
+    )
+
+    assert catalog.match("Calendar").package == "com.android.calendar"
+    assert catalog.match("Contacts").package == "com.android.contacts"
+
+
+def test_catalog_is_built_once_per_device_and_rebuilt_after_invalidation(monkeypatch):
+    build = Mock(side_effect=lambda ctx: _catalog())
+    monkeypatch.setattr(package_catalog, "_build_catalog", build)
+    ctx = Mock()
+    ctx.device.device_id = "emulator-5554"
+    ctx.device.mobile_platform = DevicePlatform.ANDROID
+    catalogs = PackageCatalogs()
+
+    first = catalogs.get(ctx)
+    assert catalogs.get(ctx) is first
+    catalogs.invalidate("emulator-5554")
+    assert catalogs.get(ctx) is not first
+    assert build.call_count == 2
+
+
+def test_a_slow_build_does_not_block_other_devices(monkeypatch):
+    release = threading.Event()
+
+    def build(ctx):
+        if ctx.device.device_id == "slow":
+            release.wait(timeout=5)
+        return _catalog()
+
+    monkeypatch.setattr(package_catalog, "_build_catalog", build)
+    catalogs = PackageCatalogs()
+    slow, fast = Mock(), Mock()
+    slow.device.device_id, fast.device.device_id = "slow", "fast"
+    slow_thread = threading.Thread(target=catalogs.get, args=(slow,))
+    slow_thread.start()
+    try:
+        catalogs.get(fast)
+        catalogs.invalidate("fast")
+    finally:
+        release.set()
+        slow_thread.join()
@@ -0,0 +1,79 @@
+from typing import TypedDict
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, START, StateGraph
+
+from minitap.mobile_use.config import ModelPricing
+from minitap.mobile_use.context import TaskMetrics
+from minitap.mobile_use.services.llm import invoke_llm
+from minitap.mobile_use.services.task_metrics import (
+    TaskMetricsCallbackHandler,
+    task_metrics_handler,
+)
+
+
+def _response() -> AIMessage:
+    return AIMessage(
+        content="ok",
+        usage_metadata={
+            "input_tokens": 1000,
+            "output_tokens": 100,
+            "total_tokens": 1100,
+            "input_token_details": {"cache_read": 500},
+        },
+    )
+
+
+class _GraphState(TypedDict):
+    value: str
+
+
+@pytest.mark.asyncio
+async def test_handler_aggregates_llm_usage_and_node_time_per_node(make_mock_context):
+    ctx = make_mock_context()
+    chat_model = GenericFakeChatModel(messages=iter([_response(), _response()]))
+
+    async def planner(state: _GraphState):
+        await invoke_llm(
+            ctx=ctx, name="planner", llm=chat_model, messages=[HumanMessage(content="plan")]
+        )
+        return {"value": "planned"}
+
+    async def cortex(state: _GraphState):
+        await invoke_llm(
+            ctx=ctx,
+            name="cortex",
+            llm=chat_model,
+            messages=[HumanMessage(content="think")],
+            use_fallback=True,
+        )
+        return {"value": "thought"}
+
+    builder = StateGraph(_GraphState)
+    builder.add_node("planner", planner)
+    builder.add_node("cortex", cortex)
+    builder.add_edge(START, "planner")
+    builder.add_edge("planner", "cortex")
+    builder.add_edge("cortex", END)
+    graph = builder.compile()
+
+    metrics = TaskMetrics()
+    pricing = {"openai/gpt-5-nano": ModelPricing(input=1, output=10, cached_input=0.1)}
+    token = task_metrics_handler.set(TaskMetricsCallbackHandler(metrics, pricing=pricing))
+    try:
+        await graph.ainvoke({"value": ""})
+    finally:
+        task_metrics_handler.reset(token)
+
+    planner_metrics = metrics.get_node("planner")
+    cortex_metrics = metrics.get_node("cortex")
+    assert metrics.steps == 2
+    assert planner_metrics.llm_calls == 1
+    assert planner_metrics.input_tokens == 1000
+    assert planner_metrics.output_tokens == 100
+    assert planner_metrics.cached_tokens == 500
+    assert planner_metrics.wall_seconds >= planner_metrics.llm_seconds > 0
+    assert planner_metrics.cost_usd == pytest.approx((500 * 1 + 500 * 0.1 + 100 * 10) / 1e6)
+    assert cortex_metrics.fallbacks == 1
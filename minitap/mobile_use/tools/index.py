@@ -1,6 +1,9 @@
+import json
+
 from langchain_core.tools import BaseTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
 
-from minitap.mobile_use.context import MobileUseContext
+from minitap.mobile_use.context import RUNTIME_CONTEXT, MobileUseContext
 from minitap.mobile_use.tools.mobile.back import back_wrapper
 from minitap.mobile_use.tools.mobile.clear_text import clear_text_wrapper
 from minitap.mobile_use.tools.mobile.copy_text_from import copy_text_from_wrapper
@@ -13,12 +16,17 @@ from minitap.mobile_use.tools.mobile.long_press_on import long_press_on_wrapper
 from minitap.mobile_use.tools.mobile.open_link import open_link_wrapper
 from minitap.mobile_use.tools.mobile.paste_text import paste_text_wrapper
 from minitap.mobile_use.tools.mobile.press_key import press_key_wrapper
+from minitap.mobile_use.tools.mobile.scroll_until_visible import scroll_until_visible_wrapper
 from minitap.mobile_use.tools.mobile.stop_app import stop_app_wrapper
 from minitap.mobile_use.tools.mobile.swipe import swipe_wrapper
 from minitap.mobile_use.tools.mobile.tap import tap_wrapper
 from minitap.mobile_use.tools.mobile.wait_for_animation_to_end import (
     wait_for_animation_to_end_wrapper,
 )
+from minitap.mobile_use.tools.mobile.wait_for_element import (
+    wait_for_element_gone_wrapper,
+    wait_for_element_wrapper,
+)
 from minitap.mobile_use.tools.tool_wrapper import CompositeToolWrapper, ToolWrapper
 
 EXECUTOR_WRAPPERS_TOOLS = [
@@ -27,6 +35,7 @@ EXECUTOR_WRAPPERS_TOOLS = [
     tap_wrapper,
     long_press_on_wrapper,
     swipe_wrapper,
+    scroll_until_visible_wrapper,
     glimpse_screen_wrapper,
     copy_text_from_wrapper,
     input_text_wrapper,
@@ -38,27 +47,95 @@ EXECUTOR_WRAPPERS_TOOLS = [
     clear_text_wrapper,
     press_key_wrapper,
     wait_for_animation_to_end_wrapper,
+    wait_for_element_wrapper,
+    wait_for_element_gone_wrapper,
 ]
 
 
+_tools_cache: dict[tuple[tuple[int, ...], bool], list[BaseTool]] = {}
+_tool_schemas_cache: dict[tuple[int, ...], list[dict]] = {}
+_tool_signatures_cache: dict[tuple[int, ...], str] = {}
+
+
 def get_tools_from_wrappers(
     ctx: "MobileUseContext",
     wrappers: list[ToolWrapper],
 ) -> list[BaseTool]:
+    """
+    Tools are built once per wrappers list and executor provider, and shared between tasks:
+    they act on the context of the running task (see `RUNTIME_CONTEXT`).
+    """
+    # The main swipe tool argument structure is not supported by vertexai, we need to split
+    # this tool into multiple tools
+    split_composite_swipe = ctx.llm_config.get_agent("executor").provider == "vertexai"
+    key = (tuple(id(wrapper) for wrapper in wrappers), split_composite_swipe)
+    tools = _tools_cache.get(key)
+    if tools is None:
+        tools = _tools_cache[key] = _build_tools(wrappers, split_composite_swipe)
+    return tools
+
+
+def _build_tools(wrappers: list[ToolWrapper], split_composite_swipe: bool) -> list[BaseTool]:
     tools: list[BaseTool] = []
     for wrapper in wrappers:
-        if ctx.llm_config.get_agent("executor").provider == "vertexai":
-            # The main swipe tool argument structure is not supported by vertexai, we need to split
-            # this tool into multiple tools
+        if split_composite_swipe:
             if wrapper.tool_fn_getter == swipe_wrapper.tool_fn_getter and isinstance(
                 wrapper, CompositeToolWrapper
             ):
-                tools.extend(wrapper.composite_tools_fn_getter(ctx))
+                tools.extend(wrapper.composite_tools_fn_getter(RUNTIME_CONTEXT))
                 continue
 
-        tools.append(wrapper.tool_fn_getter(ctx))
+        tools.append(wrapper.tool_fn_getter(RUNTIME_CONTEXT))
     return tools
 
 
+def get_tool_schemas(tools: list[BaseTool]) -> list[dict]:
+    """OpenAI function schemas of the given tools, serialized once per tools list."""
+    key = tuple(id(tool) for tool in tools)
+    schemas = _tool_schemas_cache.get(key)
+    if schemas is None:
+        schemas = _tool_schemas_cache[key] = [convert_to_openai_tool(tool) for tool in tools]
+    return schemas
+
+
 def format_tools_list(ctx: MobileUseContext, wrappers: list[ToolWrapper]) -> str:
     return ", ".join([tool.name for tool in get_tools_from_wrappers(ctx, wrappers)])
+
+
+def format_tools_signatures(ctx: MobileUseContext, wrappers: list[ToolWrapper]) -> str:
+    """
+    One line per tool with the JSON schema of its arguments, so that an agent can write
+    tool invocations without binding the tools (see `CortexOutput.tool_calls`).
+    Built once per tools list.
+    """
+    tools = get_tools_from_wrappers(ctx, wrappers)
+    key = tuple(id(tool) for tool in tools)
+    signatures = _tool_signatures_cache.get(key)
+    if signatures is None:
+        signatures = _tool_signatures_cache[key] = "\n".join(
+            f"- {tool.name}: "
+            + json.dumps(
+                _compact_schema(tool.tool_call_schema.model_json_schema()),
+                separators=(",", ":"),
+            )
+            for tool in tools
+        )
+    return signatures
+
+
+def _compact_schema(schema):
+    """Drops the generated titles, and the `agent_thought` argument filled by the caller."""
+    if isinstance(schema, list):
+        return [_compact_schema(item) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+    compact = {
+        key: _compact_schema(value)
+        for key, value in schema.items()
+        # A property may be named "title": only the generated title strings are dropped
+        if not (key == "title" and isinstance(value, str))
+    }
+    compact.get("properties", {}).pop("agent_thought", None)
+    if "required" in compact:
+        compact["required"] = [name for name in compact["required"] if name != "agent_thought"]
+    return compact
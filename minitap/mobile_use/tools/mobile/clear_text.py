@@ -8,14 +8,19 @@ from langgraph.types import Command
 from pydantic import BaseModel
 
 from minitap.mobile_use.constants import EXECUTOR_MESSAGES_KEY
-from minitap.mobile_use.context import MobileUseContext
+from minitap.mobile_use.context import DevicePlatform, MobileUseContext
 from minitap.mobile_use.controllers.mobile_command_controller import (
     erase_text as erase_text_controller,
 )
 from minitap.mobile_use.controllers.mobile_command_controller import (
     get_screen_data,
 )
+from minitap.mobile_use.controllers.platform_specific_commands_controller import (
+    select_all_and_delete,
+)
 from minitap.mobile_use.graph.state import State
+from minitap.mobile_use.services.accessibility import get_rich_hierarchy
+from minitap.mobile_use.services.device_info import device_info_service
 from minitap.mobile_use.tools.tool_wrapper import ToolWrapper
 from minitap.mobile_use.tools.utils import (
     focus_element_if_needed,
@@ -24,8 +29,10 @@ from minitap.mobile_use.tools.utils import (
 from minitap.mobile_use.utils.logger import get_logger
 from minitap.mobile_use.utils.ui_hierarchy import (
     ElementBounds,
+    HierarchyIndex,
     find_element_by_resource_id,
     get_element_text,
+    is_element_focused,
     text_input_is_empty,
 )
 
@@ -88,20 +95,25 @@ class TextClearer:
     def _should_clear_text(self, current_text: str | None, hint_text: str | None) -> bool:
         return current_text is not None and current_text != "" and current_text != hint_text
 
-    def _prepare_element_for_clearing(
+    def _focus_element(
         self,
         text_input_resource_id: str | None,
         text_input_coordinates: ElementBounds | None,
         text_input_text: str | None,
     ) -> bool:
-        if not focus_element_if_needed(
+        return focus_element_if_needed(
             ctx=self.ctx,
             input_resource_id=text_input_resource_id,
             input_coordinates=text_input_coordinates,
             input_text=text_input_text,
-        ):
-            return False
+        )
 
+    def _move_cursor_to_end(
+        self,
+        text_input_resource_id: str | None,
+        text_input_coordinates: ElementBounds | None,
+        text_input_text: str | None,
+    ) -> None:
         move_cursor_to_end_if_bounds(
             ctx=self.ctx,
             state=self.state,
@@ -109,7 +121,55 @@ class TextClearer:
             text_input_coordinates=text_input_coordinates,
             text_input_text=text_input_text,
         )
-        return True
+
+    def _clear_in_one_batch(
+        self,
+        text_input_resource_id: str | None,
+        text_input_coordinates: ElementBounds | None,
+        text_input_text: str | None,
+        text_length: int,
+        hint_text: str | None,
+    ) -> tuple[bool, str | None]:
+        """
+        Deletes the whole text of the focused input with a single command, then checks it with
+        one hierarchy read. Returns whether the input is now empty, and its text if read.
+        The input is read by resource id, or else as the focused node: when neither is found,
+        the batch delete is trusted.
+        """
+        try:
+            if self.ctx.device.mobile_platform == DevicePlatform.ANDROID:
+                sdk_level = device_info_service.get(self.ctx).sdk_level
+                select_all_and_delete(self.ctx, nb_chars=text_length + 1, sdk_level=sdk_level)
+            else:
+                self._move_cursor_to_end(
+                    text_input_resource_id, text_input_coordinates, text_input_text
+                )
+                error = erase_text_controller(ctx=self.ctx, nb_chars=text_length + 1)
+                if error:
+                    raise RuntimeError(str(error))
+        except Exception as e:
+            logger.warning(f"Failed to clear the text in one batch: {e}")
+            return False, None
+
+        hierarchy = get_rich_hierarchy(self.ctx)
+        if text_input_resource_id:
+            element = find_element_by_resource_id(
+                ui_hierarchy=hierarchy,
+                resource_id=text_input_resource_id,
+                is_rich_hierarchy=True,
+            )
+            if element is None:
+                return False, None
+        else:
+            element = next(
+                (node for node in HierarchyIndex(hierarchy).nodes if is_element_focused(node)),
+                None,
+            )
+            if element is None:
+                logger.info("No input to check the batch clear on, assuming it succeeded")
+                return True, None
+        text = get_element_text(element)
+        return text_input_is_empty(text=text, hint_text=hint_text), text
 
     def _erase_text_attempt(self, text_length: int) -> str | None:
         chars_to_erase = text_length + 1
@@ -225,9 +285,7 @@ class TextClearer:
         if not self._should_clear_text(current_text, hint_text):
             return self._handle_no_clearing_needed(current_text, hint_text)
 
-        if not self._prepare_element_for_clearing(
-            text_input_resource_id, text_input_coordinates, text_input_text
-        ):
+        if not self._focus_element(text_input_resource_id, text_input_coordinates, text_input_text):
             return self._create_result(
                 success=False,
                 error_message="Failed to focus element",
@@ -236,11 +294,30 @@ class TextClearer:
                 hint_text=hint_text,
             )
 
+        text_length = len(current_text or "")
+        cleared, batch_text = self._clear_in_one_batch(
+            text_input_resource_id=text_input_resource_id,
+            text_input_coordinates=text_input_coordinates,
+            text_input_text=text_input_text,
+            text_length=text_length,
+            hint_text=hint_text,
+        )
+        if cleared:
+            return self._create_result(
+                success=True,
+                error_message=None,
+                chars_erased=text_length,
+                final_text=batch_text,
+                hint_text=hint_text,
+            )
+
+        logger.info("The input isn't empty after the batch clear, erasing it iteratively")
+        self._move_cursor_to_end(text_input_resource_id, text_input_coordinates, text_input_text)
         success, final_text, chars_erased = self._clear_with_retries(
             text_input_resource_id=text_input_resource_id,
             text_input_coordinates=text_input_coordinates,
             text_input_text=text_input_text,
-            initial_text=current_text or "",
+            initial_text=batch_text if batch_text is not None else current_text or "",
             hint_text=hint_text,
         )
 
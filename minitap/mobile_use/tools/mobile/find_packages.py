@@ -1,3 +1,5 @@
+import asyncio
+import time
 from typing import Annotated
 
 from langchain_core.messages import ToolMessage
@@ -9,11 +11,18 @@ from langgraph.types import Command
 from minitap.mobile_use.agents.hopper.hopper import HopperOutput, hopper
 from minitap.mobile_use.constants import EXECUTOR_MESSAGES_KEY
 from minitap.mobile_use.context import MobileUseContext
-from minitap.mobile_use.controllers.platform_specific_commands_controller import (
-    list_packages,
-)
 from minitap.mobile_use.graph.state import State
+from minitap.mobile_use.services.package_catalog import (
+    MIN_REBUILD_INTERVAL_SECONDS,
+    PackageCatalog,
+    PackageEntry,
+    PackageMatch,
+    package_catalogs,
+)
 from minitap.mobile_use.tools.tool_wrapper import ToolWrapper
+from minitap.mobile_use.utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 
 def get_find_packages_tool(ctx: MobileUseContext):
@@ -28,23 +37,32 @@ def get_find_packages_tool(ctx: MobileUseContext):
         Finds relevant applications.
         Outputs the full package names list (android) or bundle ids list (IOS).
         """
-        output: str = list_packages(ctx=ctx)
-
+        output = ""
         try:
-            hopper_output: HopperOutput = await hopper(
-                ctx=ctx,
-                request=f"I'm looking for the package names of the following apps: {appNames}",
-                data=output,
+            catalog, matches = await asyncio.to_thread(find_package_matches, ctx, appNames)
+            output = "\n".join(
+                f"{match.app_name}: {match.package}" for match in matches if not match.ambiguous
             )
+            ambiguous = [match for match in matches if match.ambiguous]
+            thought = "matched locally"
+            if ambiguous:
+                # App names may not show in the package names (e.g. "Play Store" is
+                # com.android.vending), so the LLM gets every package, closest candidates first
+                hopper_output: HopperOutput = await hopper(
+                    ctx=ctx,
+                    request="I'm looking for the package names of the following apps: "
+                    f"{[match.app_name for match in ambiguous]}",
+                    data=format_hopper_data(catalog, ambiguous),
+                )
+                thought = hopper_output.step
+                output = "\n".join(filter(None, [output, hopper_output.output]))
             tool_message = ToolMessage(
                 tool_call_id=tool_call_id,
-                content=find_packages_wrapper.on_success_fn(
-                    hopper_output.step, hopper_output.output
-                ),
+                content=find_packages_wrapper.on_success_fn(thought, output),
                 status="success",
             )
         except Exception as e:
-            print("Failed to extract insights from data: " + str(e))
+            logger.error(f"Failed to extract insights from data: {e}")
             tool_message = ToolMessage(
                 tool_call_id=tool_call_id,
                 content=find_packages_wrapper.on_failure_fn(),
@@ -66,6 +84,40 @@ def get_find_packages_tool(ctx: MobileUseContext):
     return find_packages
 
 
+def find_package_matches(
+    ctx: MobileUseContext, app_names: list[str]
+) -> tuple[PackageCatalog, list[PackageMatch]]:
+    """
+    Matches the app names against the device package catalog.
+    The catalog is rebuilt once if an app has no candidate at all, as it may have been installed
+    since it was built, unless it was built less than `MIN_REBUILD_INTERVAL_SECONDS` ago.
+    """
+    catalog = package_catalogs.get(ctx)
+    matches = [catalog.match(name) for name in app_names]
+    is_stale = time.monotonic() - catalog.built_at >= MIN_REBUILD_INTERVAL_SECONDS
+    if is_stale and any(not match.candidates for match in matches):
+        package_catalogs.invalidate(ctx.device.device_id)
+        catalog = package_catalogs.get(ctx)
+        matches = [catalog.match(name) for name in app_names]
+    return catalog, matches
+
+
+def _format_entry(entry: PackageEntry) -> str:
+    return entry.package + (f" ({entry.label})" if entry.label else "")
+
+
+def format_hopper_data(catalog: PackageCatalog, matches: list[PackageMatch]) -> str:
+    lines = [
+        f"Closest candidates for {match.app_name}: "
+        + ", ".join(_format_entry(entry) for entry in match.candidates)
+        for match in matches
+        if match.candidates
+    ]
+    lines.append("Installed packages:")
+    lines += [_format_entry(entry) for entry in catalog.entries]
+    return "\n".join(lines)
+
+
 find_packages_wrapper = ToolWrapper(
     tool_fn_getter=get_find_packages_tool,
     on_success_fn=lambda thought, output: f"Packages found successfully ({thought}): {output}",
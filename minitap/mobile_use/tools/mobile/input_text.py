@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import time
 from typing import Annotated, Literal
 
 from langchain_core.messages import ToolMessage
@@ -7,17 +8,22 @@ from langchain_core.tools import tool
 from langchain_core.tools.base import InjectedToolCallId
 from langgraph.prebuilt import InjectedState
 from langgraph.types import Command
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from minitap.mobile_use.constants import EXECUTOR_MESSAGES_KEY
-from minitap.mobile_use.context import MobileUseContext
+from minitap.mobile_use.context import DevicePlatform, MobileUseContext
 from minitap.mobile_use.controllers.mobile_command_controller import (
     get_screen_data,
 )
 from minitap.mobile_use.controllers.mobile_command_controller import (
     input_text as input_text_controller,
 )
+from minitap.mobile_use.controllers.platform_specific_commands_controller import (
+    CLIPPER_PACKAGE,
+    set_clipboard_and_paste,
+)
 from minitap.mobile_use.graph.state import State
+from minitap.mobile_use.services.package_catalog import package_catalogs
 from minitap.mobile_use.tools.tool_wrapper import ToolWrapper
 from minitap.mobile_use.tools.utils import (
     focus_element_if_needed,
@@ -32,12 +38,20 @@ from minitap.mobile_use.utils.ui_hierarchy import (
 
 logger = get_logger(__name__)
 
+# Texts this long, or multi-line, are pasted at once instead of typed character by character
+BULK_INPUT_MIN_CHARS = 32
+
+InputStrategy = Literal["type", "clipboard"]
+
 
 class InputResult(BaseModel):
     """Result of an input operation from the controller layer."""
 
     ok: bool
     error: str | None = None
+    strategy: InputStrategy = "type"
+    # Seconds spent by each step (strategies tried, verification)
+    timings: dict[str, float] = Field(default_factory=dict)
 
 
 def _controller_input_text(ctx: MobileUseContext, text: str) -> InputResult:
@@ -50,6 +64,42 @@ def _controller_input_text(ctx: MobileUseContext, text: str) -> InputResult:
     return InputResult(ok=False, error=str(controller_out))
 
 
+def _should_bulk_input(ctx: MobileUseContext, text: str) -> bool:
+    return ctx.device.mobile_platform == DevicePlatform.ANDROID and (
+        len(text) >= BULK_INPUT_MIN_CHARS or "\n" in text
+    )
+
+
+def _clipboard_input_text(ctx: MobileUseContext, text: str) -> bool:
+    if not package_catalogs.get(ctx).has_package(CLIPPER_PACKAGE):
+        logger.debug(f"{CLIPPER_PACKAGE} isn't installed, the clipboard can't be set")
+        return False
+    return set_clipboard_and_paste(ctx, text)
+
+
+def _input_text(ctx: MobileUseContext, text: str) -> InputResult:
+    """
+    Enters the text in the focused input: long texts are pasted through the clipboard when
+    possible, other texts (or if pasting isn't available) are typed.
+    """
+    timings: dict[str, float] = {}
+    if _should_bulk_input(ctx, text):
+        start = time.perf_counter()
+        try:
+            pasted = _clipboard_input_text(ctx, text)
+        except Exception as e:
+            logger.warning(f"Failed to paste the text through the clipboard: {e}")
+            pasted = False
+        timings["clipboard"] = time.perf_counter() - start
+        if pasted:
+            return InputResult(ok=True, strategy="clipboard", timings=timings)
+
+    start = time.perf_counter()
+    result = _controller_input_text(ctx=ctx, text=text)
+    result.timings = {**timings, "type": time.perf_counter() - start}
+    return result
+
+
 def get_input_text_tool(ctx: MobileUseContext):
     @tool
     def input_text(
@@ -111,7 +161,7 @@ def get_input_text_tool(ctx: MobileUseContext):
             text_input_text=text_input_text,
         )
 
-        result = _controller_input_text(ctx=ctx, text=text)
+        result = _input_text(ctx=ctx, text=text)
 
         status: Literal["success", "error"] = "success" if result.ok else "error"
 
@@ -119,6 +169,7 @@ def get_input_text_tool(ctx: MobileUseContext):
         if status == "success":
             if text_input_resource_id is not None:
                 # Verification phase for elements with resource_id
+                verification_start = time.perf_counter()
                 screen_data = get_screen_data(screen_api_client=ctx.screen_api_client)
                 state.latest_ui_hierarchy = screen_data.elements
 
@@ -128,14 +179,20 @@ def get_input_text_tool(ctx: MobileUseContext):
                 )
 
                 if not element:
-                    result = InputResult(ok=False, error="Element not found")
+                    result = result.model_copy(update={"ok": False, "error": "Element not found"})
 
                 if element:
                     text_input_content = get_element_text(element)
+                    if result.strategy == "clipboard" and text not in (text_input_content or ""):
+                        result = result.model_copy(
+                            update={"ok": False, "error": "The pasted text isn't in the input"}
+                        )
+                result.timings["verification"] = time.perf_counter() - verification_start
             else:
                 # For elements without resource_id, skip verification and use direct message
                 pass
 
+        status = "success" if result.ok else "error"
         agent_outcome = (
             input_text_wrapper.on_success_fn(text, text_input_content, text_input_resource_id)
             if result.ok
@@ -145,7 +202,11 @@ def get_input_text_tool(ctx: MobileUseContext):
         tool_message = ToolMessage(
             tool_call_id=tool_call_id,
             content=agent_outcome,
-            additional_kwargs={"error": result.error} if not result.ok else {},
+            additional_kwargs={
+                **({"error": result.error} if not result.ok else {}),
+                "input_strategy": result.strategy,
+                "timings": {name: round(seconds, 3) for name, seconds in result.timings.items()},
+            },
             status=status,
         )
 
@@ -0,0 +1,145 @@
+from typing import Annotated
+
+from langchain_core.messages import ToolMessage
+from langchain_core.tools import tool
+from langchain_core.tools.base import InjectedToolCallId
+from langgraph.prebuilt import InjectedState
+from langgraph.types import Command
+from pydantic import BaseModel, Field
+
+from minitap.mobile_use.constants import EXECUTOR_MESSAGES_KEY
+from minitap.mobile_use.context import MobileUseContext
+from minitap.mobile_use.controllers.mobile_command_controller import (
+    SwipeDirection,
+    SwipeRequest,
+)
+from minitap.mobile_use.controllers.mobile_command_controller import (
+    swipe as swipe_controller,
+)
+from minitap.mobile_use.graph.state import State
+from minitap.mobile_use.services.accessibility import get_rich_hierarchy
+from minitap.mobile_use.tools.tool_wrapper import ToolWrapper
+from minitap.mobile_use.utils.logger import get_logger
+from minitap.mobile_use.utils.ui_hierarchy import ElementTarget, HierarchyIndex
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_SWIPES = 8
+MAX_SWIPES_LIMIT = 20
+
+
+class ScrollResult(BaseModel):
+    found: bool
+    swipes: int
+    # Set when the element wasn't found: the end of the scrollable content, or the step cap
+    stop_reason: str | None = None
+    element: dict | None = None
+    error: str | None = None
+
+
+def find_by_scrolling(
+    ctx: MobileUseContext,
+    target: ElementTarget,
+    direction: SwipeDirection,
+    max_swipes: int = DEFAULT_MAX_SWIPES,
+    swipe_duration: int | None = None,
+) -> ScrollResult:
+    """
+    Swipes in `direction` until the target is in the hierarchy, the screen stops changing
+    (end of the content), or `max_swipes` swipes were made.
+    The hierarchy is checked once before swiping and once after each swipe has settled.
+    """
+    index = HierarchyIndex(get_rich_hierarchy(ctx))
+    swipes = 0
+    while (element := index.find(target)) is None:
+        if swipes >= max_swipes:
+            return ScrollResult(found=False, swipes=swipes, stop_reason="max swipes reached")
+        # The swipe flow waits for the animations to end before returning
+        error = swipe_controller(
+            ctx=ctx, swipe_request=SwipeRequest(swipe_mode=direction, duration=swipe_duration)
+        )
+        if error is not None:
+            return ScrollResult(found=False, swipes=swipes, error=str(error))
+        swipes += 1
+        previous_signature = index.signature()
+        index = HierarchyIndex(get_rich_hierarchy(ctx))
+        if index.find(target) is None and index.signature() == previous_signature:
+            return ScrollResult(found=False, swipes=swipes, stop_reason="the screen stopped moving")
+        logger.debug(f"Swipe {swipes}/{max_swipes}: {target} not visible yet")
+    return ScrollResult(found=True, swipes=swipes, element=element)
+
+
+def get_scroll_until_visible_tool(ctx: MobileUseContext):
+    @tool
+    def scroll_until_visible(
+        tool_call_id: Annotated[str, InjectedToolCallId],
+        state: Annotated[State, InjectedState],
+        agent_thought: str,
+        target: ElementTarget,
+        direction: SwipeDirection,
+        max_swipes: int = Field(default=DEFAULT_MAX_SWIPES, ge=1, le=MAX_SWIPES_LIMIT),
+        swipe_duration: int | None = Field(
+            default=None, description="Duration of each swipe in ms", ge=1, le=10000
+        ),
+    ):
+        """
+        Swipes repeatedly in one direction until an element is visible, in a single call.
+        Prefer it over successive swipes to look for an off-screen element in a list.
+
+        - `direction` is the finger movement: UP reveals the content below, DOWN the content
+          above, LEFT the content on the right, RIGHT the content on the left.
+        - Stops as soon as the target (resource id and/or text) is on screen, when the screen
+          stops moving (end of the list), or after `max_swipes` swipes.
+        """
+        result = find_by_scrolling(
+            ctx=ctx,
+            target=target,
+            direction=direction,
+            max_swipes=max_swipes,
+            swipe_duration=swipe_duration,
+        )
+        has_failed = not result.found
+        tool_message = ToolMessage(
+            tool_call_id=tool_call_id,
+            content=(
+                scroll_until_visible_wrapper.on_failure_fn(target, result)
+                if has_failed
+                else scroll_until_visible_wrapper.on_success_fn(target, result)
+            ),
+            additional_kwargs={"error": result.error or result.stop_reason} if has_failed else {},
+            status="error" if has_failed else "success",
+        )
+        return Command(
+            update=state.sanitize_update(
+                ctx=ctx,
+                update={
+                    "agents_thoughts": [agent_thought, tool_message.content],
+                    EXECUTOR_MESSAGES_KEY: [tool_message],
+                },
+                agent="executor",
+            ),
+        )
+
+    return scroll_until_visible
+
+
+def _format_success_message(target: ElementTarget, result: ScrollResult) -> str:
+    element = result.element or {}
+    details = ", ".join(
+        f"{key}={element[key]!r}"
+        for key in ("resource-id", "text", "accessibilityText", "bounds")
+        if element.get(key)
+    )
+    return f"Found the element ({target}) after {result.swipes} swipe(s): {details}"
+
+
+def _format_failure_message(target: ElementTarget, result: ScrollResult) -> str:
+    reason = f"error: {result.error}" if result.error else result.stop_reason
+    return f"Element ({target}) not found after {result.swipes} swipe(s) ({reason})."
+
+
+scroll_until_visible_wrapper = ToolWrapper(
+    tool_fn_getter=get_scroll_until_visible_tool,
+    on_success_fn=_format_success_message,
+    on_failure_fn=_format_failure_message,
+)
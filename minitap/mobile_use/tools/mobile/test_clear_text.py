@@ -0,0 +1,76 @@
+import sys
+from unittest.mock import Mock, patch
+
+import pytest
+
+sys.modules["langgraph.prebuilt.chat_agent_executor"] = Mock()
+sys.modules["minitap.mobile_use.graph.state"] = Mock()
+
+from minitap.mobile_use.context import DevicePlatform  # noqa: E402
+from minitap.mobile_use.tools.mobile import clear_text  # noqa: E402
+from minitap.mobile_use.tools.mobile.clear_text import TextClearer  # noqa: E402
+
+RESOURCE_ID = "com.example:id/text_input"
+
+
+def _rich_hierarchy(text: str) -> list[dict]:
+    return [{"attributes": {"resource-id": RESOURCE_ID, "text": text}, "children": []}]
+
+
+@pytest.fixture
+def clearer():
+    ctx = Mock()
+    ctx.device.mobile_platform = DevicePlatform.ANDROID
+    state = Mock()
+    state.latest_ui_hierarchy = [{"resourceId": RESOURCE_ID, "text": "Some long text"}]
+    return TextClearer(ctx, state)
+
+
+@pytest.fixture
+def device(monkeypatch):
+    monkeypatch.setattr(clear_text, "focus_element_if_needed", Mock(return_value=True))
+    monkeypatch.setattr(clear_text, "move_cursor_to_end_if_bounds", Mock())
+    monkeypatch.setattr(clear_text, "select_all_and_delete", Mock())
+    monkeypatch.setattr(clear_text, "erase_text_controller", Mock(return_value=None))
+    monkeypatch.setattr(clear_text, "device_info_service", Mock())
+    clear_text.device_info_service.get.return_value.sdk_level = 34
+    return clear_text
+
+
+def test_text_is_cleared_in_one_batch_with_one_hierarchy_read(clearer, device):
+    with patch.object(clear_text, "get_rich_hierarchy", return_value=_rich_hierarchy("")) as read:
+        result = clearer.clear_input_text(RESOURCE_ID, None, None)
+
+    assert result.success
+    assert result.chars_erased == len("Some long text")
+    device.select_all_and_delete.assert_called_once()
+    assert device.select_all_and_delete.call_args.kwargs["sdk_level"] == 34
+    read.assert_called_once()
+    device.erase_text_controller.assert_not_called()
+
+
+def test_iterative_erase_is_a_fallback_when_text_remains(clearer, device, monkeypatch):
+    refreshed = Mock()
+    refreshed.elements = [{"resourceId": RESOURCE_ID, "text": ""}]
+    monkeypatch.setattr(clear_text, "get_screen_data", Mock(return_value=refreshed))
+
+    with patch.object(clear_text, "get_rich_hierarchy", return_value=_rich_hierarchy("Some")):
+        result = clearer.clear_input_text(RESOURCE_ID, None, None)
+
+    assert result.success
+    device.erase_text_controller.assert_called_once()
+    assert device.erase_text_controller.call_args.kwargs["nb_chars"] == len("Some") + 1
+
+
+def test_batch_clear_without_resource_id_is_checked_on_the_focused_node(clearer, device):
+    hierarchy = [
+        {"attributes": {"text": "Title"}, "children": []},
+        {"attributes": {"text": "", "focused": "true"}, "children": []},
+    ]
+    with patch.object(clear_text, "get_rich_hierarchy", return_value=hierarchy):
+        cleared, text = clearer._clear_in_one_batch(None, None, "Some long text", 14, None)
+    assert cleared and text == ""
+
+    with patch.object(clear_text, "get_rich_hierarchy", return_value=[]):
+        cleared, text = clearer._clear_in_one_batch(None, None, "Some long text", 14, None)
+    assert cleared and text is None
@@ -0,0 +1,53 @@
+import sys
+import time
+from unittest.mock import Mock
+
+sys.modules["langgraph.prebuilt.chat_agent_executor"] = Mock()
+sys.modules["minitap.mobile_use.graph.state"] = Mock()
+
+from minitap.mobile_use.services.package_catalog import (  # noqa: E402
+    MIN_REBUILD_INTERVAL_SECONDS,
+    PackageCatalog,
+    PackageEntry,
+    parse_android_packages,
+)
+from minitap.mobile_use.tools.mobile import find_packages  # noqa: E402
+
+
+def test_catalog_missing_an_app_is_rebuilt_at_most_once_per_interval(monkeypatch):
+    catalog = PackageCatalog([PackageEntry(package="com.whatsapp")])
+    catalogs = Mock()
+    catalogs.get.return_value = catalog
+    monkeypatch.setattr(find_packages, "package_catalogs", catalogs)
+    ctx = Mock()
+
+    _, matches = find_packages.find_package_matches(ctx, ["Not Installed"])
+    assert not matches[0].candidates
+    catalogs.invalidate.assert_not_called()
+
+    catalog.built_at = time.monotonic() - MIN_REBUILD_INTERVAL_SECONDS
+    find_packages.find_package_matches(ctx, ["Not Installed"])
+    catalogs.invalidate.assert_called_once_with(ctx.device.device_id)
+
+
+def test_apps_named_unlike_their_package_are_sent_to_the_hopper(monkeypatch):
+    catalog = PackageCatalog(
+        parse_android_packages(
+            "package:com.android.vending\npackage:com.android.phone\n"
+            "package:com.google.android.dialer\npackage:com.whatsapp\n",
+            "com.android.vending/.AssetBrowserActivity\n"
+            "com.google.android.dialer/.extensions.GoogleDialtactsActivity\n"
+            "com.whatsapp/.Main\n",
+        )
+    )
+    catalogs = Mock()
+    catalogs.get.return_value = catalog
+    monkeypatch.setattr(find_packages, "package_catalogs", catalogs)
+
+    _, matches = find_packages.find_package_matches(Mock(), ["Play Store", "Phone"])
+    data = find_packages.format_hopper_data(catalog, matches)
+
+    assert all(match.ambiguous for match in matches)
+    assert "Closest candidates for Phone: com.android.phone" in data
+    assert "com.android.vending" in data.splitlines()
+    assert "com.google.android.dialer" in data.splitlines()
@@ -0,0 +1,63 @@
+import sys
+from unittest.mock import Mock
+
+import pytest
+
+sys.modules["langgraph.prebuilt.chat_agent_executor"] = Mock()
+sys.modules["minitap.mobile_use.graph.state"] = Mock()
+
+from minitap.mobile_use.context import DevicePlatform  # noqa: E402
+from minitap.mobile_use.tools.mobile import input_text  # noqa: E402
+from minitap.mobile_use.tools.mobile.input_text import BULK_INPUT_MIN_CHARS  # noqa: E402
+
+LONG_TEXT = "221B Baker Street, London NW1 6XE, United Kingdom"
+
+
+@pytest.fixture
+def ctx():
+    ctx = Mock()
+    ctx.device.mobile_platform = DevicePlatform.ANDROID
+    return ctx
+
+
+@pytest.fixture
+def device(monkeypatch):
+    monkeypatch.setattr(input_text, "input_text_controller", Mock(return_value=None))
+    monkeypatch.setattr(input_text, "set_clipboard_and_paste", Mock(return_value=True))
+    monkeypatch.setattr(input_text, "package_catalogs", Mock())
+    input_text.package_catalogs.get.return_value.has_package.return_value = True
+    return input_text
+
+
+def test_short_texts_are_typed(ctx, device):
+    result = input_text._input_text(ctx, "hello")
+
+    assert result.ok and result.strategy == "type"
+    assert set(result.timings) == {"type"}
+    device.set_clipboard_and_paste.assert_not_called()
+
+
+def test_long_and_multiline_texts_are_pasted(ctx, device):
+    assert len(LONG_TEXT) >= BULK_INPUT_MIN_CHARS
+    for text in (LONG_TEXT, "line 1\nline 2"):
+        result = input_text._input_text(ctx, text)
+
+        assert result.ok and result.strategy == "clipboard"
+        assert set(result.timings) == {"clipboard"}
+    device.input_text_controller.assert_not_called()
+
+
+def test_long_texts_are_typed_without_clipboard_helper(ctx, device):
+    device.package_catalogs.get.return_value.has_package.return_value = False
+
+    result = input_text._input_text(ctx, LONG_TEXT)
+
+    assert result.ok and result.strategy == "type"
+    assert set(result.timings) == {"clipboard", "type"}
+    device.input_text_controller.assert_called_once_with(ctx=ctx, text=LONG_TEXT)
+
+
+def test_ios_texts_are_typed(ctx, device):
+    ctx.device.mobile_platform = DevicePlatform.IOS
+
+    assert input_text._input_text(ctx, LONG_TEXT).strategy == "type"
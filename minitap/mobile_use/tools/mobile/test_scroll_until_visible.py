@@ -0,0 +1,62 @@
+import sys
+from unittest.mock import Mock
+
+import pytest
+
+sys.modules["langgraph.prebuilt.chat_agent_executor"] = Mock()
+sys.modules["minitap.mobile_use.graph.state"] = Mock()
+
+from minitap.mobile_use.tools.mobile import scroll_until_visible  # noqa: E402
+from minitap.mobile_use.tools.mobile.scroll_until_visible import find_by_scrolling  # noqa: E402
+from minitap.mobile_use.utils.ui_hierarchy import ElementTarget  # noqa: E402
+
+
+def _screen(*texts: str) -> list[dict]:
+    return [{"attributes": {"text": text}, "children": []} for text in texts]
+
+
+@pytest.fixture
+def device(monkeypatch):
+    """A list of 3 screens, the last one being the end of the list."""
+    screens = [_screen("Alice", "Bob"), _screen("Carol", "Dave"), _screen("Eve", "Frank")]
+    position = {"screen": 0}
+
+    def swipe(ctx, swipe_request):
+        position["screen"] = min(position["screen"] + 1, len(screens) - 1)
+
+    swipe_controller = Mock(side_effect=swipe)
+    monkeypatch.setattr(scroll_until_visible, "swipe_controller", swipe_controller)
+    monkeypatch.setattr(
+        scroll_until_visible, "get_rich_hierarchy", lambda ctx: screens[position["screen"]]
+    )
+    return swipe_controller
+
+
+def test_stops_when_the_target_appears(device):
+    result = find_by_scrolling(Mock(), ElementTarget(text="Dave"), direction="UP")
+
+    assert result.found and result.swipes == 1
+    assert result.element == {"text": "Dave"}
+
+
+def test_no_swipe_when_the_target_is_already_visible(device):
+    result = find_by_scrolling(Mock(), ElementTarget(text="alice"), direction="UP")
+
+    assert result.found and result.swipes == 0
+    device.assert_not_called()
+
+
+def test_stops_at_the_end_of_the_list(device):
+    result = find_by_scrolling(Mock(), ElementTarget(text="Zoe"), direction="UP")
+
+    assert not result.found
+    assert result.swipes == 3
+    assert result.stop_reason == "the screen stopped moving"
+
+
+def test_stops_after_max_swipes(device):
+    result = find_by_scrolling(Mock(), ElementTarget(text="Zoe"), direction="UP", max_swipes=1)
+
+    assert not result.found
+    assert result.swipes == 1
+    assert result.stop_reason == "max swipes reached"
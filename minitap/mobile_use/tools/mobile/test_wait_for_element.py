@@ -0,0 +1,87 @@
+import sys
+from unittest.mock import Mock
+
+import pytest
+import requests
+
+sys.modules["langgraph.prebuilt.chat_agent_executor"] = Mock()
+sys.modules["minitap.mobile_use.graph.state"] = Mock()
+
+from minitap.mobile_use.controllers.mobile_command_controller import (  # noqa: E402
+    ScreenElementsResponse,
+)
+from minitap.mobile_use.tools.mobile import wait_for_element  # noqa: E402
+from minitap.mobile_use.tools.mobile.wait_for_element import (  # noqa: E402
+    element_appears,
+    element_disappears,
+    wait_for_condition,
+)
+from minitap.mobile_use.utils.ui_hierarchy import ElementTarget  # noqa: E402
+
+SPINNER = {"resourceId": "com.example:id/spinner", "children": []}
+RESULT = {"resourceId": "com.example:id/result", "text": "42 results", "children": []}
+
+
+def _frame(version: int, *elements: dict) -> ScreenElementsResponse:
+    return ScreenElementsResponse(
+        version=version, elements=list(elements), width=1080, height=1920, platform="android"
+    )
+
+
+@pytest.fixture
+def screen(monkeypatch):
+    """The spinner is shown for 2 frames, then replaced by the result."""
+    frames = [_frame(1, SPINNER), _frame(2, SPINNER), _frame(3, RESULT)]
+    get_screen_elements = Mock(side_effect=lambda client, **kwargs: frames.pop(0))
+    monkeypatch.setattr(wait_for_element, "get_screen_elements", get_screen_elements)
+    return get_screen_elements
+
+
+def test_waits_for_the_frame_where_the_element_appears(screen):
+    target = ElementTarget(resource_id="com.example:id/result")
+
+    result = wait_for_condition(Mock(), element_appears(target), timeout=5)
+
+    assert result.met and result.frames == 2
+    assert result.element is not None and result.element["text"] == "42 results"
+    # Each wait blocks on the screen API until a frame newer than the last one seen
+    assert [call.kwargs.get("after_version") for call in screen.call_args_list] == [0, 1, 2]
+
+
+def test_waits_for_the_element_to_be_gone(screen):
+    target = ElementTarget(resource_id="com.example:id/spinner")
+
+    assert wait_for_condition(Mock(), element_disappears(target), timeout=5).met
+
+
+def test_text_equals_condition(screen):
+    target = ElementTarget(resource_id="com.example:id/result")
+
+    assert wait_for_condition(Mock(), element_appears(target, "42 results"), timeout=5).met
+
+
+def test_timeout_reports_the_condition_not_met(monkeypatch):
+    monkeypatch.setattr(
+        wait_for_element,
+        "get_screen_elements",
+        Mock(side_effect=lambda client, **kwargs: _frame(1, SPINNER)),
+    )
+    target = ElementTarget(resource_id="com.example:id/result")
+
+    result = wait_for_condition(Mock(), element_appears(target), timeout=0.01)
+
+    assert not result.met
+
+
+def test_missing_frames_fail_without_retrying_past_the_deadline():
+    response = Mock(status_code=503)
+    response.raise_for_status.side_effect = requests.HTTPError("503 Service Unavailable")
+    ctx = Mock()
+    ctx.screen_api_client.get.return_value = response
+    target = ElementTarget(resource_id="com.example:id/result")
+
+    with pytest.raises(requests.HTTPError):
+        wait_for_condition(ctx, element_appears(target), timeout=3)
+
+    ctx.screen_api_client.get_with_retry.assert_not_called()
+    assert ctx.screen_api_client.get.call_args.kwargs["timeout"] <= 3 + 2
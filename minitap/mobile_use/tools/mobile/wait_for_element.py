@@ -0,0 +1,219 @@
+import time
+from collections.abc import Callable
+from contextvars import ContextVar
+from typing import Annotated
+
+from langchain_core.messages import ToolMessage
+from langchain_core.tools import tool
+from langchain_core.tools.base import InjectedToolCallId
+from langgraph.prebuilt import InjectedState
+from langgraph.types import Command
+from pydantic import BaseModel, Field
+
+from minitap.mobile_use.constants import EXECUTOR_MESSAGES_KEY
+from minitap.mobile_use.context import MobileUseContext
+from minitap.mobile_use.controllers.mobile_command_controller import get_screen_elements
+from minitap.mobile_use.graph.state import State
+from minitap.mobile_use.tools.tool_wrapper import ToolWrapper
+from minitap.mobile_use.utils.logger import get_logger
+from minitap.mobile_use.utils.ui_hierarchy import ElementTarget, HierarchyIndex
+
+logger = get_logger(__name__)
+
+DEFAULT_WAIT_TIMEOUT_SECONDS = 10.0
+MAX_WAIT_TIMEOUT_SECONDS = 60.0
+# Tools used as postconditions of the actions of a script (see `ExecutorToolNode`)
+GUARD_TOOL_NAMES = frozenset({"wait_for_element", "wait_for_element_gone"})
+# Longest single wait for the next frame, so that the deadline is checked regularly
+_FRAME_WAIT_SECONDS = 5.0
+# Longest wait for a frame newer than the frame barrier, e.g. when the screen doesn't change
+FRESH_FRAME_WAIT_SECONDS = 2.0
+
+# Version of the latest frame once the last action of a script has returned: its guards only
+# check newer frames, so that they don't pass on the screen preceding the action
+frame_barrier: ContextVar[int | None] = ContextVar("frame_barrier", default=None)
+
+
+class WaitResult(BaseModel):
+    met: bool
+    waited_seconds: float
+    frames: int
+    # The matching element, when waiting for an element to appear
+    element: dict | None = None
+    last_text: str | None = None
+
+
+def wait_for_condition(
+    ctx: MobileUseContext,
+    condition: Callable[[HierarchyIndex], tuple[bool, dict | None]],
+    timeout: float,
+) -> WaitResult:
+    """
+    Checks `condition` on the current hierarchy, then on the hierarchy of every new frame
+    pushed to the screen API, until it holds or `timeout` seconds have passed.
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    barrier = frame_barrier.get()
+    if barrier is None:
+        # Version 0 precedes the first frame: the current one is returned at once, if any
+        screen = get_screen_elements(ctx.screen_api_client, after_version=0, timeout=timeout)
+    else:
+        screen = get_screen_elements(
+            ctx.screen_api_client,
+            after_version=barrier,
+            timeout=min(timeout, FRESH_FRAME_WAIT_SECONDS),
+        )
+    frames = 0
+    while True:
+        met, element = condition(HierarchyIndex(screen.elements))
+        remaining = deadline - time.monotonic()
+        if met or remaining <= 0:
+            return WaitResult(
+                met=met,
+                waited_seconds=round(time.monotonic() - start, 2),
+                frames=frames,
+                element=element,
+                last_text=element.get("text") if element else None,
+            )
+        previous_version = screen.version
+        screen = get_screen_elements(
+            ctx.screen_api_client,
+            after_version=previous_version,
+            timeout=min(remaining, _FRAME_WAIT_SECONDS),
+        )
+        if screen.version != previous_version:
+            frames += 1
+
+
+def element_appears(target: ElementTarget, expected_text: str | None = None):
+    def condition(index: HierarchyIndex) -> tuple[bool, dict | None]:
+        element = index.find(target)
+        if element is None or expected_text is None:
+            return element is not None, element
+        return (element.get("text") or "").strip() == expected_text.strip(), element
+
+    return condition
+
+
+def element_disappears(target: ElementTarget):
+    def condition(index: HierarchyIndex) -> tuple[bool, dict | None]:
+        element = index.find(target)
+        return element is None, element
+
+    return condition
+
+
+def _build_command(
+    ctx: MobileUseContext,
+    state: State,
+    tool_call_id: str,
+    agent_thought: str,
+    content: str,
+    met: bool,
+) -> Command:
+    tool_message = ToolMessage(
+        tool_call_id=tool_call_id,
+        content=content,
+        additional_kwargs={} if met else {"error": content},
+        status="success" if met else "error",
+    )
+    return Command(
+        update=state.sanitize_update(
+            ctx=ctx,
+            update={
+                "agents_thoughts": [agent_thought, content],
+                EXECUTOR_MESSAGES_KEY: [tool_message],
+            },
+            agent="executor",
+        ),
+    )
+
+
+def get_wait_for_element_tool(ctx: MobileUseContext):
+    @tool
+    def wait_for_element(
+        tool_call_id: Annotated[str, InjectedToolCallId],
+        state: Annotated[State, InjectedState],
+        agent_thought: str,
+        target: ElementTarget,
+        expected_text: str | None = Field(
+            default=None, description="If set, also waits for the element text to equal it"
+        ),
+        timeout_seconds: float = Field(
+            default=DEFAULT_WAIT_TIMEOUT_SECONDS, gt=0, le=MAX_WAIT_TIMEOUT_SECONDS
+        ),
+    ):
+        """
+        Waits until an element is on screen (e.g. a loaded result), and optionally until its
+        text equals `expected_text`. Returns as soon as it does, or after the timeout.
+        """
+        result = wait_for_condition(
+            ctx, element_appears(target, expected_text), timeout=timeout_seconds
+        )
+        content = (
+            wait_for_element_wrapper.on_success_fn(target, result)
+            if result.met
+            else wait_for_element_wrapper.on_failure_fn(target, result, expected_text)
+        )
+        return _build_command(ctx, state, tool_call_id, agent_thought, content, result.met)
+
+    return wait_for_element
+
+
+def get_wait_for_element_gone_tool(ctx: MobileUseContext):
+    @tool
+    def wait_for_element_gone(
+        tool_call_id: Annotated[str, InjectedToolCallId],
+        state: Annotated[State, InjectedState],
+        agent_thought: str,
+        target: ElementTarget,
+        timeout_seconds: float = Field(
+            default=DEFAULT_WAIT_TIMEOUT_SECONDS, gt=0, le=MAX_WAIT_TIMEOUT_SECONDS
+        ),
+    ):
+        """
+        Waits until an element is no longer on screen (e.g. a loading spinner or a toast).
+        Returns as soon as it is gone, or after the timeout.
+        """
+        result = wait_for_condition(ctx, element_disappears(target), timeout=timeout_seconds)
+        content = (
+            wait_for_element_gone_wrapper.on_success_fn(target, result)
+            if result.met
+            else wait_for_element_gone_wrapper.on_failure_fn(target, result)
+        )
+        return _build_command(ctx, state, tool_call_id, agent_thought, content, result.met)
+
+    return wait_for_element_gone
+
+
+def _format_appeared(target: ElementTarget, result: WaitResult) -> str:
+    return f"Element ({target}) is on screen after {result.waited_seconds}s."
+
+
+def _format_not_appeared(
+    target: ElementTarget, result: WaitResult, expected_text: str | None
+) -> str:
+    if result.element is not None and expected_text is not None:
+        return (
+            f"Element ({target}) text is still {result.last_text!r} instead of "
+            f"{expected_text!r} after {result.waited_seconds}s."
+        )
+    return f"Element ({target}) didn't appear after {result.waited_seconds}s."
+
+
+wait_for_element_wrapper = ToolWrapper(
+    tool_fn_getter=get_wait_for_element_tool,
+    on_success_fn=_format_appeared,
+    on_failure_fn=_format_not_appeared,
+)
+
+wait_for_element_gone_wrapper = ToolWrapper(
+    tool_fn_getter=get_wait_for_element_gone_tool,
+    on_success_fn=lambda target, result: (
+        f"Element ({target}) is gone after {result.waited_seconds}s."
+    ),
+    on_failure_fn=lambda target, result: (
+        f"Element ({target}) is still on screen after {result.waited_seconds}s."
+    ),
+)
@@ -8,6 +8,7 @@ from minitap.mobile_use.controllers.mobile_command_controller import (
     tap,
 )
 from minitap.mobile_use.graph.state import State
+from minitap.mobile_use.services.accessibility import get_rich_hierarchy
 from minitap.mobile_use.utils.logger import get_logger
 from minitap.mobile_use.utils.ui_hierarchy import (
     ElementBounds,
@@ -120,7 +121,7 @@ def focus_element_if_needed(
     """
     Ensures the element is focused, with a sanity check to prevent trusting misleading IDs.
     """
-    rich_hierarchy = ctx.hw_bridge_client.get_rich_hierarchy()
+    rich_hierarchy = get_rich_hierarchy(ctx)
 
     elt_from_id = None
     if input_resource_id:
@@ -144,7 +145,7 @@ def focus_element_if_needed(
         if not is_element_focused(elt_from_id):
             tap(ctx=ctx, selector_request=IdSelectorRequest(id=input_resource_id))  # type: ignore
             logger.debug(f"Focused (tap) on resource_id={input_resource_id}")
-            rich_hierarchy = ctx.hw_bridge_client.get_rich_hierarchy()
+            rich_hierarchy = get_rich_hierarchy(ctx)
             elt_from_id = find_element_by_resource_id(
                 ui_hierarchy=rich_hierarchy,
                 resource_id=input_resource_id,  # type: ignore
@@ -5,6 +5,7 @@ import subprocess
 import time
 from collections.abc import Iterable
 
+from minitap.mobile_use.services.adb_session import list_adb_devices
 from minitap.mobile_use.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -45,6 +46,9 @@ def _run(cmd: str, timeout: int = 30, check: bool = False) -> tuple[int, str, st
 
 
 def _devices() -> list[str]:
+    devices = list_adb_devices()
+    if devices is not None:
+        return devices
     rc, out, _ = _run("adb devices -l")
     if rc != 0:
         return []
@@ -0,0 +1,168 @@
+"""
+Local repair of the malformed JSON commonly returned by LLMs in JSON mode:
+markdown code fences, trailing commas, python literals, truncated output...
+"""
+
+import json
+import re
+import types
+from typing import Any, Union, get_args, get_origin
+
+from pydantic import BaseModel
+
+_CODE_FENCE_RE = re.compile(r"```(?:json|JSON)?\s*\n?(.*?)(?:```|$)", re.DOTALL)
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+# Any letters, not only ASCII ones: `str.isalpha` is true for non-ASCII letters too
+_WORD_RE = re.compile(r"[^\W\d_]+")
+
+
+def strip_code_fences(text: str) -> str:
+    match = _CODE_FENCE_RE.search(text)
+    return match.group(1).strip() if match else text.strip()
+
+
+def repair_json(text: str) -> Any:
+    """
+    Parses `text` as JSON, repairing it if needed. Raises a `ValueError` if it can't be repaired.
+    """
+    text = strip_code_fences(text)
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        raise ValueError("No JSON object or array found")
+    text = text[min(starts) :]
+    try:
+        value, _ = json.JSONDecoder().raw_decode(text)
+        return value
+    except json.JSONDecodeError:
+        pass
+    try:
+        return json.loads(_close_json(text))
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Unable to repair JSON: {e}") from e
+
+
+def _close_json(text: str) -> str:
+    """
+    Rewrites the first JSON value of `text`: drops trailing commas, converts python literals,
+    and closes the strings, arrays and objects left open by a truncated output.
+    """
+    output: list[str] = []
+    stack: list[str] = []
+    in_string = False
+    escaped = False
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if in_string:
+            output.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            i += 1
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]":
+            _strip_trailing_comma(output)
+            if not stack:
+                break
+            stack.pop()
+            output.append(char)
+            if not stack:
+                break
+            i += 1
+            continue
+        elif char.isalpha():
+            match = _WORD_RE.match(text, i)
+            if match is None:
+                raise ValueError(f"Unexpected character {char!r} at position {i}")
+            word = match.group(0)
+            output.append(_PYTHON_LITERALS.get(word, word))
+            i += len(word)
+            continue
+        output.append(char)
+        i += 1
+
+    if in_string:
+        if escaped:
+            output.pop()
+        output.append('"')
+    _strip_trailing_comma(output)
+    if output and output[-1] == ":":
+        output.append("null")
+    for closing in reversed(stack):
+        _strip_trailing_comma(output)
+        output.append(closing)
+    return "".join(output)
+
+
+def _strip_trailing_comma(output: list[str]) -> None:
+    while output and output[-1].isspace():
+        output.pop()
+    if output and output[-1] == ",":
+        output.pop()
+
+
+def coerce_to_model(data: Any, model: type[BaseModel]) -> Any:
+    """
+    Coerces the obvious type mismatches between `data` and the fields of `model`:
+    objects given for string fields are stringified, single values given for list fields
+    are wrapped, and a bare list is wrapped when the model has a single list field.
+    """
+    fields = model.model_fields
+    if isinstance(data, list):
+        list_fields = [name for name, f in fields.items() if _list_item_type(f.annotation)]
+        if len(list_fields) == 1:
+            data = {list_fields[0]: data}
+    if not isinstance(data, dict):
+        return data
+
+    coerced = dict(data)
+    for name, field in fields.items():
+        key = field.alias or name
+        if key not in coerced:
+            continue
+        coerced[key] = _coerce_value(coerced[key], field.annotation)
+    return coerced
+
+
+def _coerce_value(value: Any, annotation: Any) -> Any:
+    if value is None:
+        return [] if _list_item_type(annotation) and not _accepts_none(annotation) else None
+    if _accepts(annotation, str) and isinstance(value, dict | list):
+        return json.dumps(value, ensure_ascii=False)
+    item_type = _list_item_type(annotation)
+    if item_type is not None:
+        items = value if isinstance(value, list) else [value]
+        return [_coerce_value(item, item_type) for item in items]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return coerce_to_model(value, annotation)
+    return value
+
+
+def _union_members(annotation: Any) -> tuple[Any, ...]:
+    if get_origin(annotation) in (Union, types.UnionType):
+        return get_args(annotation)
+    return (annotation,)
+
+
+def _accepts(annotation: Any, type_: type) -> bool:
+    return type_ in _union_members(annotation)
+
+
+def _accepts_none(annotation: Any) -> bool:
+    return type(None) in _union_members(annotation)
+
+
+def _list_item_type(annotation: Any) -> Any | None:
+    for member in _union_members(annotation):
+        if get_origin(member) is list:
+            args = get_args(member)
+            return args[0] if args else Any
+    return None
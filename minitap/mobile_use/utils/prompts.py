@@ -0,0 +1,103 @@
+import threading
+from pathlib import Path
+
+from jinja2 import Environment, Template, Undefined
+
+from minitap.mobile_use.config import settings
+from minitap.mobile_use.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+AGENTS_PROMPTS_DIR = Path(__file__).parent.parent / "agents"
+
+
+class _DeferredUndefined(Undefined):
+    """
+    Renders a missing variable back as a jinja expression, so that a template can be rendered
+    in two passes: static variables first, dynamic ones later.
+    """
+
+    def __str__(self):
+        return "{{ " + str(self._undefined_name) + " }}"
+
+
+def _escape_static_value(value: str) -> str:
+    if "{{" in value or "{%" in value or "{#" in value:
+        return "{% raw %}" + value + "{% endraw %}"
+    return value
+
+
+class PromptRegistry:
+    """
+    Loads and compiles every agent prompt (`agents/<agent>/<name>.md`) once.
+
+    Prompts are referenced by their path relative to the agents directory,
+    e.g. `cortex/cortex.md` or `planner/human.md`.
+    When `hot_reload` is enabled, a prompt is recompiled as soon as its file changes on disk.
+    """
+
+    def __init__(self, prompts_dir: Path = AGENTS_PROMPTS_DIR, hot_reload: bool = False):
+        self._prompts_dir = prompts_dir
+        self._hot_reload = hot_reload
+        self._env = Environment()
+        self._partial_env = Environment(undefined=_DeferredUndefined)
+        self._sources: dict[str, str] = {}
+        self._mtimes: dict[str, float] = {}
+        self._templates: dict[str, Template] = {}
+        self._static_templates: dict[tuple[str, tuple[tuple[str, str], ...]], Template] = {}
+        self._lock = threading.Lock()
+        self.load_all()
+
+    def load_all(self) -> None:
+        with self._lock:
+            for path in sorted(self._prompts_dir.glob("*/*.md")):
+                self._load(path.relative_to(self._prompts_dir).as_posix())
+        logger.debug(f"Loaded {len(self._templates)} agent prompts")
+
+    def get(self, name: str) -> Template:
+        with self._lock:
+            if name not in self._templates:
+                self._load(name)
+            elif self._hot_reload:
+                self._reload_if_changed(name)
+            return self._templates[name]
+
+    def render(self, name: str, **variables) -> str:
+        return self.get(name).render(**variables)
+
+    def render_with_static(self, name: str, static: dict[str, str], **variables) -> str:
+        """
+        Renders a prompt whose `static` variables (platform, tools list...) are rendered once
+        and cached, so that only the dynamic `variables` are rendered on each call.
+
+        Dynamic variables must only be used as plain `{{ variable }}` expressions in the prompt.
+        """
+        self.get(name)  # loads or hot-reloads the prompt if needed
+        key = (name, tuple(sorted(static.items())))
+        with self._lock:
+            static_template = self._static_templates.get(key)
+            if static_template is None:
+                partially_rendered = self._partial_env.from_string(self._sources[name]).render(
+                    **{k: _escape_static_value(v) for k, v in static.items()}
+                )
+                static_template = self._env.from_string(partially_rendered)
+                self._static_templates[key] = static_template
+        return static_template.render(**variables)
+
+    def _load(self, name: str) -> None:
+        path = self._prompts_dir / name
+        source = path.read_text(encoding="utf-8")
+        self._sources[name] = source
+        self._mtimes[name] = path.stat().st_mtime
+        self._templates[name] = self._env.from_string(source)
+        for key in [k for k in self._static_templates if k[0] == name]:
+            del self._static_templates[key]
+
+    def _reload_if_changed(self, name: str) -> None:
+        mtime = (self._prompts_dir / name).stat().st_mtime
+        if mtime != self._mtimes.get(name):
+            logger.info(f"Prompt {name} changed on disk, reloading it")
+            self._load(name)
+
+
+prompt_registry = PromptRegistry(hot_reload=settings.PROMPTS_HOT_RELOAD)
@@ -0,0 +1,58 @@
+import pytest
+
+from minitap.mobile_use.agents.cortex.types import CortexOutput
+from minitap.mobile_use.agents.orchestrator.types import OrchestratorOutput
+from minitap.mobile_use.agents.planner.types import PlannerOutput
+from minitap.mobile_use.utils.json_repair import coerce_to_model, repair_json
+
+
+def test_repair_json_strips_code_fences_and_trailing_commas():
+    text = 'Here you go:\n```json\n{"a": [1, 2,], "b": {"c": true,},}\n```'
+    assert repair_json(text) == {"a": [1, 2], "b": {"c": True}}
+
+
+def test_repair_json_closes_truncated_output():
+    assert repair_json('{"a": [1, 2], "b": {"c": "d') == {"a": [1, 2], "b": {"c": "d"}}
+    assert repair_json('{"a": ') == {"a": None}
+
+
+def test_repair_json_converts_python_literals_and_ignores_trailing_text():
+    assert repair_json('{"a": True, "b": None,} trailing') == {"a": True, "b": None}
+    assert repair_json('{"a": 1} and {"b": 2}') == {"a": 1}
+
+
+def test_repair_json_raises_when_no_json():
+    with pytest.raises(ValueError):
+        repair_json("I cannot do that.")
+
+
+def test_repair_json_raises_value_error_on_non_ascii_bare_token():
+    with pytest.raises(ValueError):
+        repair_json('{"a": é}')
+    with pytest.raises(ValueError):
+        repair_json('{"a": Ünknown, "b": 1')
+
+
+def test_coerce_to_cortex_output_stringifies_decisions():
+    data = {
+        "decisions": {"action": "tap"},
+        "agent_thought": "tapping",
+        "complete_subgoals_by_ids": "1",
+    }
+    output = CortexOutput.model_validate(coerce_to_model(data, CortexOutput))
+    assert output.decisions == '{"action": "tap"}'
+    assert output.complete_subgoals_by_ids == ["1"]
+
+
+def test_coerce_to_planner_output_wraps_bare_list():
+    output = PlannerOutput.model_validate(
+        coerce_to_model([{"description": "Open settings"}], PlannerOutput)
+    )
+    assert output.subgoals[0].description == "Open settings"
+
+
+def test_coerce_to_orchestrator_output_replaces_null_list():
+    data = {"completed_subgoal_ids": None, "needs_replaning": "false", "reason": "ok"}
+    output = OrchestratorOutput.model_validate(coerce_to_model(data, OrchestratorOutput))
+    assert output.completed_subgoal_ids == []
+    assert output.needs_replaning is False
@@ -0,0 +1,37 @@
+import os
+
+from minitap.mobile_use.utils.prompts import PromptRegistry
+
+
+def _write_prompt(root, name: str, content: str):
+    path = root / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    return path
+
+
+def test_render_with_static_matches_full_render(tmp_path):
+    _write_prompt(
+        tmp_path,
+        "cortex/cortex.md",
+        "Platform: {{ platform }}\nTools: {{ tools }}\nGoal: {{ goal }}\n",
+    )
+    registry = PromptRegistry(prompts_dir=tmp_path)
+
+    static = {"platform": "android", "tools": "tap, {{ not_a_var }}"}
+    rendered = registry.render_with_static("cortex/cortex.md", static=static, goal="open {{ x }}")
+
+    assert rendered == registry.render("cortex/cortex.md", **static, goal="open {{ x }}")
+    assert rendered == "Platform: android\nTools: tap, {{ not_a_var }}\nGoal: open {{ x }}"
+
+
+def test_hot_reload_recompiles_changed_prompts(tmp_path):
+    path = _write_prompt(tmp_path, "planner/planner.md", "v1 {{ platform }}")
+    registry = PromptRegistry(prompts_dir=tmp_path, hot_reload=True)
+    assert registry.render_with_static("planner/planner.md", static={"platform": "ios"}) == "v1 ios"
+
+    path.write_text("v2 {{ platform }}", encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+    assert registry.render_with_static("planner/planner.md", static={"platform": "ios"}) == "v2 ios"
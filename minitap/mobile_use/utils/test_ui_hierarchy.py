@@ -1,7 +1,12 @@
 from unittest.mock import patch
 
+import pytest
+from pydantic import ValidationError
+
 from minitap.mobile_use.utils.ui_hierarchy import (
     ElementBounds,
+    ElementTarget,
+    HierarchyIndex,
     Point,
     find_element_by_resource_id,
     get_bounds_for_element,
@@ -179,3 +184,40 @@ if __name__ == "__main__":
     test_get_bounds_for_element()
     test_element_bounds()
     print("All tests passed")
+
+
+def test_hierarchy_index_find():
+    index = HierarchyIndex(
+        [
+            {
+                "attributes": {"resource-id": "com.example:id/list"},
+                "children": [
+                    {"attributes": {"resource-id": "com.example:id/row", "text": "Alice"}},
+                    {"attributes": {"resource-id": "com.example:id/row", "text": "Bob Martin"}},
+                    {"attributes": {"accessibilityText": "Settings"}},
+                ],
+            }
+        ]
+    )
+
+    assert index.find(ElementTarget(resource_id="com.example:id/row"))["text"] == "Alice"
+    assert index.find(ElementTarget(resource_id="com.example:id/row", text="bob martin"))
+    assert index.find(ElementTarget(text="Settings")) == {"accessibilityText": "Settings"}
+    assert index.find(ElementTarget(text="Bob")) is None
+    assert index.find(ElementTarget(text="Bob", fuzzy=True))["text"] == "Bob Martin"
+    assert index.find(ElementTarget(text="Alise", fuzzy=True))["text"] == "Alice"
+    assert index.find(ElementTarget(resource_id="com.example:id/missing")) is None
+
+
+def test_element_target_requires_a_resource_id_or_a_text():
+    for empty_target in ({}, {"resource_id": "", "text": ""}, {"fuzzy": True}):
+        with pytest.raises(ValidationError):
+            ElementTarget(**empty_target)
+
+
+def test_hierarchy_index_signature_changes_with_the_content():
+    def hierarchy(text: str) -> list[dict]:
+        return [{"attributes": {"text": text, "bounds": "[0,0][100,100]"}, "children": []}]
+
+    assert HierarchyIndex(hierarchy("a")).signature() == HierarchyIndex(hierarchy("a")).signature()
+    assert HierarchyIndex(hierarchy("a")).signature() != HierarchyIndex(hierarchy("b")).signature()
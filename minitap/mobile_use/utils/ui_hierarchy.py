@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from difflib import SequenceMatcher
+
+from pydantic import BaseModel, Field, model_validator
 
 from minitap.mobile_use.utils.logger import get_logger
 
@@ -123,3 +125,96 @@ def get_bounds_for_element(element: dict) -> ElementBounds | None:
             logger.error(f"Failed to validate bounds: {e}")
             return None
     return None
+
+
+# Text attributes of the rich hierarchy nodes matched against a target text
+_TEXT_ATTRIBUTES = ("text", "accessibilityText", "hintText")
+FUZZY_MATCH_MIN_RATIO = 0.8
+
+
+def _get_resource_id(attributes: dict) -> str | None:
+    # "resource-id" in the rich hierarchy, "resourceId" in the flat one
+    return attributes.get("resource-id") or attributes.get("resourceId")
+
+
+def _normalize_text(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+class ElementTarget(BaseModel):
+    """An element looked up by resource id and/or text, the text matching fuzzily if asked."""
+
+    resource_id: str | None = Field(default=None, description="Resource id of the element")
+    text: str | None = Field(default=None, description="Text or accessibility text of the element")
+    fuzzy: bool = Field(
+        default=False,
+        description="Also match texts containing or close to the given text (case insensitive)",
+    )
+
+    @model_validator(mode="after")
+    def check_resource_id_or_text(self):
+        # An empty target would match the root node of any hierarchy
+        if not self.resource_id and not self.text:
+            raise ValueError("At least one of 'resource_id' and 'text' must be given")
+        return self
+
+    def __str__(self) -> str:
+        parts = []
+        if self.resource_id:
+            parts.append(f"id={self.resource_id!r}")
+        if self.text:
+            parts.append(f"{'fuzzy ' if self.fuzzy else ''}text={self.text!r}")
+        return ", ".join(parts)
+
+
+class HierarchyIndex:
+    """
+    Flat index of the nodes of a hierarchy (rich or flat), built once per hierarchy read to
+    look up elements and to compare screens.
+    """
+
+    def __init__(self, hierarchy: list[dict]):
+        self.nodes: list[dict] = []
+        self._by_resource_id: dict[str, list[dict]] = {}
+        stack = list(reversed(hierarchy))
+        while stack:
+            node = stack.pop()
+            attributes = node.get("attributes", node)
+            self.nodes.append(attributes)
+            if resource_id := _get_resource_id(attributes):
+                self._by_resource_id.setdefault(resource_id, []).append(attributes)
+            stack.extend(reversed(node.get("children", [])))
+
+    def signature(self) -> tuple:
+        """Identifies the visible content, to detect that the screen didn't change."""
+        return tuple(
+            (
+                _get_resource_id(node),
+                str(node.get("bounds")),
+                *(node.get(a) for a in _TEXT_ATTRIBUTES),
+            )
+            for node in self.nodes
+        )
+
+    def find(self, target: ElementTarget) -> dict | None:
+        """Attributes of the first node matching the target, exact text matches first."""
+        candidates = (
+            self._by_resource_id.get(target.resource_id, []) if target.resource_id else self.nodes
+        )
+        if not target.text:
+            return candidates[0] if candidates else None
+
+        text = _normalize_text(target.text)
+        for node in candidates:
+            if any(_normalize_text(node.get(a) or "") == text for a in _TEXT_ATTRIBUTES):
+                return node
+        if target.fuzzy:
+            for node in candidates:
+                for attribute in _TEXT_ATTRIBUTES:
+                    value = _normalize_text(node.get(attribute) or "")
+                    if value and (
+                        text in value
+                        or SequenceMatcher(None, text, value).ratio() >= FUZZY_MATCH_MIN_RATIO
+                    ):
+                        return node
+        return None
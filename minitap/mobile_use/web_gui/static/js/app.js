@@ -72,6 +72,7 @@ function connectSSE(){
       if(data.type === 'update' && data.node) setStatus('Active: ' + data.node);
       if(data.type === 'final') addMsg('agent', typeof data.result === 'string' ? data.result : JSON.stringify(data.result, null, 2));
       if(data.type === 'error') addMsg('agent', 'Error: ' + (data.message || ''));
+      if(data.type === 'metrics' && data.summary) addSystem(data.summary);
     }catch(e){}
   };
   es.onerror = ()=>{ /* keep trying */ };